@@ -0,0 +1,123 @@
+import argparse
+import copy
+import json
+import os
+import tempfile
+import time
+
+from argparse import Namespace
+from typing import Dict, List, Sequence
+
+from utils import read_json_file, file_exists, get_json_backend, set_json_backend, JsonBackendException, \
+    JSON_BACKENDS
+
+
+def parse_arguments() -> Namespace:
+    """
+    Parse command-line arguments.
+
+    Returns:
+        Namespace: An object containing the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Compare JSON backends decoding reports of increasing size.")
+    parser.add_argument("report_path", type=str, help="Snyk report JSON path")
+    parser.add_argument("--scales", type=int, nargs='+', default=[1, 10, 100],
+                        help="How many times the results of the report are repeated")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs per backend, the best one is kept")
+
+    return parser.parse_args()
+
+
+def scale_report(report_data: Dict, scale: int) -> Dict:
+    """
+    Builds a larger report by repeating the results of every run.
+
+    Args:
+        report_data (Dict): The parsed Snyk Code report.
+        scale (int): How many times the results are repeated.
+
+    Returns:
+        Dict: The scaled report.
+    """
+    scaled = copy.deepcopy(report_data)
+    for run in scaled.get('runs', []):
+        run['results'] = run.get('results', []) * scale
+    return scaled
+
+
+def available_backends() -> List[str]:
+    """
+    Gets the JSON backends installed.
+
+    Returns:
+        List[str]: The names of the installed backends, see `JSON_BACKENDS`.
+    """
+    backends = []
+    for name in JSON_BACKENDS:
+        try:
+            get_json_backend(name)
+        except JsonBackendException:
+            continue
+        backends.append(name)
+    return backends
+
+
+def benchmark_backends(report_path: str, scales: Sequence[int], repeat: int) -> List[Dict]:
+    """
+    Times `read_json_file` with every installed backend on reports of increasing size.
+
+    Args:
+        report_path (str): The path to the Snyk Code report to scale.
+        scales (Sequence[int]): How many times the results are repeated in every report.
+        repeat (int): The number of runs per backend and report, the best one is kept.
+
+    Returns:
+        List[Dict]: For every report and backend, the report size in bytes, the backend name and
+            the best decoding time in seconds.
+    """
+    report_data = read_json_file(report_path)
+    measures = []
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scale in scales:
+            scaled_path = os.path.join(work_dir, f'report-{scale}.json')
+            with open(scaled_path, 'w', encoding='utf-8') as scaled_file:
+                json.dump(scale_report(report_data, scale), scaled_file)
+            size = os.path.getsize(scaled_path)
+
+            for backend in available_backends():
+                set_json_backend(backend)
+                timings = []
+                for _ in range(repeat):
+                    started_at = time.perf_counter()
+                    read_json_file(scaled_path)
+                    timings.append(time.perf_counter() - started_at)
+                measures.append({'size': size, 'backend': backend, 'seconds': min(timings)})
+
+    set_json_backend(None)
+    return measures
+
+
+def main():
+    """
+    Prints how long every installed JSON backend takes to read reports of increasing size.
+
+    Raises:
+        Exception: If the report does not exist.
+    """
+    args = parse_arguments()
+    if not file_exists(args.report_path):
+        raise Exception(f"The provided Snyk report: '{args.report_path}' does not exist.")
+
+    measures = benchmark_backends(args.report_path, args.scales, args.repeat)
+    baselines = {measure['size']: measure['seconds'] for measure in measures if measure['backend'] == 'json'}
+
+    print(f"{'Size (MiB)':>10}  {'Backend':<8}  {'Time (ms)':>10}  {'Speedup':>8}")
+    for measure in measures:
+        speedup = baselines[measure['size']] / measure['seconds'] if measure['seconds'] else 0.0
+        print(f"{measure['size'] / (1024 * 1024):>10.2f}  {measure['backend']:<8}  "
+              f"{measure['seconds'] * 1000:>10.2f}  {speedup:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
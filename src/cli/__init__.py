@@ -1,3 +1,13 @@
 from .code import *
+from .incremental import *
+from .diagnosis import *
 
-__all__ = ["process_source_code", "InvalidLineException", "InvalidContentException"]
+__all__ = [
+    "process_source_code",
+    "process_source_code_incremental",
+    "diagnose_source_code",
+    "MismatchSummary",
+    "InvalidLineException",
+    "InvalidContentException",
+    "ValidationCancelledException",
+]
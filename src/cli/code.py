@@ -1,17 +1,41 @@
-from typing import List
+import heapq
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from report import SarifReport, CodeRegion
+from report import SarifReport, CodeRegion, ReportLocation
 from utils import read_lines_from_file, get_code_path
+from .hashes import compute_artifact_hashes
+from .planner import plan_file_order
+
+if TYPE_CHECKING:
+    from utils.shared_cache import SharedFileCache
 
 
 class InvalidLineException(Exception):
-    def __init__(self, message):
+    def __init__(self, message, code_file_path: Optional[str] = None, code_region: Optional[CodeRegion] = None):
         super().__init__(message)
+        self.code_file_path = code_file_path
+        self.code_region = code_region
+
+    def __reduce__(self):
+        # Keeps the failing location when raised in a worker process
+        return self.__class__, (self.args[0], self.code_file_path, self.code_region)
 
 
 class InvalidContentException(Exception):
-    def __init__(self, message):
+    def __init__(self, message, code_file_path: Optional[str] = None, code_region: Optional[CodeRegion] = None):
         super().__init__(message)
+        self.code_file_path = code_file_path
+        self.code_region = code_region
+
+    def __reduce__(self):
+        # Keeps the failing location when raised in a worker process
+        return self.__class__, (self.args[0], self.code_file_path, self.code_region)
+
+
+class ValidationCancelledException(Exception):
+    pass
 
 
 class CodeReport:
@@ -43,38 +67,340 @@ class CodeReport:
                f"= {self.line_content}"
 
 
-def process_source_code(project_dir: str, sarif_report: SarifReport) -> List[CodeReport]:
+def process_source_code(project_dir: str, sarif_report: SarifReport,
+                        recent_files: Optional[Sequence[str]] = None,
+                        blob_ids: Optional[Dict[str, str]] = None, workers: int = 1,
+                        commit_hash: Optional[str] = None,
+                        cancel: Optional[threading.Event] = None) -> List[CodeReport]:
     """
     Processes a Snyk Code report and extracts code regions.
 
+    Files with a content hash in the report (`artifacts[].hashes`) are compared as a whole, and
+    their regions are only read when the report has no hash for them.
+
     Args:
         project_dir (str): The project directory path.
         sarif_report (SarifReport): The Snyk Code report to process.
+        recent_files (Sequence[str], optional): Files changed in the most recent commits, checked first.
+        blob_ids (Dict[str, str], optional): The Git blob id of the files, to reuse digests already computed.
+        workers (int): The number of processes verifying files, see `verify_files_in_pool`.
+        commit_hash (str, optional): The full hash of the commit checked out, to share the files read
+            across processes.
+        cancel (threading.Event, optional): Stops the verification once set, see `process_locations`.
 
     Returns:
-        List[CodeReport]: A list of CodeReport objects representing code regions.
+        List[CodeReport]: A list of CodeReport objects representing the code regions that were read.
     """
-    report: List[CodeReport] = []
+    locations: Iterable[ReportLocation] = sarif_report.iter_locations()
+    artifact_hashes = sarif_report.artifact_hashes
+
+    if artifact_hashes:
+        locations = list(locations)
+        artifact_location_uris = dict.fromkeys(location.artifact_location_uri for location in locations)
+        digests = compute_artifact_hashes(project_dir, artifact_hashes, artifact_location_uris, blob_ids)
+        for artifact_location_uri, (expected_digest, digest) in digests.items():
+            if expected_digest != digest:
+                throw_invalid_file_hash_exception(get_code_path(project_dir, artifact_location_uri),
+                                                  expected_digest, digest)
+        locations = [location for location in locations if location.artifact_location_uri not in digests]
+
+    return process_locations(project_dir, locations, recent_files, workers, commit_hash, cancel)
+
+
+def process_locations(project_dir: str, locations: Iterable[ReportLocation],
+                      recent_files: Optional[Sequence[str]] = None, workers: int = 1,
+                      commit_hash: Optional[str] = None,
+                      cancel: Optional[threading.Event] = None) -> List[CodeReport]:
+    """
+    Verifies the given report locations against the project and extracts their code regions.
 
-    def process(artifact_location_uri: str, region: CodeRegion) -> CodeReport:
-        path = get_code_path(project_dir, artifact_location_uri)
-        code_snippet_report = read_code_snippet(path, region)
-        if starts_with_space(code_snippet_report.line_content):
-            raise InvalidContentException(f"Invalid line content: {code_snippet_report.line_content}")
+    Locations are grouped by file, and every file is read at most once, in a single forward
+    pass that stops at the largest end line reported for it. Files are checked in the order
+    given by `plan_file_order`, so a mismatch is found as soon as possible.
 
-        return code_snippet_report
+    Args:
+        project_dir (str): The project directory path.
+        locations (Iterable[ReportLocation]): The report locations to verify.
+        recent_files (Sequence[str], optional): Files changed in the most recent commits, checked first.
+        workers (int): The number of processes verifying files, see `verify_files_in_pool`.
+        commit_hash (str, optional): The full hash of the commit checked out, to share the files read
+            across processes.
+        cancel (threading.Event, optional): Stops the verification once set. It is checked between files.
 
-    for run in sarif_report.runs:
-        for result in run.results:
-            report += [process(location.artifact_location_uri, location.region) for location in result.locations]
-            for code_flow in result.code_flows:
-                for thread_flow in code_flow.thread_flows:
-                    report += [process(thread_location.artifact_location_uri, thread_location.region)
-                               for thread_location in thread_flow.locations]
+    Returns:
+        List[CodeReport]: A list of CodeReport objects representing code regions, in the order of the locations.
+
+    Raises:
+        ValidationCancelledException: If `cancel` was set before every file was verified.
+    """
+    regions_by_file: Dict[str, List[Tuple[int, CodeRegion]]] = {}
+    number_of_locations = 0
+    for index, location in enumerate(locations):
+        regions_by_file.setdefault(location.artifact_location_uri, []).append((index, location.region))
+        number_of_locations = index + 1
+
+    report: List[Optional[CodeReport]] = [None] * number_of_locations
+    file_order = plan_file_order(project_dir, regions_by_file, recent_files)
+
+    if workers > 1 and len(file_order) > 1:
+        files = [(get_code_path(project_dir, artifact_location_uri), regions_by_file[artifact_location_uri])
+                 for artifact_location_uri in file_order]
+        for index, code_report in verify_files_in_pool(files, workers, commit_hash, cancel=cancel):
+            report[index] = code_report
+        return report
+
+    for artifact_location_uri in file_order:
+        throw_if_cancelled(cancel)
+        path = get_code_path(project_dir, artifact_location_uri)
+        for index, code_report in verify_file_regions(path, regions_by_file[artifact_location_uri]):
+            report[index] = code_report
 
     return report
 
 
+def verify_files_in_pool(files: List[Tuple[str, List[Tuple[int, CodeRegion]]]], workers: int,
+                         commit_hash: Optional[str] = None,
+                         cache: Optional['SharedFileCache'] = None,
+                         cancel: Optional[threading.Event] = None,
+                         errors: Optional[List[Tuple[int, Exception]]] = None) -> List[Tuple[int, CodeReport]]:
+    """
+    Verifies the regions of several files on a pool of processes.
+
+    Workers read files through a `SharedFileCache`, so a file is read once per host even when
+    several validations of the same commit run at the same time. The references the job holds
+    on the shared memory segments are released when it finishes, and the first mismatch cancels
+    the files not verified yet.
+
+    Args:
+        files (List[Tuple[str, List[Tuple[int, CodeRegion]]]]): Every file path with its regions to read.
+        workers (int): The number of processes.
+        commit_hash (str, optional): The full hash of the commit checked out.
+        cache (SharedFileCache, optional): The shared memory cache.
+        cancel (threading.Event, optional): Cancels the files not verified yet once set.
+        errors (List[Tuple[int, Exception]], optional): Collects the mismatch of every region, with the index
+            of its location, instead of stopping at the first one. Every region of a file that cannot be read
+            mismatches.
+
+    Returns:
+        List[Tuple[int, CodeReport]]: The CodeReport objects, with the index of their location.
+    """
+    # Shared memory segments and their locks are POSIX only, so they are imported for pools only
+    from utils.shared_cache import SharedFileCache
+
+    cache = cache or SharedFileCache()
+    code_reports: List[Tuple[int, CodeReport]] = []
+    segment_names: List[str] = []
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    futures = {executor.submit(verify_shared_file_regions, cache, commit_hash, code_file_path, regions,
+                               errors is not None): regions
+               for code_file_path, regions in files}
+    try:
+        for future in as_completed(futures):
+            throw_if_cancelled(cancel)
+            try:
+                segment_name, file_code_reports, file_errors = future.result()
+            except (OSError, UnicodeDecodeError) as e:
+                if errors is None:
+                    raise
+                errors.extend((index, e) for index, _ in futures[future])
+                continue
+            segment_names.append(segment_name)
+            code_reports += file_code_reports
+            if errors is not None:
+                errors.extend(file_errors)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        # Files verified after the first mismatch still hold a reference
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                segment_name = future.result()[0]
+                if segment_name not in segment_names:
+                    segment_names.append(segment_name)
+        for segment_name in segment_names:
+            cache.release(segment_name)
+
+    return code_reports
+
+
+def verify_shared_file_regions(cache: 'SharedFileCache', commit_hash: Optional[str], code_file_path: str,
+                               regions: List[Tuple[int, CodeRegion]], collect_errors: bool = False) \
+        -> Tuple[str, List[Tuple[int, CodeReport]], List[Tuple[int, Exception]]]:
+    """
+    Checks the code regions of a file read through the shared memory cache, in a worker process.
+
+    Args:
+        cache (SharedFileCache): The shared memory cache.
+        commit_hash (str, optional): The full hash of the commit checked out.
+        code_file_path (str): The path to the code file.
+        regions (List[Tuple[int, CodeRegion]]): The regions to read, with the index of their location.
+        collect_errors (bool): Whether to return the mismatch of every region instead of raising the first one.
+
+    Returns:
+        Tuple[str, List[Tuple[int, CodeReport]], List[Tuple[int, Exception]]]: The name of the segment holding
+            the file, to release it once the job finishes, the CodeReport objects and the mismatches collected,
+            with the index of their location.
+    """
+    code_reports: List[Tuple[int, CodeReport]] = []
+    errors: Optional[List[Tuple[int, Exception]]] = [] if collect_errors else None
+    shared_file = cache.acquire(commit_hash, code_file_path)
+    try:
+        for index, region in regions:
+            _check_region(code_reports, errors, index,
+                          lambda: extract_code_snippet(code_file_path, region, shared_file.get_line,
+                                                       shared_file.line_count))
+    except Exception:
+        # The job fails, so the reference is not kept until it finishes
+        cache.release(shared_file.name)
+        raise
+    finally:
+        shared_file.close()
+
+    return shared_file.name, code_reports, errors or []
+
+
+def verify_file_regions(code_file_path: str, regions: List[Tuple[int, CodeRegion]],
+                        errors: Optional[List[Tuple[int, Exception]]] = None) -> List[Tuple[int, CodeReport]]:
+    """
+    Reads all the code regions of a file in one forward streaming pass and checks their content.
+
+    Only the lines of the regions not yet completed are kept in memory.
+
+    Args:
+        code_file_path (str): The path to the code file.
+        regions (List[Tuple[int, CodeRegion]]): The regions to read, with the index of their location.
+        errors (List[Tuple[int, Exception]], optional): Collects the mismatch of every region, with the index
+            of its location, instead of raising the first one.
+
+    Returns:
+        List[Tuple[int, CodeReport]]: The CodeReport objects, with the index of their location.
+    """
+    code_reports: List[Tuple[int, CodeReport]] = []
+    streamed_regions: List[Tuple[int, int, int, CodeRegion]] = []
+
+    for index, region in regions:
+        if is_streamable_region(region):
+            streamed_regions.append((region.start_line, region.end_line, index, region))
+        else:
+            # Fall back to reading the whole file for regions that cannot be streamed
+            _check_region(code_reports, errors, index, lambda: read_code_snippet(code_file_path, region))
+
+    if not streamed_regions:
+        return code_reports
+
+    streamed_regions.sort(key=lambda streamed_region: (streamed_region[0], streamed_region[2]))
+    max_end_line = max(streamed_region[1] for streamed_region in streamed_regions)
+    window: Dict[int, str] = {}
+    first_window_line = 1
+    open_regions: List[Tuple[int, int, int, CodeRegion]] = []
+    next_region = 0
+    line_number = 0
+
+    with open(code_file_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line_number += 1
+            while next_region < len(streamed_regions) and streamed_regions[next_region][0] == line_number:
+                start_line, end_line, index, region = streamed_regions[next_region]
+                heapq.heappush(open_regions, (end_line, index, start_line, region))
+                next_region += 1
+
+            if not open_regions:
+                continue
+
+            window[line_number] = line
+            if open_regions[0][0] != line_number:
+                continue
+
+            while open_regions and open_regions[0][0] == line_number:
+                _, index, _, region = heapq.heappop(open_regions)
+                _check_region(code_reports, errors, index,
+                              lambda: extract_code_snippet(code_file_path, region, lambda i: window[i + 1], line_number))
+
+            # Forget the lines no open region needs anymore
+            first_needed_line = min((start_line for _, _, start_line, _ in open_regions), default=line_number + 1)
+            while first_window_line < first_needed_line:
+                window.pop(first_window_line, None)
+                first_window_line += 1
+
+            if line_number >= max_end_line:
+                break
+
+    if open_regions or next_region < len(streamed_regions):
+        unfinished_regions = [(index, region) for _, index, _, region in open_regions] + \
+                             [(index, region) for _, _, index, region in streamed_regions[next_region:]]
+        if errors is None:
+            _, region = min(unfinished_regions, key=lambda unfinished_region: unfinished_region[1].end_line)
+            throw_invalid_number_of_lines_exception(code_file_path, line_number, region.end_line, region)
+        for index, region in sorted(unfinished_regions, key=lambda unfinished_region: unfinished_region[0]):
+            _check_region(code_reports, errors, index,
+                          lambda: throw_invalid_number_of_lines_exception(code_file_path, line_number,
+                                                                          region.end_line, region))
+
+    return code_reports
+
+
+def _check_region(code_reports: List[Tuple[int, CodeReport]], errors: Optional[List[Tuple[int, Exception]]],
+                  index: int, read_code_report: Callable[[], CodeReport]):
+    # Mismatches are raised, unless they are collected
+    try:
+        code_reports.append((index, check_code_report(read_code_report())))
+    except (InvalidLineException, InvalidContentException) as e:
+        if errors is None:
+            raise
+        errors.append((index, e))
+
+
+def is_streamable_region(code_region: CodeRegion) -> bool:
+    """
+    Checks whether a region can be read in a streaming pass.
+
+    Args:
+        code_region (CodeRegion): The code region specifying start and end positions.
+
+    Returns:
+        bool: True if the lines of the region are known integers in increasing order.
+    """
+    start_line = code_region.start_line
+    end_line = code_region.end_line
+    return isinstance(start_line, int) and isinstance(end_line, int) and 1 <= start_line <= end_line
+
+
+def check_code_report(code_report: CodeReport) -> CodeReport:
+    """
+    Checks the content of a code snippet.
+
+    Args:
+        code_report (CodeReport): The CodeReport object representing the code snippet.
+
+    Returns:
+        CodeReport: The same CodeReport object.
+
+    Raises:
+        InvalidContentException: If the code snippet starts with a white space character.
+    """
+    if starts_with_space(code_report.line_content):
+        raise InvalidContentException(f"Invalid line content: {code_report.line_content}",
+                                      code_report.code_file_path, code_report.code_region)
+
+    return code_report
+
+
+def verify_location(project_dir: str, artifact_location_uri: str, region: CodeRegion) -> CodeReport:
+    """
+    Reads the code region of a single report location and checks its content.
+
+    Args:
+        project_dir (str): The project directory path.
+        artifact_location_uri (str): The location of the code file relative to the project directory.
+        region (CodeRegion): The code region specifying start and end positions.
+
+    Returns:
+        CodeReport: A CodeReport object representing the code region.
+    """
+    path = get_code_path(project_dir, artifact_location_uri)
+    return check_code_report(read_code_snippet(path, region))
+
+
 def read_code_snippet(code_file_path: str, code_region: CodeRegion) -> CodeReport:
     """
     Reads a code snippet from a code file based on the provided CodeRegion.
@@ -108,14 +434,68 @@ def read_single_line_code_snippet(code_file_path: str, code_region: CodeRegion)
     """
     file_lines = read_lines_from_file(code_file_path)
 
-    if len(file_lines) < code_region.end_line:
-        throw_invalid_number_of_lines_exception(code_file_path, len(file_lines), code_region.end_line)
+    return extract_single_line_code_snippet(code_file_path, code_region, file_lines.__getitem__, len(file_lines))
+
+
+def read_multiple_line_code_snippet(code_file_path: str, code_region: CodeRegion) -> CodeReport:
+    """
+    Reads a multi-line code snippet from a code file based on the provided CodeRegion.
+
+    Args:
+        code_file_path (str): The path to the code file.
+        code_region (CodeRegion): The code region specifying start and end positions.
+
+    Returns:
+        CodeReport: A CodeReport object representing the multi-line code snippet.
+    """
+    file_lines = read_lines_from_file(code_file_path)
+
+    return extract_multiple_line_code_snippet(code_file_path, code_region, file_lines.__getitem__, len(file_lines))
+
+
+def extract_code_snippet(code_file_path: str, code_region: CodeRegion, get_line: Callable[[int], str],
+                         file_line_count: int) -> CodeReport:
+    """
+    Extracts a code snippet from lines already read from a code file.
+
+    Args:
+        code_file_path (str): The path to the code file.
+        code_region (CodeRegion): The code region specifying start and end positions.
+        get_line (Callable[[int], str]): Returns the line of the file at a zero-based line number.
+        file_line_count (int): The number of lines of the file, or at least the number of lines read.
+
+    Returns:
+        CodeReport: A CodeReport object representing the code snippet.
+    """
+    if code_region.start_line != code_region.end_line:
+        return extract_multiple_line_code_snippet(code_file_path, code_region, get_line, file_line_count)
+
+    return extract_single_line_code_snippet(code_file_path, code_region, get_line, file_line_count)
+
+
+def extract_single_line_code_snippet(code_file_path: str, code_region: CodeRegion, get_line: Callable[[int], str],
+                                     file_line_count: int) -> CodeReport:
+    """
+    Extracts a single-line code snippet from lines already read from a code file.
+
+    Args:
+        code_file_path (str): The path to the code file.
+        code_region (CodeRegion): The code region specifying start and end positions.
+        get_line (Callable[[int], str]): Returns the line of the file at a zero-based line number.
+        file_line_count (int): The number of lines of the file, or at least the number of lines read.
+
+    Returns:
+        CodeReport: A CodeReport object representing the single-line code snippet.
+    """
+    if file_line_count < code_region.end_line:
+        throw_invalid_number_of_lines_exception(code_file_path, file_line_count, code_region.end_line, code_region)
 
     line_number = code_region.start_line - 1
-    line = file_lines[line_number]
+    line = get_line(line_number)
 
     if len(line) < code_region.end_column:
-        throw_invalid_line_length_exception(code_file_path, line_number, len(line), code_region.end_column)
+        throw_invalid_line_length_exception(code_file_path, line_number, len(line), code_region.end_column,
+                                            code_region)
 
     start_column = code_region.start_column - 1
     end_column = code_region.end_column
@@ -123,32 +503,34 @@ def read_single_line_code_snippet(code_file_path: str, code_region: CodeRegion)
     return CodeReport(code_file_path, code_region, line[start_column:end_column])
 
 
-def read_multiple_line_code_snippet(code_file_path: str, code_region: CodeRegion) -> CodeReport:
+def extract_multiple_line_code_snippet(code_file_path: str, code_region: CodeRegion, get_line: Callable[[int], str],
+                                       file_line_count: int) -> CodeReport:
     """
-    Reads a multi-line code snippet from a code file based on the provided CodeRegion.
+    Extracts a multi-line code snippet from lines already read from a code file.
 
     Args:
         code_file_path (str): The path to the code file.
         code_region (CodeRegion): The code region specifying start and end positions.
+        get_line (Callable[[int], str]): Returns the line of the file at a zero-based line number.
+        file_line_count (int): The number of lines of the file, or at least the number of lines read.
 
     Returns:
         CodeReport: A CodeReport object representing the multi-line code snippet.
     """
-    file_lines = read_lines_from_file(code_file_path)
-
-    if len(file_lines) < code_region.end_line:
-        throw_invalid_number_of_lines_exception(code_file_path, len(file_lines), code_region.end_line)
+    if file_line_count < code_region.end_line:
+        throw_invalid_number_of_lines_exception(code_file_path, file_line_count, code_region.end_line, code_region)
 
     code_lines: List[str] = []
     end_column = 0
 
     for line_number in range(code_region.start_line - 1, code_region.end_line):
-        line = file_lines[line_number]
+        line = get_line(line_number)
         code_lines.append(line)
         # Is the last line?
         if line_number == (code_region.end_line - 1):
             if len(line) < code_region.end_column:
-                throw_invalid_line_length_exception(code_file_path, line_number, len(line), code_region.end_column)
+                throw_invalid_line_length_exception(code_file_path, line_number, len(line),
+                                                    code_region.end_column, code_region)
             end_column += code_region.end_column
             break
         end_column += len(line)
@@ -173,7 +555,19 @@ def starts_with_space(input_string) -> bool:
     return input_string and input_string[0].isspace()
 
 
-def throw_invalid_line_length_exception(code_file_path: str, line_number: int, line_length: int, end_column: int):
+def throw_if_cancelled(cancel: Optional[threading.Event]):
+    """
+    Raises an exception if the validation was cancelled.
+
+    Args:
+        cancel (threading.Event, optional): Set once the validation is cancelled.
+    """
+    if cancel is not None and cancel.is_set():
+        raise ValidationCancelledException("The validation was cancelled.")
+
+
+def throw_invalid_line_length_exception(code_file_path: str, line_number: int, line_length: int, end_column: int,
+                                        code_region: Optional[CodeRegion] = None):
     """
     Raises an exception for an invalid line length.
 
@@ -182,15 +576,18 @@ def throw_invalid_line_length_exception(code_file_path: str, line_number: int, l
         line_number (int): The line number.
         line_length (int): The length of the line.
         end_column (int): The end column position.
+        code_region (CodeRegion, optional): The code region that failed.
     """
     raise InvalidLineException(f"Invalid line length. "
                                f"File: {code_file_path}, "
                                f"line number: {line_number}, "
                                f"line length: {line_length}, "
-                               f"end column: {end_column}")
+                               f"end column: {end_column}",
+                               code_file_path, code_region)
 
 
-def throw_invalid_number_of_lines_exception(code_file_path: str, file_lines: int, end_line: int):
+def throw_invalid_number_of_lines_exception(code_file_path: str, file_lines: int, end_line: int,
+                                            code_region: Optional[CodeRegion] = None):
     """
     Raises an exception for an invalid number of lines.
 
@@ -198,8 +595,26 @@ def throw_invalid_number_of_lines_exception(code_file_path: str, file_lines: int
         code_file_path (str): The path to the code file.
         file_lines (int): The number of lines in the file.
         end_line (int): The end line position.
+        code_region (CodeRegion, optional): The code region that failed.
     """
     raise InvalidLineException(f"Invalid number of lines. "
                                f"File: {code_file_path}, "
                                f"file lines: {file_lines}, "
-                               f"line end: {end_line}")
+                               f"line end: {end_line}",
+                               code_file_path, code_region)
+
+
+def throw_invalid_file_hash_exception(code_file_path: str, expected_digest: str, digest: str):
+    """
+    Raises an exception for a file whose content does not match its hash in the report.
+
+    Args:
+        code_file_path (str): The path to the code file.
+        expected_digest (str): The digest given by the report.
+        digest (str): The digest of the file.
+    """
+    raise InvalidContentException(f"Invalid file hash. "
+                                  f"File: {code_file_path}, "
+                                  f"expected hash: {expected_digest}, "
+                                  f"file hash: {digest}",
+                                  code_file_path)
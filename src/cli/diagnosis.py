@@ -0,0 +1,179 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from report import SarifReport, CodeRegion, ReportLocation
+from utils import get_code_path
+from .code import InvalidContentException, throw_invalid_file_hash_exception, verify_file_regions, \
+    verify_files_in_pool
+from .hashes import compute_artifact_hashes
+
+
+class MismatchStats:
+    def __init__(self):
+        """
+        Initializes a MismatchStats object, the number of locations checked and mismatched in a group.
+        """
+        self.total = 0
+        self.mismatched = 0
+
+    @property
+    def match_ratio(self) -> float:
+        return (self.total - self.mismatched) / self.total if self.total else 1.0
+
+
+class LocationMismatch:
+    def __init__(self, location: ReportLocation, error: Exception):
+        """
+        Initializes a LocationMismatch object.
+
+        Args:
+            location (ReportLocation): The location that does not match.
+            error (Exception): Why it does not match.
+        """
+        self.location = location
+        self.error = error
+
+
+class MismatchSummary:
+    def __init__(self):
+        """
+        Initializes a MismatchSummary object, the mismatches of every unique location of a report.
+        """
+        self.stats = MismatchStats()
+        self.by_file: Dict[str, MismatchStats] = {}
+        self.by_rule: Dict[Optional[str], MismatchStats] = {}
+        self.mismatches: List[LocationMismatch] = []
+        # Expected and actual digest of the files whose content hash does not match
+        self.hash_mismatches: Dict[str, Tuple[str, str]] = {}
+
+    @property
+    def matches(self) -> bool:
+        return not self.mismatches and not self.hash_mismatches
+
+    @property
+    def match_ratio(self) -> float:
+        return self.stats.match_ratio
+
+    def add(self, location: ReportLocation, error: Optional[Exception] = None):
+        """
+        Counts a checked location.
+
+        Args:
+            location (ReportLocation): The location.
+            error (Exception, optional): Why the location does not match, None if it matches.
+        """
+        groups = (self.stats,
+                  self.by_file.setdefault(location.artifact_location_uri, MismatchStats()),
+                  self.by_rule.setdefault(location.rule_id, MismatchStats()))
+        for stats in groups:
+            stats.total += 1
+            stats.mismatched += error is not None
+        if error is not None:
+            self.mismatches.append(LocationMismatch(location, error))
+
+    def to_string(self) -> str:
+        """
+        Returns a string representation of the MismatchSummary object.
+
+        Returns:
+            str: The match ratio, then the files and rules with mismatches, the most mismatched first.
+        """
+        lines = [f"Matched {self.stats.total - self.stats.mismatched}/{self.stats.total} locations "
+                 f"({self.match_ratio:.1%})"]
+        for uri, (expected_digest, digest) in self.hash_mismatches.items():
+            lines.append(f"Hash mismatch: {uri} expected {expected_digest}, found {digest}")
+        for title, groups in (("File", self.by_file), ("Rule", self.by_rule)):
+            for key, stats in sorted(groups.items(), key=lambda group: -group[1].mismatched):
+                if stats.mismatched:
+                    lines.append(f"{title}: {key} {stats.mismatched}/{stats.total} mismatched")
+        return "\n".join(lines)
+
+
+def diagnose_source_code(project_dir: str, sarif_report: SarifReport,
+                         blob_ids: Optional[Dict[str, str]] = None, workers: int = 1,
+                         commit_hash: Optional[str] = None) -> MismatchSummary:
+    """
+    Checks every unique location of a Snyk Code report, instead of stopping at the first mismatch.
+
+    Files are read like `process_locations` does, in one streamed pass per file or on a pool of
+    processes sharing the files read, and the mismatch of every region is collected. Files whose
+    content hash matches the report are not read, as all their locations match. The regions of
+    files whose hash does not match are still checked to tell which locations break, and the
+    locations that do not break mismatch with the hash.
+
+    Args:
+        project_dir (str): The project directory path.
+        sarif_report (SarifReport): The Snyk Code report to diagnose.
+        blob_ids (Dict[str, str], optional): The Git blob id of the files, to reuse digests already computed.
+        workers (int): The number of processes verifying files, see `verify_files_in_pool`.
+        commit_hash (str, optional): The full hash of the commit checked out, to share the files read
+            across processes.
+
+    Returns:
+        MismatchSummary: The mismatches, with statistics per file and per rule.
+    """
+    summary = MismatchSummary()
+    locations: List[ReportLocation] = []
+    location_keys: Set[Tuple] = set()
+    regions_by_file: Dict[str, List[Tuple[int, CodeRegion]]] = {}
+    for location in sarif_report.iter_locations():
+        region = location.region
+        key = (location.artifact_location_uri, location.rule_id,
+               region.start_line, region.end_line, region.start_column, region.end_column)
+        if key not in location_keys:
+            location_keys.add(key)
+            regions_by_file.setdefault(location.artifact_location_uri, []).append((len(locations), region))
+            locations.append(location)
+
+    artifact_hashes = sarif_report.artifact_hashes
+    errors: Dict[int, Exception] = {}
+    files_to_read: List[str] = []
+
+    for artifact_location_uri, regions in regions_by_file.items():
+        try:
+            digests = compute_artifact_hashes(project_dir, artifact_hashes, [artifact_location_uri], blob_ids)
+        except (OSError, UnicodeDecodeError) as e:
+            # Every location of a file that cannot be read mismatches
+            errors.update((index, e) for index, _ in regions)
+            continue
+
+        if artifact_location_uri in digests:
+            expected_digest, digest = digests[artifact_location_uri]
+            if expected_digest == digest:
+                continue
+            summary.hash_mismatches[artifact_location_uri] = (expected_digest, digest)
+        files_to_read.append(artifact_location_uri)
+
+    collected: List[Tuple[int, Exception]] = []
+    if workers > 1 and len(files_to_read) > 1:
+        files = [(get_code_path(project_dir, artifact_location_uri), regions_by_file[artifact_location_uri])
+                 for artifact_location_uri in files_to_read]
+        verify_files_in_pool(files, workers, commit_hash, errors=collected)
+    else:
+        for artifact_location_uri in files_to_read:
+            regions = regions_by_file[artifact_location_uri]
+            file_errors: List[Tuple[int, Exception]] = []
+            try:
+                verify_file_regions(get_code_path(project_dir, artifact_location_uri), regions, file_errors)
+            except (OSError, UnicodeDecodeError) as e:
+                file_errors = [(index, e) for index, _ in regions]
+            collected += file_errors
+    errors.update(collected)
+
+    for artifact_location_uri, (expected_digest, digest) in summary.hash_mismatches.items():
+        hash_error = _invalid_file_hash_exception(get_code_path(project_dir, artifact_location_uri),
+                                                  expected_digest, digest)
+        for index, _ in regions_by_file[artifact_location_uri]:
+            errors.setdefault(index, hash_error)
+
+    for regions in regions_by_file.values():
+        for index, _ in regions:
+            summary.add(locations[index], errors.get(index))
+
+    return summary
+
+
+def _invalid_file_hash_exception(code_file_path: str, expected_digest: str, digest: str) -> InvalidContentException:
+    try:
+        throw_invalid_file_hash_exception(code_file_path, expected_digest, digest)
+    except InvalidContentException as e:
+        return e
@@ -0,0 +1,58 @@
+from typing import Dict, Iterable, Optional, Tuple
+
+from utils import hash_file, get_code_path
+
+# SARIF hash algorithm names and their `hashlib` names, the preferred ones first
+SARIF_HASH_ALGORITHMS = {
+    "sha-256": "sha256",
+    "sha-512": "sha512",
+    "sha-384": "sha384",
+    "sha-224": "sha224",
+    "sha-1": "sha1",
+    "md5": "md5",
+}
+
+MAX_CACHED_DIGESTS = 100_000
+
+# Digests already computed, by Git blob id and algorithm. Files with the same content share
+# the same blob id, so they are hashed once per process across validations.
+_blob_digests: Dict[Tuple[str, str], str] = {}
+
+
+def compute_artifact_hashes(project_dir: str, artifact_hashes: Dict[str, Dict[str, str]],
+                            artifact_location_uris: Iterable[str],
+                            blob_ids: Optional[Dict[str, str]] = None) -> Dict[str, Tuple[str, str]]:
+    """
+    Hashes the files that have a content hash in the report.
+
+    Args:
+        project_dir (str): The project directory path.
+        artifact_hashes (Dict[str, Dict[str, str]]): The hashes by algorithm for every artifact location URI.
+        artifact_location_uris (Iterable[str]): The files to hash, relative to the project directory.
+        blob_ids (Dict[str, str], optional): The Git blob id of the files, to reuse digests already computed.
+
+    Returns:
+        Dict[str, Tuple[str, str]]: The expected and the actual digest of every file with a supported hash.
+    """
+    blob_ids = blob_ids or {}
+    digests: Dict[str, Tuple[str, str]] = {}
+
+    for artifact_location_uri in artifact_location_uris:
+        hashes = {name.lower(): digest for name, digest in artifact_hashes.get(artifact_location_uri, {}).items()}
+        algorithm = next((name for name in SARIF_HASH_ALGORITHMS if name in hashes), None)
+        if algorithm is None:
+            continue
+
+        hashlib_name = SARIF_HASH_ALGORITHMS[algorithm]
+        blob_id = blob_ids.get(artifact_location_uri)
+        digest = _blob_digests.get((blob_id, hashlib_name)) if blob_id else None
+        if digest is None:
+            digest = hash_file(get_code_path(project_dir, artifact_location_uri), hashlib_name)
+            if blob_id:
+                if len(_blob_digests) >= MAX_CACHED_DIGESTS:
+                    _blob_digests.clear()
+                _blob_digests[(blob_id, hashlib_name)] = digest
+
+        digests[artifact_location_uri] = (hashes[algorithm].lower(), digest)
+
+    return digests
@@ -0,0 +1,112 @@
+from typing import List, Optional, Set, Tuple
+
+from report import SarifReport, CodeRegion, ReportLocation
+from repository import ChangedLineRanges
+from .code import CodeReport, process_locations
+
+LocationKey = Tuple[str, int, int, int, int]
+
+
+def process_source_code_incremental(project_dir: str, sarif_report: SarifReport, baseline_report: SarifReport,
+                                    changed_line_ranges: ChangedLineRanges) -> List[CodeReport]:
+    """
+    Processes a Snyk Code report reusing a report already validated against a previous commit.
+
+    A location is carried over from the baseline, and not read again, when the baseline report
+    has the same location and none of its lines changed between the two commits.
+
+    Args:
+        project_dir (str): The project directory path, checked out to the new commit.
+        sarif_report (SarifReport): The Snyk Code report to process.
+        baseline_report (SarifReport): The Snyk Code report validated against the previous commit.
+        changed_line_ranges (ChangedLineRanges): The hunks changed between the previous and the new commit.
+
+    Returns:
+        List[CodeReport]: A list of CodeReport objects representing the re-checked code regions.
+    """
+    baseline_keys: Set[LocationKey] = set()
+    for location in baseline_report.iter_locations():
+        key = location_key(location.artifact_location_uri, location.region)
+        if key is not None:
+            baseline_keys.add(key)
+
+    locations_to_check = [location for location in sarif_report.iter_locations()
+                          if not is_carried_over(location, baseline_keys, changed_line_ranges)]
+
+    return process_locations(project_dir, locations_to_check)
+
+
+def is_carried_over(location: ReportLocation, baseline_keys: Set[LocationKey],
+                    changed_line_ranges: ChangedLineRanges) -> bool:
+    """
+    Checks whether the result of a location can be taken from the baseline.
+
+    Args:
+        location (ReportLocation): The location of the new report.
+        baseline_keys (Set[LocationKey]): The locations of the baseline report.
+        changed_line_ranges (ChangedLineRanges): The hunks changed between the previous and the new commit.
+
+    Returns:
+        bool: True if the location was validated in the baseline and its lines did not change.
+    """
+    key = location_key(location.artifact_location_uri, location.region)
+    if key is None:
+        return False
+
+    uri, start_line, end_line, start_column, end_column = key
+    if uri not in changed_line_ranges:
+        return key in baseline_keys
+
+    hunks = changed_line_ranges[uri]
+    if hunks is None:
+        # The whole file was added, deleted or is binary
+        return False
+
+    for _, _, new_start, new_count in hunks:
+        if new_count == 0:
+            # Lines were only deleted, right after `new_start`
+            if start_line <= new_start < end_line:
+                return False
+        elif new_start <= end_line and new_start + new_count - 1 >= start_line:
+            return False
+
+    base_start_line = map_to_base_line(start_line, hunks)
+    base_end_line = map_to_base_line(end_line, hunks)
+
+    return (uri, base_start_line, base_end_line, start_column, end_column) in baseline_keys
+
+
+def map_to_base_line(line_number: int, hunks: List[Tuple[int, int, int, int]]) -> int:
+    """
+    Maps an unchanged line of the new commit to its line number in the previous commit.
+
+    Args:
+        line_number (int): The line number in the new commit.
+        hunks (List[Tuple[int, int, int, int]]): The hunks changed in the file.
+
+    Returns:
+        int: The line number in the previous commit.
+    """
+    offset = 0
+    for _, old_count, new_start, new_count in hunks:
+        # Pure deletions happen right after `new_start`, so both cases end at the same line
+        if new_start + max(new_count, 1) - 1 < line_number:
+            offset += new_count - old_count
+    return line_number - offset
+
+
+def location_key(artifact_location_uri: str, region: CodeRegion) -> Optional[LocationKey]:
+    """
+    Builds a hashable key for a location.
+
+    Args:
+        artifact_location_uri (str): The location of the code file relative to the project directory.
+        region (CodeRegion): The code region specifying start and end positions.
+
+    Returns:
+        Optional[LocationKey]: The key, or None if the region is incomplete.
+    """
+    key = (artifact_location_uri, region.start_line, region.end_line, region.start_column, region.end_column)
+    if any(not isinstance(value, int) for value in key[1:]):
+        return None
+    return key
@@ -0,0 +1,58 @@
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from report import CodeRegion
+from utils import get_code_path
+
+MISSING_FILE = 0
+TOO_FEW_LINES = 1
+RECENTLY_CHANGED = 2
+UNCHANGED = 3
+
+
+def plan_file_order(project_dir: str, regions_by_file: Dict[str, List[Tuple[int, CodeRegion]]],
+                    recent_files: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Orders the files of a report so the checks most likely to fail run first.
+
+    A report created for another commit is usually revealed by a missing file, by a region beyond
+    the end of a file, or by a file that changed recently, so the files are ordered as follows:
+
+        - Files not found within the project.
+        - Files with fewer bytes than the largest end line reported for them, as they cannot
+          have that many lines.
+        - Files changed in the most recent commits, the most recent first.
+        - Every other file, those with regions closer to their end first.
+
+    Only the file metadata is used, no file is read.
+
+    Args:
+        project_dir (str): The project directory path.
+        regions_by_file (Dict[str, List[Tuple[int, CodeRegion]]]): The regions to read for every file.
+        recent_files (Sequence[str], optional): Files changed in the most recent commits, the most recent first.
+
+    Returns:
+        List[str]: The artifact location URIs of the files, in the order to check them.
+    """
+    recency = {path: rank for rank, path in reversed(list(enumerate(recent_files or [])))}
+    sort_keys = {}
+
+    for artifact_location_uri, regions in regions_by_file.items():
+        end_lines = [region.end_line for _, region in regions if isinstance(region.end_line, int)]
+        max_end_line = max(end_lines, default=0)
+        try:
+            file_size = os.stat(get_code_path(project_dir, artifact_location_uri)).st_size
+        except OSError:
+            sort_keys[artifact_location_uri] = (MISSING_FILE, 0)
+            continue
+
+        if max_end_line > file_size:
+            # Every line but the last one takes at least one byte and its line break
+            sort_keys[artifact_location_uri] = (TOO_FEW_LINES, 0)
+        elif artifact_location_uri in recency:
+            sort_keys[artifact_location_uri] = (RECENTLY_CHANGED, recency[artifact_location_uri])
+        else:
+            sort_keys[artifact_location_uri] = (UNCHANGED, -max_end_line / max(file_size, 1))
+
+    # `sorted` is stable, so files with the same key keep the report order
+    return sorted(regions_by_file, key=sort_keys.__getitem__)
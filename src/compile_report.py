@@ -0,0 +1,38 @@
+import argparse
+
+from argparse import Namespace
+
+from report import SarifReport, compile_snapshot
+from utils import read_json_file, file_exists
+
+
+def parse_arguments() -> Namespace:
+    """
+    Parse command-line arguments.
+
+    Returns:
+        Namespace: An object containing the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Compile a Snyk Code report into a binary snapshot.")
+    parser.add_argument("report_path", type=str, help="Snyk report JSON path")
+    parser.add_argument("snapshot_path", type=str, help="Path where the snapshot will be written")
+
+    return parser.parse_args()
+
+
+def main():
+    """
+    Compiles a Snyk Code report once into a binary snapshot that `main.py` accepts in place of the JSON report.
+
+    Raises:
+        Exception: If the report does not exist.
+    """
+    args = parse_arguments()
+    if not file_exists(args.report_path):
+        raise Exception(f"The provided Snyk report: '{args.report_path}' does not exist.")
+
+    compile_snapshot(SarifReport(read_json_file(args.report_path)), args.snapshot_path)
+
+
+if __name__ == "__main__":
+    main()
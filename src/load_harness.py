@@ -0,0 +1,314 @@
+import argparse
+import json
+import math
+import os
+import queue
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import git
+
+from utils import dir_exists, file_exists
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+STAND_IN_OWNER = 'https://github.com/load-test'
+GIT_ACTOR = git.Actor('load-test', 'load-test@localhost')
+
+
+class LoadJob:
+    def __init__(self, repo_url: str, commit_hash: str, report_path: str, expected: bool):
+        """
+        Initializes a LoadJob object, one run of `main.py`.
+
+        Args:
+            repo_url (str): The GitHub repository URL, rewritten to a local stand-in repository.
+            commit_hash (str): The commit hash.
+            report_path (str): The path to the Snyk Code report.
+            expected (bool): Whether the report matches the repository and commit.
+        """
+        self.repo_url = repo_url
+        self.commit_hash = commit_hash
+        self.report_path = report_path
+        self.expected = expected
+
+
+def parse_arguments() -> Namespace:
+    """
+    Parse command-line arguments.
+
+    Returns:
+        Namespace: An object containing the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Replay reports through main.py at a given concurrency.")
+    parser.add_argument("project_path", type=str, help="Source tree the report was created for")
+    parser.add_argument("report_path", type=str, help="Snyk report JSON path matching the source tree")
+    parser.add_argument("--jobs", type=int, default=100, help="Number of validations to run")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of validations running at a time")
+    parser.add_argument("--mismatch-ratio", type=float, default=0.3,
+                        help="Share of validations against a commit the report does not match")
+    parser.add_argument("--repos", type=int, default=1, help="Number of stand-in repositories")
+    parser.add_argument("--cold", action='store_true', help="Measure the first clone of every repository as well")
+    parser.add_argument("--output", type=str, default=None, help="Path where the summary is written as JSON")
+
+    return parser.parse_args()
+
+
+def create_stand_in_repository(project_path: str, bare_dir: str) -> Tuple[str, str]:
+    """
+    Creates a local bare repository standing in for GitHub, with two commits of a source tree.
+
+    The first commit holds the source tree as it is. In the second one, every file starts with an
+    extra empty line, so a report created for the source tree does not match it.
+
+    Args:
+        project_path (str): The source tree the report was created for.
+        bare_dir (str): The path where the bare repository is created.
+
+    Returns:
+        Tuple[str, str]: The hash of the matching commit and of the mismatching commit.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_tree = os.path.join(work_dir, 'project')
+        shutil.copytree(project_path, work_tree, ignore=shutil.ignore_patterns('.git'))
+        repo = git.Repo.init(work_tree)
+
+        repo.git.add(A=True)
+        matching_commit = repo.index.commit('Source tree of the report', author=GIT_ACTOR, committer=GIT_ACTOR)
+
+        for root, _, files in os.walk(work_tree):
+            if os.path.relpath(root, work_tree).split(os.sep)[0] == '.git':
+                continue
+            for file_name in files:
+                file_path = os.path.join(root, file_name)
+                with open(file_path, 'rb') as file:
+                    content = file.read()
+                with open(file_path, 'wb') as file:
+                    file.write(b'\n' + content)
+
+        repo.git.add(A=True)
+        mismatching_commit = repo.index.commit('Shift every line', author=GIT_ACTOR, committer=GIT_ACTOR)
+
+        git.Repo.clone_from(work_tree, bare_dir, bare=True)
+        repo.close()
+
+    return matching_commit.hexsha, mismatching_commit.hexsha
+
+
+def git_url_rewrite_env(bare_dirs: Dict[str, str]) -> Dict[str, str]:
+    """
+    Gets an environment where Git fetches GitHub URLs from local bare repositories.
+
+    Args:
+        bare_dirs (Dict[str, str]): The bare repository path for every GitHub repository URL.
+
+    Returns:
+        Dict[str, str]: A copy of the current environment with `url.<base>.insteadOf` set for every URL.
+    """
+    env = dict(os.environ)
+    config_count = int(env.get('GIT_CONFIG_COUNT', '0'))
+    for repo_url, bare_dir in bare_dirs.items():
+        env[f'GIT_CONFIG_KEY_{config_count}'] = f'url.file://{os.path.abspath(bare_dir)}.insteadOf'
+        env[f'GIT_CONFIG_VALUE_{config_count}'] = repo_url
+        config_count += 1
+    env['GIT_CONFIG_COUNT'] = str(config_count)
+    return env
+
+
+def plan_jobs(commits: Dict[str, Tuple[str, str]], report_path: str, job_count: int,
+              mismatch_ratio: float) -> List[LoadJob]:
+    """
+    Plans a deterministic mix of matching and mismatching validations spread over the repositories.
+
+    Args:
+        commits (Dict[str, Tuple[str, str]]): The matching and mismatching commit of every repository URL.
+        report_path (str): The path to the Snyk Code report.
+        job_count (int): The number of validations.
+        mismatch_ratio (float): The share of validations against the mismatching commit.
+
+    Returns:
+        List[LoadJob]: The validations, in the order they are started.
+    """
+    repo_urls = list(commits)
+    jobs = []
+    for i in range(job_count):
+        repo_url = repo_urls[i % len(repo_urls)]
+        matching_commit, mismatching_commit = commits[repo_url]
+        # Spreads mismatches evenly, e.g. every third job for a ratio of 1/3
+        mismatch = int((i + 1) * mismatch_ratio) > int(i * mismatch_ratio)
+        jobs.append(LoadJob(repo_url, mismatching_commit if mismatch else matching_commit, report_path,
+                            not mismatch))
+    return jobs
+
+
+def run_job(job: LoadJob, work_dir: str, env: Dict[str, str]) -> Tuple[float, bool]:
+    """
+    Runs one validation through `main.py` in its own process.
+
+    Args:
+        job (LoadJob): The validation.
+        work_dir (str): The directory `main.py` runs in, holding its `projects` folder.
+        env (Dict[str, str]): The environment, see `git_url_rewrite_env`.
+
+    Returns:
+        Tuple[float, bool]: The latency in seconds and whether `main.py` reported a match.
+    """
+    started_at = time.perf_counter()
+    completed = subprocess.run([sys.executable, MAIN_PATH, job.repo_url, job.commit_hash, job.report_path],
+                               cwd=work_dir, env=env, capture_output=True, text=True)
+    latency = time.perf_counter() - started_at
+    output = completed.stdout.strip().splitlines()
+    return latency, bool(output) and output[-1] == 'True'
+
+
+def run_load(jobs: Sequence[LoadJob], concurrency: int, work_root: str, env: Dict[str, str],
+             warm_up: bool = True) -> Dict[str, float]:
+    """
+    Runs validations at a given concurrency and measures them.
+
+    Every concurrent slot runs `main.py` in its own directory, as validations sharing a working
+    tree would check out their commits over each other. Unless `warm_up` is False, every slot
+    clones the repositories before the measurement starts, so latencies are those of warm runs.
+
+    Args:
+        jobs (Sequence[LoadJob]): The validations.
+        concurrency (int): The number of validations running at a time.
+        work_root (str): The directory where the slot directories are created.
+        env (Dict[str, str]): The environment, see `git_url_rewrite_env`.
+        warm_up (bool): Whether to clone the repositories of every slot first.
+
+    Returns:
+        Dict[str, float]: The number of jobs, the throughput in jobs per second, the p50, p95 and p99
+            latencies in seconds, the peak RSS of a validation process in MiB and the number of
+            unexpected verdicts.
+    """
+    slots: queue.Queue = queue.Queue()
+    for slot in range(concurrency):
+        slot_dir = os.path.join(work_root, f'slot-{slot}')
+        os.makedirs(slot_dir, exist_ok=True)
+        slots.put(slot_dir)
+
+    if warm_up:
+        warm_up_jobs = list({job.repo_url: job for job in jobs}.values())
+        for slot_dir in list(slots.queue):
+            for job in warm_up_jobs:
+                run_job(job, slot_dir, env)
+
+    latencies: List[float] = []
+    unexpected_verdicts = 0
+    results_lock = threading.Lock()
+
+    def run_in_slot(job: LoadJob):
+        nonlocal unexpected_verdicts
+        slot_dir = slots.get()
+        try:
+            latency, matches = run_job(job, slot_dir, env)
+        finally:
+            slots.put(slot_dir)
+        with results_lock:
+            latencies.append(latency)
+            unexpected_verdicts += matches != job.expected
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(run_in_slot, jobs))
+    elapsed = time.perf_counter() - started_at
+
+    return {
+        'jobs': len(jobs),
+        'concurrency': concurrency,
+        'throughput': len(jobs) / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'peak_rss_mib': peak_child_rss_mib(),
+        'unexpected_verdicts': unexpected_verdicts,
+    }
+
+
+def percentile(values: Sequence[float], rank: float) -> float:
+    """
+    Gets a percentile with the nearest-rank method.
+
+    Args:
+        values (Sequence[float]): The measured values.
+        rank (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The smallest value greater than or equal to `rank` percent of the values, 0.0 if there is none.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(len(ordered) * rank / 100) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def peak_child_rss_mib() -> float:
+    """
+    Gets the peak resident set size of the largest child process waited for, Git processes included.
+
+    Returns:
+        float: The peak RSS in MiB.
+    """
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # Linux reports kibibytes, macOS bytes
+    return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+
+def main(args: Optional[Namespace] = None) -> Dict[str, float]:
+    """
+    Replays a mix of matching and mismatching reports through `main.py` against local stand-ins
+    for GitHub repositories, and prints the throughput, latency percentiles and peak RSS.
+
+    Args:
+        args (Namespace, optional): The arguments, parsed from the command line if None.
+
+    Returns:
+        Dict[str, float]: The summary, see `run_load`.
+
+    Raises:
+        Exception: If the source tree or the report does not exist.
+    """
+    args = args or parse_arguments()
+    if not dir_exists(args.project_path):
+        raise Exception(f"The provided source tree: '{args.project_path}' does not exist.")
+    if not file_exists(args.report_path):
+        raise Exception(f"The provided Snyk report: '{args.report_path}' does not exist.")
+
+    with tempfile.TemporaryDirectory() as work_root:
+        bare_dirs: Dict[str, str] = {}
+        commits: Dict[str, Tuple[str, str]] = {}
+        for i in range(args.repos):
+            repo_url = f'{STAND_IN_OWNER}/project-{i}'
+            bare_dirs[repo_url] = os.path.join(work_root, 'remotes', f'project-{i}.git')
+            commits[repo_url] = create_stand_in_repository(args.project_path, bare_dirs[repo_url])
+
+        jobs = plan_jobs(commits, os.path.abspath(args.report_path), args.jobs, args.mismatch_ratio)
+        summary = run_load(jobs, args.concurrency, os.path.join(work_root, 'slots'),
+                           git_url_rewrite_env(bare_dirs), warm_up=not args.cold)
+
+    print(f"Jobs: {summary['jobs']} at concurrency {summary['concurrency']}")
+    print(f"Throughput: {summary['throughput']:.2f} jobs/s")
+    print(f"Latency: p50 {summary['p50'] * 1000:.0f} ms, p95 {summary['p95'] * 1000:.0f} ms, "
+          f"p99 {summary['p99'] * 1000:.0f} ms")
+    print(f"Peak RSS: {summary['peak_rss_mib']:.1f} MiB")
+    print(f"Unexpected verdicts: {summary['unexpected_verdicts']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(summary, output_file, indent=2)
+
+    return summary
+
+
+if __name__ == "__main__":
+    main()
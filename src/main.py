@@ -2,10 +2,9 @@ import argparse
 
 from argparse import Namespace
 
-from repository import clone_github_repository, checkout_to_commit, CommitNotValidException, RepoNotValidException
-from cli import process_source_code, InvalidLineException, InvalidContentException
-from report import SarifReport
-from utils import read_json_file, get_project_dir, file_exists
+from repository import ProjectCache
+from validator import ReportValidator, validate_sharded
+from utils import file_exists, is_github_repo_url, set_json_backend, JSON_BACKENDS
 
 
 def parse_arguments() -> Namespace:
@@ -18,9 +17,29 @@ def parse_arguments() -> Namespace:
     parser = argparse.ArgumentParser(description="Check if a Snyk Code report matches a repository and commit hash.")
     parser.add_argument("repo_url", type=str, help="GitHub repository URL.")
     parser.add_argument("commit_hash", type=str, help="Git commit hash.")
-    parser.add_argument("report_path", type=str, help="Snyk report utils path")
+    parser.add_argument("report_path", type=str, help="Snyk report JSON or compiled snapshot path")
     parser.add_argument("--debug", action='store_true', required=False,
                         help="Print a verbose report of what the program is doing and any error found")
+    parser.add_argument("--reference-repo", type=str, required=False, default=None,
+                        help="Local repository to share Git objects with when cloning")
+    parser.add_argument("--auto-reference", action='store_true', required=False,
+                        help="Share Git objects with an already cloned fork of the same project")
+    parser.add_argument("--cache-budget", type=int, required=False, default=None,
+                        help="Disk budget in bytes for the projects folder, least recently used projects are removed")
+    parser.add_argument("--baseline-commit", type=str, required=False, default=None,
+                        help="Commit hash a previous report was already validated against")
+    parser.add_argument("--baseline-report", type=str, required=False, default=None,
+                        help="Snyk report already validated against the baseline commit")
+    parser.add_argument("--workers", type=int, required=False, default=1,
+                        help="Number of processes verifying files, sharing the files read in memory")
+    parser.add_argument("--json-backend", type=str, required=False, default=None, choices=JSON_BACKENDS,
+                        help="JSON decoder for the reports, the fastest one installed by default")
+    parser.add_argument("--all-mismatches", action='store_true', required=False,
+                        help="Check every location and print the mismatches per file and rule")
+    parser.add_argument("--profile-memory", action='store_true', required=False,
+                        help="Print the peak and retained memory and the top allocation sites of every phase")
+    parser.add_argument("--shards", type=str, nargs='+', required=False, default=None,
+                        help="URLs of shard workers (see shard_worker.py) the report is split across")
 
     return parser.parse_args()
 
@@ -38,9 +57,18 @@ def validate_arguments(args):
     if not file_exists(args.report_path):
         raise Exception(f"The provided Snyk report: '{args.report_path}' does not exist.")
 
-    if not args.repo_url.startswith('https://github.com'):
+    if not is_github_repo_url(args.repo_url):
         raise Exception(f"The provided GitHub repo: '{args.repo_url}' is not valid.")
 
+    if (args.baseline_commit is None) != (args.baseline_report is None):
+        raise Exception("Both the baseline commit and the baseline report must be provided.")
+
+    if args.baseline_report is not None and not file_exists(args.baseline_report):
+        raise Exception(f"The provided baseline Snyk report: '{args.baseline_report}' does not exist.")
+
+    if args.shards and (args.baseline_commit is not None or args.all_mismatches):
+        raise Exception("Shards can't be combined with a baseline or with all mismatches.")
+
 
 def print_error(exception: Exception, debug: bool):
     """
@@ -208,35 +236,32 @@ def main() -> bool:
     args = parse_arguments()
     try:
         validate_arguments(args)
+        set_json_backend(args.json_backend)
 
-        repo_directory = get_project_dir(args.repo_url)
+        validator = ReportValidator(ProjectCache(max_bytes=args.cache_budget), args.reference_repo,
+                                    args.auto_reference, args.workers, args.profile_memory)
 
-        clone_github_repository(args.repo_url, repo_directory)
+        if args.shards:
+            result = validate_sharded(args.repo_url, args.commit_hash, args.report_path, args.shards)
+        else:
+            result = validator.validate(args.repo_url, args.commit_hash, args.report_path,
+                                        args.baseline_commit, args.baseline_report, args.all_mismatches)
 
-        checkout_to_commit(repo_directory, args.commit_hash)
+        if result.summary is not None:
+            print(result.summary.to_string())
 
-        report_data = read_json_file(args.report_path)
+        for phase in result.memory.values():
+            print(phase.to_string())
 
-        sarif_report = SarifReport(report_data)
+        if result.matches:
+            if args.debug:
+                for r in result.code_reports:
+                    print(r.to_string())
 
-        result = process_source_code(repo_directory, sarif_report)
+            # Return `true` if the program detected the report matches the repo and hash
+            return True
 
-        if args.debug:
-            for r in result:
-                print(r.to_string())
-
-        # Return `true` if the program detected the report matches the repo and hash
-        return True
-    except InvalidLineException as e:
-        print_error(e, args.debug)
-    except InvalidContentException as e:
-        print_error(e, args.debug)
-    except CommitNotValidException as e:
-        print_error(e, args.debug)
-    except FileNotFoundError as e:
-        print_error(e, args.debug)
-    except RepoNotValidException as e:
-        print_error(e, args.debug)
+        print_error(result.error, args.debug)
     except Exception as e:
         print_error(e, args.debug)
 
@@ -1 +1,3 @@
 from .sarif import *
+from .snapshot import *
+from .precheck import *
@@ -0,0 +1,151 @@
+import operator
+import posixpath
+from typing import Dict, List, Optional, Union
+
+from .sarif import SarifReport, CodeRegion
+from .snapshot import SnapshotReport, MISSING_VALUE, REGION_KEYS, LOCATION_FIELDS
+
+
+class InvalidReportException(Exception):
+    def __init__(self, message, code_file_path: Optional[str] = None, code_region: Optional[CodeRegion] = None):
+        super().__init__(message)
+        self.code_file_path = code_file_path
+        self.code_region = code_region
+
+    def __reduce__(self):
+        # Keeps the failing location when pickled
+        return self.__class__, (self.args[0], self.code_file_path, self.code_region)
+
+
+def check_report_structure(sarif_report: Union[SarifReport, SnapshotReport]):
+    """
+    Checks that every location of a Snyk Code report could match a repository, without reading it.
+
+    A location can never match if it has no artifact location URI or no region, if a region value is
+    missing or not an integer, if its lines are not `1 <= startLine <= endLine`, if its `startColumn`
+    is below 1, or if its URI is absolute or escapes the repository root. Such reports are rejected
+    before the repository is cloned.
+
+    The JSON of a report is read with `.get`, so reports missing any part of the SARIF structure
+    the validator reads are rejected as well, instead of failing later with a KeyError.
+
+    The locations of a snapshot are checked in bulk over its table of integers, see
+    `SnapshotReport.location_table`, and only walked one by one to tell which location is invalid.
+
+    Args:
+        sarif_report (SarifReport | SnapshotReport): The Snyk Code report to check.
+
+    Raises:
+        InvalidReportException: For the first invalid location, in report order.
+    """
+    if isinstance(sarif_report, SnapshotReport):
+        _check_snapshot_structure(sarif_report)
+        return
+
+    checked_uris: Dict[str, bool] = {}
+    data = sarif_report.data if isinstance(sarif_report.data, dict) else None
+    for run in _get_list(data, 'runs', "The report"):
+        for result in _get_list(run, 'results', "A run of the report", required=True):
+            for location in _get_list(result, 'locations', "A result of the report"):
+                _check_physical_location(_get(location, 'physicalLocation'), checked_uris)
+            for code_flow in _get_list(result, 'codeFlows', "A result of the report"):
+                for thread_flow in _get_list(code_flow, 'threadFlows', "A code flow of the report"):
+                    for thread_location in _get_list(thread_flow, 'locations', "A thread flow of the report"):
+                        _check_physical_location(_get(_get(thread_location, 'location'), 'physicalLocation'),
+                                                 checked_uris)
+
+
+def check_region(uri: str, region: CodeRegion, relative_uri: bool = True):
+    """
+    Checks that a location could match a repository, see `check_report_structure`.
+
+    Args:
+        uri (str): The artifact location URI.
+        region (CodeRegion): The region.
+        relative_uri (bool): Whether the URI stays inside the repository root, see `is_relative_uri`.
+
+    Raises:
+        InvalidReportException: If the location can never match.
+    """
+    if not relative_uri:
+        raise InvalidReportException(f"The location '{uri}' is outside of the repository.", uri, region)
+
+    data = region.data if isinstance(region.data, dict) else {}
+    for key in REGION_KEYS:
+        # Booleans are integers in Python, but not in JSON
+        if type(data.get(key)) is not int:
+            raise InvalidReportException(f"The region of '{uri}' has no integer '{key}'.", uri, region)
+
+    if data['startLine'] < 1 or data['startLine'] > data['endLine']:
+        raise InvalidReportException(f"The region of '{uri}' spans the lines {data['startLine']} to "
+                                     f"{data['endLine']}.", uri, region)
+    if data['startColumn'] < 1:
+        raise InvalidReportException(f"The region of '{uri}' starts at column {data['startColumn']}.",
+                                     uri, region)
+
+
+def is_relative_uri(uri: str) -> bool:
+    """
+    Checks whether an artifact location URI is a path inside the repository root.
+
+    Args:
+        uri (str): The artifact location URI.
+
+    Returns:
+        bool: False if the URI is empty, absolute, has a scheme or a drive, or escapes the root with `..`.
+    """
+    if not isinstance(uri, str) or not uri or '\x00' in uri:
+        return False
+    path = uri.replace('\\', '/')
+    if path.startswith('/') or ':' in path.split('/', 1)[0]:
+        return False
+    path = posixpath.normpath(path)
+    return path != '..' and not path.startswith('../')
+
+
+def _check_physical_location(physical_location: Optional[Dict], checked_uris: Dict[str, bool]):
+    uri = _get(_get(physical_location, 'artifactLocation'), 'uri')
+    if not isinstance(uri, str):
+        raise InvalidReportException("A location of the report has no artifact location 'uri'.")
+    region = _get(physical_location, 'region')
+    if not isinstance(region, dict):
+        raise InvalidReportException(f"The location '{uri}' has no 'region'.", uri)
+
+    if uri not in checked_uris:
+        checked_uris[uri] = is_relative_uri(uri)
+    check_region(uri, CodeRegion(region), checked_uris[uri])
+
+
+def _get(data: Optional[Dict], key: str):
+    return data.get(key) if isinstance(data, dict) else None
+
+
+def _get_list(data: Optional[Dict], key: str, owner: str, required: bool = False) -> List:
+    if not isinstance(data, dict):
+        raise InvalidReportException(f"{owner} is not a JSON object.")
+    value = data.get(key, None if required else [])
+    if not isinstance(value, list):
+        raise InvalidReportException(f"{owner} has no list of '{key}'.")
+    return value
+
+
+def _check_snapshot_structure(snapshot_report: SnapshotReport):
+    table = snapshot_report.location_table
+    uri_indexes = table[0::LOCATION_FIELDS]
+    start_lines, end_lines, start_columns, end_columns = (table[1 + i::LOCATION_FIELDS]
+                                                          for i in range(len(REGION_KEYS)))
+    if not len(uri_indexes):
+        return
+
+    # Missing values are the smallest integers, so they fail the minimum checks as well
+    relative_uris = [is_relative_uri(uri) for uri in snapshot_report.strings]
+    if (min(start_lines) >= 1 and min(start_columns) >= 1
+            and min(end_lines) != MISSING_VALUE and min(end_columns) != MISSING_VALUE
+            and not any(map(operator.gt, start_lines, end_lines))
+            and all(relative_uris[index] for index in set(uri_indexes))):
+        return
+
+    # The table holds unique locations, so the first invalid one is found in report order
+    for location in snapshot_report.iter_locations():
+        uri = location.artifact_location_uri
+        check_region(uri, location.region, is_relative_uri(uri))
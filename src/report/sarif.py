@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 
 
 class CodeRegion:
@@ -66,10 +66,29 @@ class CodeFlow:
         return [ThreadFlow(thread_flow) for thread_flow in self.data.get("threadFlows", [])]
 
 
+class ReportLocation:
+    def __init__(self, rule_id: Optional[str], artifact_location_uri: str, region: CodeRegion):
+        """
+        Initializes a ReportLocation object.
+
+        Args:
+            rule_id (str, optional): The id of the rule of the result the location belongs to.
+            artifact_location_uri (str): The location of the code file relative to the project directory.
+            region (CodeRegion): The code region specifying start and end positions.
+        """
+        self.rule_id = rule_id
+        self.artifact_location_uri = artifact_location_uri
+        self.region = region
+
+
 class SarifResult:
     def __init__(self, data: Dict):
         self.data = data
 
+    @property
+    def rule_id(self) -> Optional[str]:
+        return self.data.get("ruleId")
+
     @property
     def locations(self) -> List[CodeLocation]:
         return [CodeLocation(code_location) for code_location in self.data.get("locations", [])]
@@ -79,6 +98,19 @@ class SarifResult:
         return [CodeFlow(code_flow) for code_flow in self.data.get("codeFlows", [])]
 
 
+class SarifArtifact:
+    def __init__(self, data: Dict):
+        self.data = data
+
+    @property
+    def location_uri(self) -> Optional[str]:
+        return self.data.get("location", {}).get("uri")
+
+    @property
+    def hashes(self) -> Dict[str, str]:
+        return self.data.get("hashes", {})
+
+
 class SarifRun:
     def __init__(self, data: Dict):
         self.data = data
@@ -87,6 +119,10 @@ class SarifRun:
     def results(self) -> List[SarifResult]:
         return [SarifResult(result) for result in self.data["results"]]
 
+    @property
+    def artifacts(self) -> List[SarifArtifact]:
+        return [SarifArtifact(artifact) for artifact in self.data.get("artifacts", [])]
+
 
 class SarifReport:
     def __init__(self, data: Dict):
@@ -95,3 +131,38 @@ class SarifReport:
     @property
     def runs(self) -> List[SarifRun]:
         return [SarifRun(run) for run in self.data.get("runs", [])]
+
+    @property
+    def artifact_hashes(self) -> Dict[str, Dict[str, str]]:
+        """
+        The content hashes of the scanned files, from the `artifacts` of every run.
+
+        Returns:
+            Dict[str, Dict[str, str]]: The hashes by algorithm (e.g. "sha-256") for every artifact location URI.
+        """
+        artifact_hashes: Dict[str, Dict[str, str]] = {}
+        for run in self.runs:
+            for artifact in run.artifacts:
+                if artifact.location_uri is not None and artifact.hashes:
+                    artifact_hashes.setdefault(artifact.location_uri, {}).update(artifact.hashes)
+        return artifact_hashes
+
+    def iter_locations(self) -> Iterator[ReportLocation]:
+        """
+        Iterates over every location of the report, code flow locations included.
+
+        For each result, its locations are yielded first and then the locations of its code flows.
+
+        Yields:
+            ReportLocation: The locations in report order.
+        """
+        for run in self.runs:
+            for result in run.results:
+                rule_id = result.rule_id
+                for location in result.locations:
+                    yield ReportLocation(rule_id, location.artifact_location_uri, location.region)
+                for code_flow in result.code_flows:
+                    for thread_flow in code_flow.thread_flows:
+                        for thread_location in thread_flow.locations:
+                            yield ReportLocation(rule_id, thread_location.artifact_location_uri,
+                                                 thread_location.region)
@@ -0,0 +1,226 @@
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils import read_json_file
+from .sarif import SarifReport, CodeRegion, ReportLocation
+
+SNAPSHOT_MAGIC = b'SRFSNAP\x00'
+SNAPSHOT_VERSION = 2
+
+# magic, version, number of strings, string blob length, number of locations, number of entries,
+# number of artifact hashes
+HEADER_FORMAT = '<8sIIIIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Sentinel for region values missing in the report
+MISSING_VALUE = -2 ** 31
+NO_RULE = -1
+
+REGION_KEYS = ("startLine", "endLine", "startColumn", "endColumn")
+LOCATION_FIELDS = 1 + len(REGION_KEYS)
+
+
+class SnapshotReport:
+    def __init__(self, snapshot_path: str):
+        """
+        Initializes a SnapshotReport object from a snapshot compiled with `compile_snapshot`.
+
+        The snapshot is memory-mapped, so loading it does not parse the report again.
+
+        Args:
+            snapshot_path (str): The path to the snapshot file.
+
+        Raises:
+            ValueError: If the file is not a valid snapshot.
+        """
+        with open(snapshot_path, 'rb') as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, string_count, blob_length, location_count, entry_count, hash_count = \
+            struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"'{snapshot_path}' is not a valid report snapshot.")
+
+        offset = HEADER_SIZE
+        string_offsets = _read_int_array(self._mmap, offset, string_count + 1)
+        offset += (string_count + 1) * 4
+        blob = bytes(self._mmap[offset: offset + blob_length])
+        offset += _padded(blob_length)
+        self.strings: List[str] = [blob[string_offsets[i]: string_offsets[i + 1]].decode('utf-8')
+                                   for i in range(string_count)]
+
+        self._locations = _read_int_array(self._mmap, offset, location_count * LOCATION_FIELDS)
+        offset += location_count * LOCATION_FIELDS * 4
+        self._entries = _read_int_array(self._mmap, offset, entry_count * 2)
+        offset += entry_count * 2 * 4
+        self._hashes = _read_int_array(self._mmap, offset, hash_count * 3)
+
+    @property
+    def artifact_hashes(self) -> Dict[str, Dict[str, str]]:
+        """
+        The content hashes of the scanned files, like `SarifReport.artifact_hashes`.
+
+        Returns:
+            Dict[str, Dict[str, str]]: The hashes by algorithm for every artifact location URI.
+        """
+        artifact_hashes: Dict[str, Dict[str, str]] = {}
+        for i in range(0, len(self._hashes), 3):
+            uri, algorithm, digest = (self.strings[self._hashes[i + j]] for j in range(3))
+            artifact_hashes.setdefault(uri, {})[algorithm] = digest
+        return artifact_hashes
+
+    @property
+    def location_table(self):
+        """
+        The unique locations of the report, as a flat table of integers.
+
+        Every location takes `LOCATION_FIELDS` integers: the index of its URI in `strings`, then its
+        region values in `REGION_KEYS` order, `MISSING_VALUE` for those missing in the report.
+
+        Returns:
+            memoryview | array: The table, a view over the memory-mapped file on little-endian hosts.
+        """
+        return self._locations
+
+    def iter_locations(self) -> Iterator[ReportLocation]:
+        """
+        Iterates over every location of the report, in the same order as `SarifReport.iter_locations`.
+
+        Yields:
+            ReportLocation: The locations in report order.
+        """
+        strings = self.strings
+        locations = self._locations
+        entries = self._entries
+        for i in range(0, len(entries), 2):
+            rule_index = entries[i]
+            base = entries[i + 1] * LOCATION_FIELDS
+            region = {key: locations[base + 1 + j] for j, key in enumerate(REGION_KEYS)
+                      if locations[base + 1 + j] != MISSING_VALUE}
+            yield ReportLocation(strings[rule_index] if rule_index != NO_RULE else None,
+                                 strings[locations[base]], CodeRegion(region))
+
+    def close(self):
+        """
+        Releases the memory-mapped snapshot file.
+        """
+        if isinstance(self._locations, memoryview):
+            self._locations.release()
+            self._entries.release()
+            self._hashes.release()
+        self._mmap.close()
+
+
+def compile_snapshot(sarif_report: SarifReport, snapshot_path: str):
+    """
+    Compiles a Snyk Code report into a compact binary snapshot.
+
+    Strings (URIs, rule ids and artifact hashes) are interned, and locations repeated across
+    results and code flows are stored once in a table of integers.
+
+    Args:
+        sarif_report (SarifReport): The Snyk Code report to compile.
+        snapshot_path (str): The path where the snapshot will be written.
+
+    Raises:
+        ValueError: If a region value is not an integer.
+    """
+    string_indexes: Dict[str, int] = {}
+    location_indexes: Dict[Tuple, int] = {}
+    locations = array('i')
+    entries = array('i')
+    hashes = array('i')
+
+    def intern(value: str) -> int:
+        if value not in string_indexes:
+            string_indexes[value] = len(string_indexes)
+        return string_indexes[value]
+
+    for location in sarif_report.iter_locations():
+        region = location.region.data
+        values = tuple(_region_value(region.get(key)) for key in REGION_KEYS)
+        key = (location.artifact_location_uri,) + values
+        if key not in location_indexes:
+            location_indexes[key] = len(location_indexes)
+            locations.append(intern(location.artifact_location_uri))
+            locations.extend(values)
+        entries.append(intern(location.rule_id) if location.rule_id is not None else NO_RULE)
+        entries.append(location_indexes[key])
+
+    for uri, uri_hashes in sarif_report.artifact_hashes.items():
+        for algorithm, digest in uri_hashes.items():
+            hashes.extend((intern(uri), intern(algorithm), intern(digest)))
+
+    encoded_strings = [value.encode('utf-8') for value in string_indexes]
+    string_offsets = array('i', [0])
+    for encoded in encoded_strings:
+        string_offsets.append(string_offsets[-1] + len(encoded))
+    blob = b''.join(encoded_strings)
+
+    if sys.byteorder != 'little':
+        for int_array in (string_offsets, locations, entries, hashes):
+            int_array.byteswap()
+
+    with open(snapshot_path, 'wb') as snapshot_file:
+        snapshot_file.write(struct.pack(HEADER_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(encoded_strings),
+                                        len(blob), len(location_indexes), len(entries) // 2, len(hashes) // 3))
+        snapshot_file.write(string_offsets.tobytes())
+        snapshot_file.write(blob.ljust(_padded(len(blob)), b'\x00'))
+        snapshot_file.write(locations.tobytes())
+        snapshot_file.write(entries.tobytes())
+        snapshot_file.write(hashes.tobytes())
+
+
+def is_snapshot(file_path: str) -> bool:
+    """
+    Checks whether a file is a report snapshot.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        bool: True if the file starts with the snapshot magic bytes, otherwise False.
+    """
+    with open(file_path, 'rb') as report_file:
+        return report_file.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+
+def load_report(report_path: str):
+    """
+    Loads a Snyk Code report either from its JSON file or from a compiled snapshot.
+
+    Args:
+        report_path (str): The path to the report JSON file or snapshot.
+
+    Returns:
+        SarifReport | SnapshotReport: The loaded report.
+    """
+    if is_snapshot(report_path):
+        return SnapshotReport(report_path)
+    return SarifReport(read_json_file(report_path))
+
+
+def _region_value(value: Optional[int]) -> int:
+    if value is None:
+        return MISSING_VALUE
+    if not isinstance(value, int) or not MISSING_VALUE < value < 2 ** 31:
+        raise ValueError(f"Invalid region value: {value}")
+    return value
+
+
+def _read_int_array(buffer, offset: int, count: int):
+    if sys.byteorder == 'little':
+        # Zero-copy view over the memory-mapped file
+        return memoryview(buffer)[offset: offset + count * 4].cast('i')
+    int_array = array('i', buffer[offset: offset + count * 4])
+    int_array.byteswap()
+    return int_array
+
+
+def _padded(length: int) -> int:
+    # Keeps the integer arrays that follow 4-byte aligned
+    return (length + 3) // 4 * 4
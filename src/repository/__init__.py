@@ -1 +1,3 @@
 from .github import *
+from .cache import *
+from .prefetch import *
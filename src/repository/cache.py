@@ -0,0 +1,239 @@
+import fcntl
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from utils import dir_exists, file_exists, get_dir_size, get_project_dir, is_path_component
+from .github import RepoNotValidException
+
+INDEX_FILE_NAME = '.cache-index.json'
+INDEX_LOCK_FILE_NAME = '.cache-index.lock'
+LOCK_FILE_SUFFIX = '.lock'
+
+
+class ProjectCache:
+    def __init__(self, projects_dir: str = 'projects', max_bytes: Optional[int] = None):
+        """
+        Initializes a ProjectCache object.
+
+        The cache records when every cloned project was last used and how much disk it
+        takes, and evicts the least recently used projects to stay under `max_bytes`.
+        A project is in use while a process holds a shared lock on its lock file
+        (`projects/<owner>/<repo>.lock`), and projects in use are never evicted.
+
+        Args:
+            projects_dir (str): The directory where all projects are cloned.
+            max_bytes (int, optional): The disk budget in bytes. No bookkeeping is done if None.
+        """
+        self.projects_dir = projects_dir
+        self.max_bytes = max_bytes
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.projects_dir, INDEX_FILE_NAME)
+
+    def project_dir(self, repo_url: str) -> str:
+        """
+        Gets the directory where a repository is cloned.
+
+        Args:
+            repo_url (str): The URL of the repository.
+
+        Returns:
+            str: The path to the project directory.
+
+        Raises:
+            RepoNotValidException: If the project directory would be outside of the projects directory.
+        """
+        try:
+            return get_project_dir(repo_url, self.projects_dir)
+        except ValueError as e:
+            raise RepoNotValidException(str(e))
+
+    @contextmanager
+    def use(self, repo_url: str) -> Iterator[str]:
+        """
+        Marks a project as in use for the duration of the context.
+
+        Args:
+            repo_url (str): The URL of the repository.
+
+        Yields:
+            str: The path to the project directory.
+        """
+        project_dir = self.project_dir(repo_url)
+
+        if self.max_bytes is None:
+            yield project_dir
+            return
+
+        try:
+            with self._shared_lock(project_dir):
+                self._touch(project_dir, time.time())
+                try:
+                    yield project_dir
+                finally:
+                    self._touch(project_dir, time.time(), get_dir_size(project_dir))
+        finally:
+            self.evict()
+
+    @contextmanager
+    def hold(self, project_dir: Optional[str]) -> Iterator[Optional[str]]:
+        """
+        Keeps a cloned project from being evicted for the duration of the context, e.g. the
+        reference repository of a clone until the clone records it in its alternates.
+
+        Args:
+            project_dir (str, optional): The project directory. Directories outside of the cache are not locked.
+
+        Yields:
+            Optional[str]: The project directory, or None if it was evicted before it could be locked.
+        """
+        if project_dir is None or self.max_bytes is None or not self._is_project_path(project_dir):
+            yield project_dir
+            return
+
+        with self._shared_lock(project_dir):
+            yield project_dir if dir_exists(project_dir) else None
+
+    def evict(self) -> List[str]:
+        """
+        Removes the least recently used projects until the cache fits the disk budget.
+
+        Projects in use, and projects other clones borrow objects from, are kept.
+
+        Returns:
+            List[str]: The project directories that were removed.
+        """
+        if self.max_bytes is None:
+            return []
+
+        evicted: List[str] = []
+        with self._index_lock():
+            entries = self._read_index()
+            self._discover(entries)
+            total_size = sum(entry['size'] for entry in entries.values())
+            referenced = self._referenced_project_dirs(entries)
+
+            for project_dir, entry in sorted(entries.items(), key=lambda item: item[1]['last_used']):
+                if total_size <= self.max_bytes:
+                    break
+                if os.path.abspath(project_dir) in referenced or not self._is_project_path(project_dir):
+                    continue
+                if self._remove_if_unused(project_dir):
+                    total_size -= entry['size']
+                    evicted.append(project_dir)
+
+            for project_dir in evicted:
+                del entries[project_dir]
+            self._write_index(entries)
+
+        return evicted
+
+    def _touch(self, project_dir: str, last_used: float, size: Optional[int] = None):
+        with self._index_lock():
+            entries = self._read_index()
+            entry = entries.setdefault(project_dir, {'size': 0})
+            entry['last_used'] = last_used
+            if size is not None:
+                entry['size'] = size
+            self._write_index(entries)
+
+    def _discover(self, entries: Dict[str, Dict]):
+        # Projects cloned before the cache was enabled are not in the index yet
+        for owner in os.listdir(self.projects_dir):
+            owner_dir = os.path.join(self.projects_dir, owner)
+            if not dir_exists(owner_dir):
+                continue
+            for repo in os.listdir(owner_dir):
+                project_dir = os.path.join(owner_dir, repo)
+                if project_dir not in entries and dir_exists(os.path.join(project_dir, '.git')):
+                    entries[project_dir] = {
+                        'size': get_dir_size(project_dir),
+                        'last_used': os.path.getmtime(project_dir),
+                    }
+
+        for project_dir in [project_dir for project_dir in entries if not dir_exists(project_dir)]:
+            del entries[project_dir]
+
+    @staticmethod
+    def _referenced_project_dirs(entries: Dict[str, Dict]) -> set:
+        # Removing a project that other clones use through git alternates would corrupt them
+        referenced = set()
+        for project_dir in entries:
+            alternates_path = os.path.join(project_dir, '.git', 'objects', 'info', 'alternates')
+            if not file_exists(alternates_path):
+                continue
+            with open(alternates_path, 'r') as alternates:
+                for objects_dir in alternates.read().splitlines():
+                    if objects_dir.strip():
+                        objects_dir = os.path.join(project_dir, '.git', 'objects', objects_dir.strip())
+                        referenced.add(os.path.dirname(os.path.dirname(os.path.abspath(objects_dir))))
+        return referenced
+
+    def _is_project_path(self, project_dir: str) -> bool:
+        # Only real directories at `<owner>/<repo>` below the projects directory are ever removed
+        if os.path.islink(project_dir):
+            return False
+        components = os.path.relpath(os.path.realpath(project_dir), os.path.realpath(self.projects_dir)).split(os.sep)
+        return len(components) == 2 and all(is_path_component(component) for component in components)
+
+    @staticmethod
+    def _remove_if_unused(project_dir: str) -> bool:
+        with open(project_dir + LOCK_FILE_SUFFIX, 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                shutil.rmtree(project_dir)
+            finally:
+                os.remove(project_dir + LOCK_FILE_SUFFIX)
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return True
+
+    @staticmethod
+    @contextmanager
+    def _shared_lock(project_dir: str) -> Iterator[None]:
+        os.makedirs(os.path.dirname(project_dir), exist_ok=True)
+        while True:
+            lock_file = open(project_dir + LOCK_FILE_SUFFIX, 'a')
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            try:
+                # The lock file may have been removed by an eviction while waiting for the lock
+                if os.fstat(lock_file.fileno()).st_ino == os.stat(lock_file.name).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    @contextmanager
+    def _index_lock(self) -> Iterator[None]:
+        os.makedirs(self.projects_dir, exist_ok=True)
+        with open(os.path.join(self.projects_dir, INDEX_LOCK_FILE_NAME), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_index(self) -> Dict[str, Dict]:
+        if not file_exists(self.index_path):
+            return {}
+        with open(self.index_path, 'r') as index_file:
+            return json.load(index_file)
+
+    def _write_index(self, entries: Dict[str, Dict]):
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w') as index_file:
+            json.dump(entries, index_file)
+        os.replace(temp_path, self.index_path)
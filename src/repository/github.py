@@ -1,7 +1,22 @@
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
 import git
 from git.exc import GitCommandError, InvalidGitRepositoryError
 from utils import dir_exists
 
+# Hunks of every changed file as `(old_start, old_count, new_start, new_count)` tuples
+ChangedLineRanges = Dict[str, Optional[List[Tuple[int, int, int, int]]]]
+
+LS_TREE_BATCH_SIZE = 1000
+
+HUNK_HEADER_PATTERN = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+# Escapes of the paths git quotes, even with `core.quotepath=off`, besides `\<octal>` bytes
+OCTAL_ESCAPE_PATTERN = re.compile(r'[0-7]{3}')
+QUOTED_PATH_ESCAPES = {'a': 7, 'b': 8, 't': 9, 'n': 10, 'v': 11, 'f': 12, 'r': 13, '"': 34, '\\': 92}
+
 
 class CommitNotValidException(Exception):
     def __init__(self, message):
@@ -13,33 +28,49 @@ class RepoNotValidException(Exception):
         super().__init__(message)
 
 
-def clone_github_repository(repo_url, destination_dir):
+class DiffParseException(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+def clone_github_repository(repo_url, destination_dir, reference_dir=None):
     """
     Clone a GitHub repository to a destination directory if it doesn't already exist.
 
+    When a reference repository is given, the clone borrows its objects through
+    git alternates and only fetches the objects the reference does not have.
+
     Args:
         repo_url (str): The URL of the GitHub repository.
         destination_dir (str): The directory where the repository will be cloned.
+        reference_dir (str, optional): A local repository to share objects with.
 
     Raises:
         RepoNotValidException: If cloning or repository validation fails.
     """
     try:
         if not dir_exists(destination_dir):
-            git.Repo.clone_from(repo_url, destination_dir)
+            if reference_dir:
+                # `--reference-if-able` falls back to a full clone if the reference disappeared
+                git.Repo.clone_from(repo_url, destination_dir, reference_if_able=reference_dir)
+            else:
+                git.Repo.clone_from(repo_url, destination_dir)
     except GitCommandError as e:
         raise RepoNotValidException(f"Failed to clone repository: {e}")
     except InvalidGitRepositoryError as e:
         raise RepoNotValidException(f"'{destination_dir}' is not a valid Git repository: {e}")
 
 
-def checkout_to_commit(repo_path, commit_hash):
+def checkout_to_commit(repo_path, commit_hash) -> str:
     """
     Checkout to a specific commit in a Git repository.
 
     Args:
         repo_path (str): The path to the Git repository.
-        commit_hash (str): The commit hash to check out.
+        commit_hash (str): The commit hash to check out, or any other revision such as a branch or a short hash.
+
+    Returns:
+        str: The full hash of the commit checked out.
 
     Raises:
         CommitNotValidException: If checking out to the commit fails.
@@ -47,5 +78,257 @@ def checkout_to_commit(repo_path, commit_hash):
     try:
         repo = git.Repo(repo_path)
         repo.git.checkout(commit_hash)
+        return repo.head.commit.hexsha
+    except GitCommandError as e:
+        raise CommitNotValidException(f"Failed to checkout to commit: {commit_hash}\nError: {e}")
+
+
+def has_commit(repo_path, commit_hash) -> bool:
+    """
+    Check whether a commit is already in a Git repository.
+
+    Args:
+        repo_path (str): The path to the Git repository.
+        commit_hash (str): The commit hash to look for.
+
+    Returns:
+        bool: True if the repository exists and has the commit, False otherwise.
+    """
+    if not dir_exists(repo_path):
+        return False
+
+    try:
+        repo = git.Repo(repo_path)
+        repo.git.cat_file('-e', f'{commit_hash}^{{commit}}')
+        return True
+    except (GitCommandError, InvalidGitRepositoryError):
+        return False
+
+
+def fetch_commit(repo_path, commit_hash):
+    """
+    Fetch a commit from the origin of a Git repository if it isn't there yet.
+
+    Args:
+        repo_path (str): The path to the Git repository.
+        commit_hash (str): The commit hash to fetch.
+
+    Raises:
+        CommitNotValidException: If fetching fails.
+    """
+    if has_commit(repo_path, commit_hash):
+        return
+
+    try:
+        repo = git.Repo(repo_path)
+        repo.git.fetch('origin')
+        if not has_commit(repo_path, commit_hash):
+            # Commits not reachable from any branch can still be fetched by hash
+            repo.git.fetch('origin', commit_hash)
+    except GitCommandError as e:
+        raise CommitNotValidException(f"Failed to fetch commit: {commit_hash}\nError: {e}")
+
+
+def find_reference_repository(destination_dir: str) -> Optional[str]:
+    """
+    Find a sibling clone of the same upstream project to use as a reference repository.
+
+    Projects are cloned into `projects/<owner>/<repo>`, so forks of the same upstream
+    usually live in `projects/<other_owner>/<repo>`.
+
+    Args:
+        destination_dir (str): The directory where the repository will be cloned.
+
+    Returns:
+        Optional[str]: The path to a sibling clone, or None if there is none.
+    """
+    destination_dir = os.path.normpath(destination_dir)
+    repo_name = os.path.basename(destination_dir)
+    projects_dir = os.path.dirname(os.path.dirname(destination_dir))
+
+    if not dir_exists(projects_dir):
+        return None
+
+    for owner in sorted(os.listdir(projects_dir)):
+        candidate = os.path.join(projects_dir, owner, repo_name)
+        if candidate != destination_dir and dir_exists(os.path.join(candidate, '.git')):
+            return candidate
+
+    return None
+
+
+def get_recently_changed_files(repo_path, commit_hash, max_count=50) -> List[str]:
+    """
+    Get the files changed in the most recent commits up to a specific commit.
+
+    Args:
+        repo_path (str): The path to the Git repository.
+        commit_hash (str): The commit hash to start from.
+        max_count (int): The number of commits to look at.
+
+    Returns:
+        List[str]: The changed files, the most recently changed first.
+
+    Raises:
+        CommitNotValidException: If the commit is not found.
+    """
+    try:
+        repo = git.Repo(repo_path)
+        log = repo.git(c='core.quotepath=off').log(commit_hash, '--name-only', '--format=', '--no-renames',
+                                                   max_count=max_count)
+    except GitCommandError as e:
+        raise CommitNotValidException(f"Failed to read the history of commit: {commit_hash}\nError: {e}")
+
+    return list(dict.fromkeys(path for path in log.splitlines() if path))
+
+
+def get_blob_ids(repo_path, commit_hash, paths) -> Dict[str, str]:
+    """
+    Get the Git blob ids of files at a specific commit.
+
+    Args:
+        repo_path (str): The path to the Git repository.
+        commit_hash (str): The commit hash.
+        paths (Iterable[str]): The paths of the files, relative to the repository.
+
+    Returns:
+        Dict[str, str]: The blob id of every path found at the commit.
+
+    Raises:
+        CommitNotValidException: If the commit is not found.
+    """
+    paths = list(paths)
+    blob_ids: Dict[str, str] = {}
+    if not paths:
+        return blob_ids
+
+    try:
+        repo = git.Repo(repo_path)
+        # Batches keep the command line under the system limit
+        tree = '\0'.join(repo.git(c='core.quotepath=off').ls_tree(commit_hash, '--full-tree', '-z', '--',
+                                                                  *paths[i: i + LS_TREE_BATCH_SIZE])
+                         for i in range(0, len(paths), LS_TREE_BATCH_SIZE))
     except GitCommandError as e:
-        raise CommitNotValidException(f"Failed to checkout to commit: {commit_hash}\nError: {e}")
\ No newline at end of file
+        raise CommitNotValidException(f"Failed to list the files of commit: {commit_hash}\nError: {e}")
+
+    for entry in tree.split('\0'):
+        if not entry:
+            continue
+        # "<mode> <type> <object>\t<path>"
+        info, path = entry.split('\t', 1)
+        _, object_type, object_id = info.split(' ')
+        if object_type == 'blob':
+            blob_ids[path] = object_id
+    return blob_ids
+
+
+def get_changed_line_ranges(repo_path, base_commit_hash, commit_hash) -> ChangedLineRanges:
+    """
+    Get the files and line ranges that changed between two commits.
+
+    Args:
+        repo_path (str): The path to the Git repository.
+        base_commit_hash (str): The commit hash to compare from.
+        commit_hash (str): The commit hash to compare to.
+
+    Returns:
+        ChangedLineRanges: For every changed file, the list of hunks, or None if the file was
+            added, deleted or is binary.
+
+    Raises:
+        CommitNotValidException: If any of the commits is not found.
+        DiffParseException: If the diff cannot be read, see `parse_unified_diff`.
+    """
+    try:
+        repo = git.Repo(repo_path)
+        # The prefixes are explicit, so `diff.noprefix` and `diff.mnemonicPrefix` do not change the headers
+        diff = repo.git(c='core.quotepath=off').diff(base_commit_hash, commit_hash, '--unified=0',
+                                                     '--no-renames', '--no-color', '--no-ext-diff',
+                                                     '--src-prefix=a/', '--dst-prefix=b/')
+    except GitCommandError as e:
+        raise CommitNotValidException(f"Failed to diff commits: {base_commit_hash}..{commit_hash}\nError: {e}")
+
+    return parse_unified_diff(diff)
+
+
+def parse_unified_diff(diff: str) -> ChangedLineRanges:
+    """
+    Parse the hunks of a `git diff --unified=0 --no-renames` output.
+
+    Args:
+        diff (str): The diff output.
+
+    Returns:
+        ChangedLineRanges: For every changed file, the list of hunks, or None if the file was
+            added, deleted or is binary.
+
+    Raises:
+        DiffParseException: If a file header or a hunk header cannot be read, so that no changed
+            file is left out of the result.
+    """
+    changed_line_ranges: ChangedLineRanges = {}
+    path = None
+    in_header = False
+
+    for line in diff.split('\n'):
+        if line.startswith('diff --git '):
+            path = parse_diff_header_path(line)
+            if path is None:
+                raise DiffParseException(f"Failed to read the diff header: {line}")
+            changed_line_ranges[path] = []
+            in_header = True
+        elif path is None:
+            continue
+        elif in_header and (line in ('--- /dev/null', '+++ /dev/null') or line.startswith('Binary files ')):
+            changed_line_ranges[path] = None
+        elif line.startswith('@@'):
+            in_header = False
+            match = HUNK_HEADER_PATTERN.match(line)
+            if not match:
+                raise DiffParseException(f"Failed to read the hunk header of '{path}': {line}")
+            if changed_line_ranges[path] is not None:
+                old_start, old_count, new_start, new_count = match.groups()
+                changed_line_ranges[path].append((int(old_start), int(old_count or 1),
+                                                  int(new_start), int(new_count or 1)))
+
+    return changed_line_ranges
+
+
+def parse_diff_header_path(header: str) -> Optional[str]:
+    """
+    Parse the path of a `diff --git a/<path> b/<path>` header, without renames.
+
+    Paths with a double quote, a backslash or a control character are C-quoted by git, as in
+    `diff --git "a/<path>" "b/<path>"`, and are unquoted.
+
+    Args:
+        header (str): The header line.
+
+    Returns:
+        Optional[str]: The path, or None if the header cannot be parsed.
+    """
+    paths = header[len('diff --git '):]
+    if paths.startswith('a/'):
+        # Both paths are the same, so the header splits in the middle
+        paths = paths[len('a/'):]
+        return paths[:(len(paths) - len(' b/')) // 2]
+    if not paths.startswith('"'):
+        return None
+
+    path = bytearray()
+    i = 1
+    while i < len(paths) and paths[i] != '"':
+        if paths[i] != '\\':
+            path.extend(paths[i].encode('utf-8'))
+            i += 1
+        elif OCTAL_ESCAPE_PATTERN.fullmatch(paths[i + 1: i + 4]):
+            path.append(int(paths[i + 1: i + 4], 8) & 0xFF)
+            i += 4
+        elif paths[i + 1: i + 2] in QUOTED_PATH_ESCAPES:
+            path.append(QUOTED_PATH_ESCAPES[paths[i + 1]])
+            i += 2
+        else:
+            return None
+    if i == len(paths) or not path.startswith(b'a/'):
+        return None
+    return path[len('a/'):].decode('utf-8', errors='surrogateescape')
@@ -0,0 +1,163 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .cache import ProjectCache
+from .github import clone_github_repository, fetch_commit, find_reference_repository, has_commit, \
+    CommitNotValidException
+
+
+class PrefetchJob:
+    def __init__(self, repo_url: str, commit_hash: str, payload: Any = None):
+        """
+        Initializes a PrefetchJob object.
+
+        Args:
+            repo_url (str): The URL of the repository.
+            commit_hash (str): The commit hash the job needs.
+            payload (Any, optional): Anything the job handler needs, e.g. the report path.
+        """
+        self.repo_url = repo_url
+        self.commit_hash = commit_hash
+        self.payload = payload
+
+
+class PrefetchScheduler:
+    def __init__(self, project_cache: Optional[ProjectCache] = None, max_workers: int = 4,
+                 auto_reference: bool = False):
+        """
+        Initializes a PrefetchScheduler object.
+
+        The scheduler clones or fetches the repositories of upcoming jobs in the background, with at
+        most `max_workers` Git operations at a time, and runs the jobs whose repository and commit
+        are already there first.
+
+        Args:
+            project_cache (ProjectCache, optional): Where repositories are cloned, `projects/` by default.
+            max_workers (int): The maximum number of concurrent clones or fetches.
+            auto_reference (bool): Whether to share Git objects with an already cloned fork of the same project.
+        """
+        self.project_cache = project_cache or ProjectCache()
+        self.auto_reference = auto_reference
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+        # One prefetch per project directory, so Git operations on the same repository never overlap
+        self._prefetches: Dict[str, Future] = {}
+        self._commits: Dict[str, List[str]] = {}
+        self._fetching: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, jobs: Iterable[PrefetchJob]):
+        """
+        Schedules the prefetch of the repository and commit of every job that is not warm yet.
+
+        Args:
+            jobs (Iterable[PrefetchJob]): The upcoming jobs.
+        """
+        for job in jobs:
+            project_dir = self.project_dir(job)
+            if has_commit(project_dir, job.commit_hash):
+                continue
+
+            with self._lock:
+                if project_dir in self._fetching:
+                    # The running prefetch of the repository fetches the commit as well
+                    self._commits[project_dir].append(job.commit_hash)
+                    continue
+
+                self._fetching.add(project_dir)
+                self._commits[project_dir] = [job.commit_hash]
+                self._prefetches[project_dir] = self._executor.submit(self._prefetch, job.repo_url, project_dir)
+
+    def is_warm(self, job: PrefetchJob) -> bool:
+        """
+        Checks whether a job can run without waiting for Git.
+
+        Args:
+            job (PrefetchJob): The job.
+
+        Returns:
+            bool: True if no prefetch of the job's repository is pending.
+        """
+        prefetch = self._prefetches.get(self.project_dir(job))
+        return prefetch is None or prefetch.done()
+
+    def next_job(self, pending: List[PrefetchJob]) -> PrefetchJob:
+        """
+        Picks the next job to run: the first warm one, or else the first one whose prefetch completes.
+
+        Args:
+            pending (List[PrefetchJob]): The jobs not run yet, in queue order.
+
+        Returns:
+            PrefetchJob: The job to run next, removed from `pending`.
+        """
+        while True:
+            for index, job in enumerate(pending):
+                if self.is_warm(job):
+                    return pending.pop(index)
+            wait([self._prefetches[self.project_dir(job)] for job in pending], return_when=FIRST_COMPLETED)
+
+    def run(self, jobs: Iterable[PrefetchJob], handler: Callable[[PrefetchJob], Any]) -> List[Tuple[PrefetchJob, Any]]:
+        """
+        Prefetches every job ahead of time and runs them, shortest job (warm repository) first.
+
+        Args:
+            jobs (Iterable[PrefetchJob]): The jobs, in queue order.
+            handler (Callable[[PrefetchJob], Any]): Runs a job once its repository and commit are fetched.
+
+        Returns:
+            List[Tuple[PrefetchJob, Any]]: Every job with the result of its handler, in the order they ran.
+        """
+        pending = list(jobs)
+        self.submit(pending)
+
+        results: List[Tuple[PrefetchJob, Any]] = []
+        while pending:
+            job = self.next_job(pending)
+            results.append((job, handler(job)))
+        return results
+
+    def project_dir(self, job: PrefetchJob) -> str:
+        """
+        Gets the directory where the repository of a job is cloned.
+
+        Args:
+            job (PrefetchJob): The job.
+
+        Returns:
+            str: The path to the project directory.
+        """
+        return self.project_cache.project_dir(job.repo_url)
+
+    def shutdown(self, wait_for_prefetches: bool = True):
+        """
+        Stops the background workers.
+
+        Args:
+            wait_for_prefetches (bool): Whether to wait for the running prefetches to complete.
+        """
+        self._executor.shutdown(wait=wait_for_prefetches, cancel_futures=not wait_for_prefetches)
+
+    def _prefetch(self, repo_url: str, project_dir: str):
+        try:
+            with self.project_cache.use(repo_url):
+                reference_dir = find_reference_repository(project_dir) if self.auto_reference else None
+                with self.project_cache.hold(reference_dir) as reference_dir:
+                    clone_github_repository(repo_url, project_dir, reference_dir)
+                fetched = 0
+                while True:
+                    # Commits may be added by `submit` while fetching
+                    with self._lock:
+                        if fetched == len(self._commits[project_dir]):
+                            self._fetching.discard(project_dir)
+                            return
+                        commit_hash = self._commits[project_dir][fetched]
+                    try:
+                        fetch_commit(project_dir, commit_hash)
+                    except CommitNotValidException:
+                        # The job of this commit reports it when it runs
+                        pass
+                    fetched += 1
+        finally:
+            with self._lock:
+                self._fetching.discard(project_dir)
@@ -0,0 +1,52 @@
+import argparse
+
+from argparse import Namespace
+
+from repository import ProjectCache
+from validator import ReportValidator, ShardWorker
+from utils import set_json_backend, JSON_BACKENDS
+
+
+def parse_arguments() -> Namespace:
+    """
+    Parse command-line arguments.
+
+    Returns:
+        Namespace: An object containing the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Validate the report shards sent by main.py --shards.")
+    parser.add_argument("--host", type=str, default='127.0.0.1', help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on, 0 for any free port")
+    parser.add_argument("--projects-dir", type=str, default='projects', help="Directory where projects are cloned")
+    parser.add_argument("--cache-budget", type=int, required=False, default=None,
+                        help="Disk budget in bytes for the projects folder, least recently used projects are removed")
+    parser.add_argument("--workers", type=int, required=False, default=1,
+                        help="Number of processes verifying files, sharing the files read in memory")
+    parser.add_argument("--allow-local-repos", action='store_true', required=False,
+                        help="Accept shards of local repository paths and file:// URLs, not only GitHub URLs")
+    parser.add_argument("--json-backend", type=str, required=False, default=None, choices=JSON_BACKENDS,
+                        help="JSON decoder for the requests, the fastest one installed by default")
+
+    return parser.parse_args()
+
+
+def main():
+    """
+    Runs a shard worker until interrupted, printing its URL once it listens.
+    """
+    args = parse_arguments()
+    set_json_backend(args.json_backend)
+
+    validator = ReportValidator(ProjectCache(args.projects_dir, args.cache_budget), workers=args.workers)
+    worker = ShardWorker(validator, args.host, args.port, args.allow_local_repos)
+    print(f"Listening on {worker.url}", flush=True)
+    try:
+        worker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.shutdown()
+
+
+if __name__ == "__main__":
+    main()
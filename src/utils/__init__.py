@@ -1 +1,3 @@
 from .file import *
+from .json_backend import *
+from .memory import *
@@ -1,8 +1,10 @@
 import os
-import json
+import hashlib
 from typing import Dict, List
 from urllib.parse import urlparse
 
+from .json_backend import loads_json
+
 
 def read_lines_from_file(file_path: str) -> List[str]:
     """
@@ -18,6 +20,24 @@ def read_lines_from_file(file_path: str) -> List[str]:
         return file.readlines()
 
 
+def hash_file(file_path: str, algorithm: str) -> str:
+    """
+    Compute the hex digest of the content of a file.
+
+    Args:
+        file_path (str): The path to the file.
+        algorithm (str): The name of a `hashlib` algorithm (e.g. "sha256").
+
+    Returns:
+        str: The hex digest of the file content.
+    """
+    digest = hashlib.new(algorithm)
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def get_code_path(project_dir: str, code_location: str) -> str:
     """
     Get the full path to a code file within a project directory.
@@ -36,28 +56,104 @@ def read_json_file(file_path: str) -> Dict:
     """
    Read and parse a JSON file and return its content as a dictionary.
 
+   The file is decoded with the fastest JSON backend installed (see `utils.json_backend`).
+
    Args:
        file_path (str): The path to the JSON file.
 
    Returns:
        dict: The parsed JSON content as a dictionary.
    """
-    with open(file_path, 'r') as json_file:
-        return json.load(json_file)
+    with open(file_path, 'rb') as json_file:
+        return loads_json(json_file.read())
 
 
-def get_project_dir(repo_url: str) -> str:
+def get_project_dir(repo_url: str, projects_dir: str = 'projects') -> str:
     """
     Get the project directory path based on a repository URL.
 
     Args:
         repo_url (str): The URL of the repository.
+        projects_dir (str): The directory where all projects are cloned.
 
     Returns:
         str: The path to the project directory.
+
+    Raises:
+        ValueError: If the project directory would be outside of the projects directory, see `get_repo_components`.
+    """
+    return os.path.join(projects_dir, *get_repo_components(repo_url))
+
+
+def get_repo_components(repo_url: str) -> List[str]:
+    """
+    Get the path components of a repository URL, e.g. the owner and the name of a GitHub repository.
+
+    Args:
+        repo_url (str): The URL of the repository.
+
+    Returns:
+        List[str]: The components of the URL path.
+
+    Raises:
+        ValueError: If the path is empty, or if a component is empty, `.`, `..` or contains a separator.
+    """
+    components = urlparse(repo_url).path.strip('/').split('/')
+    if not all(is_path_component(component) for component in components):
+        raise ValueError(f"The repository URL '{repo_url}' is not valid.")
+    return components
+
+
+def is_path_component(name: str) -> bool:
+    """
+    Check whether a name is a single path component.
+
+    Args:
+        name (str): The name.
+
+    Returns:
+        bool: False if the name is empty, `.`, `..` or contains a separator.
+    """
+    return name not in ('', '.', '..') and not any(separator in name for separator in ('/', '\\', '\x00'))
+
+
+def is_github_repo_url(repo_url: str) -> bool:
+    """
+    Check whether a URL is the URL of a GitHub repository.
+
+    Args:
+        repo_url (str): The URL.
+
+    Returns:
+        bool: True if the URL is `https://github.com/<owner>/<repo>`, see `get_repo_components`.
+    """
+    if not isinstance(repo_url, str) or not repo_url.startswith('https://github.com/'):
+        return False
+    try:
+        return len(get_repo_components(repo_url)) == 2
+    except ValueError:
+        return False
+
+
+def get_dir_size(directory_name: str) -> int:
+    """
+    Get the total size in bytes of the files within a directory, recursively.
+
+    Args:
+        directory_name (str): The name of the directory.
+
+    Returns:
+        int: The size of the directory in bytes.
     """
-    project_path = urlparse(repo_url).path
-    return os.path.join('projects', project_path[1: len(project_path)])
+    size = 0
+    for root, _, files in os.walk(directory_name):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except FileNotFoundError:
+                # The file was removed while walking the directory
+                pass
+    return size
 
 
 def dir_exists(directory_name: str) -> bool:
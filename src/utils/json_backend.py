@@ -0,0 +1,101 @@
+import importlib
+import json
+from typing import Any, Callable, Optional, Union
+
+# Backends tried in order when none is forced, the fastest first
+JSON_BACKENDS = ('orjson', 'ujson', 'json')
+
+
+class JsonBackendException(Exception):
+    pass
+
+
+class JsonBackend:
+    def __init__(self, name: str, loads: Callable[[Union[bytes, str]], Any]):
+        """
+        Initializes a JsonBackend object.
+
+        Args:
+            name (str): The name of the module decoding JSON, one of `JSON_BACKENDS`.
+            loads (Callable[[bytes | str], Any]): The function decoding a JSON document.
+        """
+        self.name = name
+        self.loads = loads
+
+
+_selected_backend: Optional[JsonBackend] = None
+
+
+def get_json_backend(name: Optional[str] = None) -> JsonBackend:
+    """
+    Gets a JSON decoding backend.
+
+    Args:
+        name (str, optional): The backend to use. If None, the backend set with `set_json_backend`,
+            or else the fastest one installed.
+
+    Returns:
+        JsonBackend: The backend.
+
+    Raises:
+        JsonBackendException: If the backend is unknown or not installed.
+    """
+    global _selected_backend
+
+    if name is None:
+        if _selected_backend is None:
+            _selected_backend = next(backend for backend in map(_load_backend, JSON_BACKENDS) if backend)
+        return _selected_backend
+
+    if name not in JSON_BACKENDS:
+        raise JsonBackendException(f"Unknown JSON backend: '{name}'. Use one of: {', '.join(JSON_BACKENDS)}.")
+    backend = _load_backend(name)
+    if backend is None:
+        raise JsonBackendException(f"The JSON backend '{name}' is not installed.")
+    return backend
+
+
+def set_json_backend(name: Optional[str]):
+    """
+    Sets the JSON decoding backend used by `loads_json` in this process.
+
+    Args:
+        name (str, optional): The backend to use, or None to use the fastest one installed.
+
+    Raises:
+        JsonBackendException: If the backend is unknown or not installed.
+    """
+    global _selected_backend
+    _selected_backend = get_json_backend(name) if name is not None else None
+
+
+def loads_json(content: Union[bytes, str]) -> Any:
+    """
+    Decodes a JSON document with the selected backend.
+
+    Documents a fast backend rejects but the standard library accepts (e.g. `NaN` or a byte order
+    mark) are decoded with the standard library, so every backend gives the same result and raises
+    the same `json.JSONDecodeError` for invalid documents. The only difference left is that orjson
+    decodes integers beyond 64 bits as floats, far beyond any line or column of a report.
+
+    Args:
+        content (bytes | str): The JSON document.
+
+    Returns:
+        Any: The decoded document.
+    """
+    backend = get_json_backend()
+    try:
+        return backend.loads(content)
+    except (ValueError, OverflowError):
+        if backend.name == 'json':
+            raise
+        return json.loads(content)
+
+
+def _load_backend(name: str) -> Optional[JsonBackend]:
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        return None
+    return JsonBackend(name, module.loads)
@@ -0,0 +1,131 @@
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+# Allocations of the profiler itself are left out of the top allocation sites
+PROFILER_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+# Tracing is global to the process, so it is shared by the running profilers and stopped by the last one
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+class PhaseMemory:
+    def __init__(self, phase: str, peak: int, retained: int, top_sites: List[Tuple[str, int, int]]):
+        """
+        Initializes a PhaseMemory object, the memory allocated by Python during a phase.
+
+        Args:
+            phase (str): The name of the phase, e.g. "load".
+            peak (int): The highest number of bytes allocated at any time during the phase.
+            retained (int): The number of bytes still allocated at the end of the phase, minus
+                those allocated at its start.
+            top_sites (List[Tuple[str, int, int]]): The source lines whose allocations changed the most during
+                the phase, with the bytes and number of blocks they retained.
+        """
+        self.phase = phase
+        self.peak = peak
+        self.retained = retained
+        self.top_sites = top_sites
+
+    def to_string(self) -> str:
+        """
+        Returns a string representation of the PhaseMemory object.
+
+        Returns:
+            str: The peak and retained memory of the phase, followed by one line per top allocation site.
+        """
+        lines = [f"{self.phase}: peak {_mebibytes(self.peak)}, retained {_mebibytes(self.retained)}"]
+        for site, size, count in self.top_sites:
+            lines.append(f"    {site}: {_mebibytes(size)} in {count} blocks")
+        return "\n".join(lines)
+
+
+class MemoryProfiler:
+    def __init__(self, top_sites: int = 10, frames: int = 1):
+        """
+        Initializes a MemoryProfiler object.
+
+        The profiler traces Python allocations with `tracemalloc` and takes a snapshot at the start and
+        end of every phase. Tracing slows allocations down, so it is only enabled on demand. As tracing
+        is global to the process, phases of concurrent validations are not told apart, and worker
+        processes are not traced. Concurrent profilers keep tracing running until all of them stop.
+
+        Args:
+            top_sites (int): The number of allocation sites kept for every phase.
+            frames (int): The number of frames stored for every allocation.
+        """
+        self.top_sites = top_sites
+        self.frames = frames
+        self.phases: Dict[str, PhaseMemory] = {}
+        self._started = False
+
+    def start(self):
+        """
+        Starts tracing allocations, unless they are already traced.
+
+        Profilers running at the same time share the tracing, which is left running until the last of
+        them stops.
+        """
+        global _tracing_users, _tracing_started
+        with _tracing_lock:
+            if self._started:
+                return
+            if _tracing_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                _tracing_started = True
+            _tracing_users += 1
+            self._started = True
+
+    def stop(self):
+        """
+        Stops tracing allocations, once no other profiler uses them and if a profiler started it.
+        """
+        global _tracing_users, _tracing_started
+        with _tracing_lock:
+            if not self._started:
+                return
+            self._started = False
+            _tracing_users -= 1
+            if _tracing_users == 0 and _tracing_started:
+                tracemalloc.stop()
+                _tracing_started = False
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Measures the memory allocated during a phase, see `phases`.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        self.start()
+        before = tracemalloc.take_snapshot().filter_traces(PROFILER_FILTERS)
+        allocated_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            allocated_after, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(PROFILER_FILTERS)
+            top_sites = [(str(stat.traceback), stat.size_diff, stat.count_diff)
+                         for stat in after.compare_to(before, 'lineno')[:self.top_sites]]
+            self.phases[name] = PhaseMemory(name, peak, allocated_after - allocated_before, top_sites)
+
+    def to_string(self) -> str:
+        """
+        Returns a string representation of the MemoryProfiler object.
+
+        Returns:
+            str: The memory of every phase, see `PhaseMemory.to_string`.
+        """
+        return "\n".join(phase.to_string() for phase in self.phases.values())
+
+
+def _mebibytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.2f} MiB"
@@ -0,0 +1,236 @@
+import fcntl
+import hashlib
+import os
+import re
+import struct
+import sys
+import tempfile
+from contextlib import contextmanager
+from multiprocessing import shared_memory, resource_tracker
+from typing import Iterator, Optional
+
+# ready flag, reference count, content length, number of lines
+HEADER_FORMAT = '<qqqq'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+READY = 1
+
+# The same line breaks as files opened in text mode (universal newlines)
+LINE_BREAK_PATTERN = re.compile(rb'\r\n|\r|\n')
+
+
+class SharedFile:
+    def __init__(self, name: str, segment: shared_memory.SharedMemory):
+        """
+        Initializes a SharedFile object, a zero-copy view over a file held in shared memory.
+
+        Args:
+            name (str): The name of the shared memory segment.
+            segment (SharedMemory): The attached shared memory segment.
+        """
+        self.name = name
+        self._segment = segment
+        _, _, content_length, self.line_count = struct.unpack_from(HEADER_FORMAT, segment.buf, 0)
+        offsets_end = HEADER_SIZE + (self.line_count + 1) * 8
+        self._offsets = segment.buf[HEADER_SIZE: offsets_end].cast('q')
+        self.content = segment.buf[offsets_end: offsets_end + content_length]
+
+    def get_line(self, line_number: int) -> str:
+        """
+        Gets a line of the file, with its line break normalized to '\\n' like files opened in text mode.
+
+        Args:
+            line_number (int): The zero-based line number. Negative numbers count from the end.
+
+        Returns:
+            str: The line.
+
+        Raises:
+            IndexError: If the file has no such line.
+        """
+        if line_number < 0:
+            line_number += self.line_count
+        if not 0 <= line_number < self.line_count:
+            raise IndexError(f"Line {line_number} out of range")
+
+        line = self.content[self._offsets[line_number]: self._offsets[line_number + 1]].tobytes()
+        if line.endswith(b'\r\n'):
+            line = line[:-2] + b'\n'
+        elif line.endswith(b'\r'):
+            line = line[:-1] + b'\n'
+        return line.decode('utf-8')
+
+    def close(self):
+        """
+        Detaches the shared memory segment from this process.
+        """
+        self._offsets.release()
+        self.content.release()
+        self._segment.close()
+
+
+class SharedFileCache:
+    def __init__(self, namespace: str = 'srcm', lock_path: Optional[str] = None):
+        """
+        Initializes a SharedFileCache object.
+
+        Files are held in shared memory segments named after `(commit, path, modification time, size)`,
+        with the offsets of their lines, so every process of the host reads each file once and then
+        accesses it without copies. Every `acquire` adds a reference to the segment and every `release`
+        removes one; the segment is removed when no reference is left, usually when the job that acquired
+        it finishes. A segment left behind by a job that never released it is reused while the file is
+        unchanged, and never served once the file is rewritten.
+        The object is picklable, so it can be handed to process-pool workers. The cache relies on POSIX
+        shared memory and file locks, so this module is only imported where it is used.
+
+        Args:
+            namespace (str): The prefix of the shared memory segment names.
+            lock_path (str, optional): The lock file serializing reference count updates across processes.
+        """
+        self.namespace = namespace
+        self.lock_path = lock_path or os.path.join(tempfile.gettempdir(), f'{namespace}.lock')
+
+    def segment_name(self, commit_hash: Optional[str], file_path: str) -> str:
+        """
+        Gets the name of the shared memory segment of a file, as it is on disk now.
+
+        Args:
+            commit_hash (str, optional): The full hash of the commit the file belongs to.
+            file_path (str): The path to the file.
+
+        Returns:
+            str: The segment name, short enough for every platform.
+
+        Raises:
+            OSError: If the file cannot be accessed.
+        """
+        stat = os.stat(file_path)
+        key = f'{commit_hash}\0{os.path.abspath(file_path)}\0{stat.st_mtime_ns}\0{stat.st_size}'
+        return f'{self.namespace}_{hashlib.sha1(key.encode("utf-8")).hexdigest()[:24]}'
+
+    def acquire(self, commit_hash: Optional[str], file_path: str) -> SharedFile:
+        """
+        Gets a file from shared memory, reading it into a new segment if no process did it yet.
+
+        Args:
+            commit_hash (str, optional): The full hash of the commit the file belongs to.
+            file_path (str): The path to the file.
+
+        Returns:
+            SharedFile: The file. It must be released with `release` once the job finishes.
+        """
+        name = self.segment_name(commit_hash, file_path)
+
+        with self._lock():
+            segment = _attach(name)
+            if segment is not None:
+                return SharedFile(name, _add_reference(segment))
+
+        # The file is read without holding the lock, so other files can be acquired meanwhile
+        with open(file_path, 'rb') as file:
+            content = file.read()
+        offsets = [0] + [match.end() for match in LINE_BREAK_PATTERN.finditer(content)]
+        if offsets[-1] != len(content):
+            # The last line has no line break
+            offsets.append(len(content))
+
+        with self._lock():
+            segment = _attach(name)
+            if segment is not None:
+                return SharedFile(name, _add_reference(segment))
+
+            line_count = len(offsets) - 1
+            offsets_size = len(offsets) * 8
+            segment = _create(name, HEADER_SIZE + offsets_size + len(content))
+            struct.pack_into(f'<{len(offsets)}q', segment.buf, HEADER_SIZE, *offsets)
+            segment.buf[HEADER_SIZE + offsets_size: HEADER_SIZE + offsets_size + len(content)] = content
+            struct.pack_into(HEADER_FORMAT, segment.buf, 0, READY, 1, len(content), line_count)
+            return SharedFile(name, segment)
+
+    def release(self, name: str) -> bool:
+        """
+        Removes a reference to a shared memory segment, and the segment itself when none is left.
+
+        Args:
+            name (str): The name of the segment, see `SharedFile.name`.
+
+        Returns:
+            bool: True if the segment was removed.
+        """
+        with self._lock():
+            segment = _attach(name)
+            if segment is None:
+                return False
+            ready, references, content_length, line_count = struct.unpack_from(HEADER_FORMAT, segment.buf, 0)
+            references -= 1
+            struct.pack_into(HEADER_FORMAT, segment.buf, 0, ready, references, content_length, line_count)
+            if references <= 0:
+                _unlink(segment)
+            segment.close()
+            return references <= 0
+
+    def references(self, name: str) -> int:
+        """
+        Gets the number of references to a shared memory segment.
+
+        Args:
+            name (str): The name of the segment.
+
+        Returns:
+            int: The number of references, 0 if the segment does not exist.
+        """
+        with self._lock():
+            segment = _attach(name)
+            if segment is None:
+                return 0
+            references = struct.unpack_from(HEADER_FORMAT, segment.buf, 0)[1]
+            segment.close()
+            return references
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _attach(name: str) -> Optional[shared_memory.SharedMemory]:
+    try:
+        return _open_segment(name=name)
+    except FileNotFoundError:
+        return None
+
+
+def _create(name: str, size: int) -> shared_memory.SharedMemory:
+    return _open_segment(name=name, create=True, size=max(size, 1))
+
+
+def _unlink(segment: shared_memory.SharedMemory):
+    if sys.version_info < (3, 13):
+        # `SharedMemory.unlink` unregisters the segment from the resource tracker, which it no longer is
+        # (see `_open_segment`), and the tracker would print a KeyError
+        resource_tracker.register(_tracked_name(segment), 'shared_memory')
+    segment.unlink()
+
+
+def _add_reference(segment: shared_memory.SharedMemory) -> shared_memory.SharedMemory:
+    ready, references, content_length, line_count = struct.unpack_from(HEADER_FORMAT, segment.buf, 0)
+    struct.pack_into(HEADER_FORMAT, segment.buf, 0, ready, references + 1, content_length, line_count)
+    return segment
+
+
+def _open_segment(**kwargs) -> shared_memory.SharedMemory:
+    # Segments outlive the process that created them and are removed by `release`, so the
+    # resource tracker must not remove them when that process exits
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(track=False, **kwargs)
+    segment = shared_memory.SharedMemory(**kwargs)
+    resource_tracker.unregister(_tracked_name(segment), 'shared_memory')
+    return segment
+
+
+def _tracked_name(segment: shared_memory.SharedMemory) -> str:
+    # The resource tracker knows POSIX segments by their name with its leading slash
+    return '/' + segment.name
@@ -0,0 +1,6 @@
+from .api import *
+from .spool import *
+from .shard import *
+
+__all__ = ["ReportValidator", "ValidationResult", "validate_report", "read_report", "SpoolWatcher", "SpoolException",
+           "read_job", "result_path", "ShardWorker", "ShardException", "split_report", "validate_sharded"]
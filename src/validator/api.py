@@ -0,0 +1,304 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import git
+
+from cli import process_source_code, process_source_code_incremental, diagnose_source_code, MismatchSummary, \
+    InvalidLineException, InvalidContentException, ValidationCancelledException
+from cli.code import CodeReport, throw_if_cancelled, throw_invalid_file_hash_exception
+from report import SarifReport, SnapshotReport, ReportLocation, load_report, check_report_structure, \
+    InvalidReportException
+from repository import (
+    clone_github_repository,
+    checkout_to_commit,
+    find_reference_repository,
+    get_blob_ids,
+    get_changed_line_ranges,
+    get_recently_changed_files,
+    ProjectCache,
+    CommitNotValidException,
+    DiffParseException,
+    RepoNotValidException,
+)
+from utils import dir_exists, get_code_path, loads_json, MemoryProfiler, PhaseMemory
+
+# Exceptions meaning the report does not match the repository and commit
+MISMATCH_EXCEPTIONS = (
+    InvalidReportException,
+    InvalidLineException,
+    InvalidContentException,
+    CommitNotValidException,
+    RepoNotValidException,
+    OSError,
+    UnicodeDecodeError,
+)
+
+ReportInput = Union[str, os.PathLike, bytes, dict, SarifReport, SnapshotReport]
+RepoInput = Union[str, os.PathLike, git.Repo]
+
+
+class ValidationResult:
+    def __init__(self, matches: bool, code_reports: Optional[List[CodeReport]] = None,
+                 error: Optional[Exception] = None, failing_location: Optional[ReportLocation] = None,
+                 timings: Optional[Dict[str, float]] = None, summary: Optional[MismatchSummary] = None,
+                 memory: Optional[Dict[str, PhaseMemory]] = None):
+        """
+        Initializes a ValidationResult object.
+
+        Args:
+            matches (bool): Whether the report matches the repository and commit.
+            code_reports (List[CodeReport], optional): The code regions that were read.
+            error (Exception, optional): The reason why the report does not match.
+            failing_location (ReportLocation, optional): The location that did not match, when known.
+            timings (Dict[str, float], optional): The seconds spent in every phase of the validation.
+            summary (MismatchSummary, optional): Every mismatch of the report, when all of them were collected.
+            memory (Dict[str, PhaseMemory], optional): The memory allocated in every phase, when profiled.
+        """
+        self.matches = matches
+        self.code_reports = code_reports or []
+        self.error = error
+        self.failing_location = failing_location
+        self.timings = timings or {}
+        self.summary = summary
+        self.memory = memory or {}
+
+    def __bool__(self) -> bool:
+        return self.matches
+
+    def to_dict(self) -> Dict:
+        """
+        Returns a JSON-serializable representation of the ValidationResult object, without the code reports.
+
+        Returns:
+            Dict: The verdict, the error and its type, the failing location and the timings.
+        """
+        failing_location = None
+        if self.failing_location is not None:
+            region = self.failing_location.region
+            failing_location = {
+                'uri': self.failing_location.artifact_location_uri,
+                'region': region.data if region is not None else None,
+            }
+
+        return {
+            'matches': self.matches,
+            'error': str(self.error) if self.error is not None else None,
+            'error_type': type(self.error).__name__ if self.error is not None else None,
+            'failing_location': failing_location,
+            'timings': self.timings,
+        }
+
+
+class ReportValidator:
+    def __init__(self, project_cache: Optional[ProjectCache] = None, reference_dir: Optional[str] = None,
+                 auto_reference: bool = False, workers: int = 1, profile_memory: bool = False):
+        """
+        Initializes a ReportValidator object.
+
+        A validator can be reused across calls, so embedding callers share the project cache
+        and the digests already computed (see `cli.hashes`) without spawning a process per check.
+        Calls for the same project are serialized, as they check out the same working tree.
+
+        Args:
+            project_cache (ProjectCache, optional): Where repositories are cloned, `projects/` by default.
+            reference_dir (str, optional): A local repository to share Git objects with when cloning.
+            auto_reference (bool): Whether to share Git objects with an already cloned fork of the same project.
+            workers (int): The number of processes verifying the files of a report.
+            profile_memory (bool): Whether to measure the memory allocated in every phase, see `MemoryProfiler`.
+        """
+        self.project_cache = project_cache or ProjectCache()
+        self.reference_dir = reference_dir
+        self.auto_reference = auto_reference
+        self.workers = workers
+        self.profile_memory = profile_memory
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def validate(self, repo: RepoInput, commit_hash: str, report: ReportInput,
+                 baseline_commit: Optional[str] = None,
+                 baseline_report: Optional[ReportInput] = None, collect_all: bool = False,
+                 cancel: Optional[threading.Event] = None) -> ValidationResult:
+        """
+        Checks whether a Snyk Code report matches a repository and commit hash.
+
+        Args:
+            repo (RepoInput): A GitHub repository URL, the path to a local repository or a `git.Repo`.
+            commit_hash (str): The commit hash.
+            report (ReportInput): The report as a JSON or snapshot path, JSON bytes, parsed JSON or report object.
+            baseline_commit (str, optional): A commit a previous report was already validated against.
+            baseline_report (ReportInput, optional): The report already validated against the baseline commit.
+                The whole report is validated if the diff from the baseline commit cannot be read.
+            collect_all (bool): Whether to check every unique location instead of stopping at the first mismatch,
+                see `ValidationResult.summary`. The baseline is not used in this mode.
+            cancel (threading.Event, optional): Stops the validation once set, which then does not match.
+
+        Returns:
+            ValidationResult: The verdict, with the failing location and the time spent in every phase.
+        """
+        profiler = MemoryProfiler() if self.profile_memory else None
+        try:
+            result = self._validate(repo, commit_hash, report, baseline_commit, baseline_report, collect_all,
+                                    profiler, cancel)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+
+        if profiler is not None:
+            result.memory = profiler.phases
+        return result
+
+    def _validate(self, repo: RepoInput, commit_hash: str, report: ReportInput, baseline_commit: Optional[str],
+                  baseline_report: Optional[ReportInput], collect_all: bool,
+                  profiler: Optional[MemoryProfiler], cancel: Optional[threading.Event]) -> ValidationResult:
+        timings: Dict[str, float] = {}
+        started_at = time.perf_counter()
+        code_reports: List[CodeReport] = []
+        summary: Optional[MismatchSummary] = None
+        project_dir = None
+
+        try:
+            with _timed(timings, 'load', profiler):
+                sarif_report = read_report(report)
+            # Reports that can never match are rejected before the repository is cloned
+            with _timed(timings, 'precheck', profiler):
+                check_report_structure(sarif_report)
+
+            with self._project_dir(repo, timings, profiler) as project_dir:
+                throw_if_cancelled(cancel)
+                with _timed(timings, 'checkout', profiler):
+                    # Files are shared across processes under the full hash, never a branch or a short hash
+                    head_commit = checkout_to_commit(project_dir, commit_hash)
+
+                throw_if_cancelled(cancel)
+                with _timed(timings, 'verify', profiler):
+                    changed_line_ranges = None
+                    if not collect_all and baseline_commit is not None:
+                        try:
+                            changed_line_ranges = get_changed_line_ranges(project_dir, baseline_commit, commit_hash)
+                        except DiffParseException:
+                            # A diff that cannot be read is never trusted, the whole report is validated instead
+                            changed_line_ranges = None
+
+                    if collect_all:
+                        blob_ids = get_blob_ids(project_dir, commit_hash, sarif_report.artifact_hashes)
+                        summary = diagnose_source_code(project_dir, sarif_report, blob_ids, self.workers, head_commit)
+                    elif changed_line_ranges is not None:
+                        code_reports = process_source_code_incremental(project_dir, sarif_report,
+                                                                       read_report(baseline_report),
+                                                                       changed_line_ranges)
+                    else:
+                        recent_files = get_recently_changed_files(project_dir, commit_hash)
+                        blob_ids = get_blob_ids(project_dir, commit_hash, sarif_report.artifact_hashes)
+                        code_reports = process_source_code(project_dir, sarif_report, recent_files, blob_ids,
+                                                           self.workers, head_commit, cancel)
+        except MISMATCH_EXCEPTIONS + (ValidationCancelledException,) as e:
+            timings['total'] = time.perf_counter() - started_at
+            return ValidationResult(False, code_reports, e, _failing_location(e, project_dir), timings)
+
+        timings['total'] = time.perf_counter() - started_at
+        if summary is not None and not summary.matches:
+            error, failing_location = _first_mismatch(summary, project_dir)
+            return ValidationResult(False, error=error, failing_location=failing_location, timings=timings,
+                                    summary=summary)
+        return ValidationResult(True, code_reports, timings=timings, summary=summary)
+
+    @contextmanager
+    def _project_dir(self, repo: RepoInput, timings: Dict[str, float],
+                     profiler: Optional[MemoryProfiler] = None) -> Iterator[str]:
+        if isinstance(repo, git.Repo):
+            repo = repo.working_dir
+        repo = os.fspath(repo)
+
+        if dir_exists(repo):
+            # A local repository is used as it is
+            with self._lock(os.path.abspath(repo)):
+                yield repo
+            return
+
+        with self.project_cache.use(repo) as project_dir:
+            with self._lock(os.path.abspath(project_dir)):
+                with _timed(timings, 'clone', profiler):
+                    reference_dir = self.reference_dir
+                    if reference_dir is None and self.auto_reference:
+                        reference_dir = find_reference_repository(project_dir)
+                    with self.project_cache.hold(reference_dir) as reference_dir:
+                        clone_github_repository(repo, project_dir, reference_dir)
+                yield project_dir
+
+    def _lock(self, project_dir: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(project_dir, threading.Lock())
+
+
+def validate_report(repo: RepoInput, commit_hash: str, report: ReportInput,
+                    validator: Optional[ReportValidator] = None) -> ValidationResult:
+    """
+    Checks whether a Snyk Code report matches a repository and commit hash.
+
+    Args:
+        repo (RepoInput): A GitHub repository URL, the path to a local repository or a `git.Repo`.
+        commit_hash (str): The commit hash.
+        report (ReportInput): The report as a JSON or snapshot path, JSON bytes, parsed JSON or report object.
+        validator (ReportValidator, optional): A validator to reuse across calls.
+
+    Returns:
+        ValidationResult: The verdict, with the failing location and the time spent in every phase.
+    """
+    return (validator or ReportValidator()).validate(repo, commit_hash, report)
+
+
+def read_report(report: ReportInput) -> Union[SarifReport, SnapshotReport]:
+    """
+    Reads a Snyk Code report from any of the supported inputs.
+
+    Args:
+        report (ReportInput): The report as a JSON or snapshot path, JSON bytes, parsed JSON or report object.
+
+    Returns:
+        SarifReport | SnapshotReport: The report.
+    """
+    if isinstance(report, (SarifReport, SnapshotReport)):
+        return report
+    if isinstance(report, dict):
+        return SarifReport(report)
+    if isinstance(report, bytes):
+        return SarifReport(loads_json(report))
+    return load_report(os.fspath(report))
+
+
+def _first_mismatch(summary: MismatchSummary, project_dir: str) -> Tuple[Exception, Optional[ReportLocation]]:
+    if summary.mismatches:
+        mismatch = summary.mismatches[0]
+        return mismatch.error, mismatch.location
+    uri, (expected_digest, digest) = next(iter(summary.hash_mismatches.items()))
+    try:
+        throw_invalid_file_hash_exception(get_code_path(project_dir, uri), expected_digest, digest)
+    except InvalidContentException as e:
+        return e, ReportLocation(None, uri, None)
+
+
+def _failing_location(exception: Exception, project_dir: Optional[str]) -> Optional[ReportLocation]:
+    code_file_path = getattr(exception, 'code_file_path', None)
+    if code_file_path is None:
+        code_file_path = getattr(exception, 'filename', None)
+    if code_file_path is None:
+        return None
+    if project_dir is not None:
+        code_file_path = os.path.relpath(code_file_path, project_dir)
+    return ReportLocation(None, code_file_path, getattr(exception, 'code_region', None))
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], phase: str, profiler: Optional[MemoryProfiler] = None) -> Iterator[None]:
+    started_at = time.perf_counter()
+    try:
+        if profiler is None:
+            yield
+        else:
+            with profiler.phase(phase):
+                yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - started_at
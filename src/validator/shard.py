@@ -0,0 +1,315 @@
+import json
+import threading
+import time
+import urllib.request
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+from report import SarifReport, SnapshotReport, CodeRegion, ReportLocation, check_report_structure, \
+    InvalidReportException
+from utils import dir_exists, is_github_repo_url, loads_json
+from .api import ReportValidator, ValidationResult, ReportInput, read_report
+
+# Cancellations kept for jobs whose shard has not arrived yet
+MAX_CANCELLED_JOBS = 1000
+
+
+class ShardException(Exception):
+    def __init__(self, message, error_type: Optional[str] = None):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+class ShardWorker:
+    def __init__(self, validator: Optional[ReportValidator] = None, host: str = '127.0.0.1', port: int = 0,
+                 allow_local_repos: bool = False):
+        """
+        Initializes a ShardWorker object, an HTTP server validating the shards sent by `validate_sharded`.
+
+        The worker answers two JSON requests:
+
+            - `POST /validate` with a `job_id`, a `repo`, a `commit_hash` and a `report` (the shard as
+              a SARIF JSON object), answered with the verdict of the shard, see `ValidationResult.to_dict`.
+              Malformed requests are answered with a 400 status.
+            - `POST /cancel` with a `job_id`, which stops the validation of the job's shard.
+
+        Requests are not authenticated, so the `repo` of a shard must be a GitHub repository URL,
+        see `is_github_repo_url`, unless local repositories are allowed.
+
+        Args:
+            validator (ReportValidator, optional): The validator of the shards, with its own project cache.
+            host (str): The address to listen on.
+            port (int): The port to listen on, or 0 for any free port.
+            allow_local_repos (bool): Whether shards may name a local repository path or `file://` URL.
+        """
+        self.validator = validator or ReportValidator()
+        self.allow_local_repos = allow_local_repos
+        self._cancels: OrderedDict[str, threading.Event] = OrderedDict()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _handler_class(self))
+        self._server.daemon_threads = True
+        self._serving = False
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def serve_forever(self):
+        """
+        Handles requests until `shutdown` is called.
+        """
+        self._serving = True
+        self._server.serve_forever()
+
+    def shutdown(self):
+        """
+        Stops handling requests and closes the server.
+        """
+        if self._serving:
+            # Waits for `serve_forever` to return, so it must be running
+            self._server.shutdown()
+            self._serving = False
+        self._server.server_close()
+
+    def validate(self, request: Dict) -> Dict:
+        """
+        Validates a shard.
+
+        Args:
+            request (Dict): The `job_id`, `repo`, `commit_hash` and `report` of the shard.
+
+        Returns:
+            Dict: The verdict of the shard, see `ValidationResult.to_dict`. Shards of a repository that is
+                not allowed do not match.
+
+        Raises:
+            TypeError: If the report is not a JSON object. A path or bytes would be read by the validator as
+                a file on this worker, see `read_report`.
+        """
+        job_id = request['job_id']
+        repo = request['repo']
+        report = request['report']
+        if not isinstance(report, dict):
+            raise TypeError("The report of a shard must be a JSON object.")
+        if not self.is_allowed_repo(repo):
+            error = ShardException(f"The repository '{repo}' is not allowed on this worker.",
+                                   ShardException.__name__)
+            return ValidationResult(False, error=error).to_dict()
+
+        cancel = self._cancel_event(job_id)
+        try:
+            result = self.validator.validate(repo, request['commit_hash'], report, cancel=cancel)
+        finally:
+            with self._lock:
+                self._cancels.pop(job_id, None)
+        return result.to_dict()
+
+    def is_allowed_repo(self, repo: str) -> bool:
+        """
+        Checks whether the shards of a repository can be validated on this worker.
+
+        Args:
+            repo (str): The repository of a shard.
+
+        Returns:
+            bool: True for a GitHub repository URL, or for an existing local repository path or `file://` URL
+                if local repositories are allowed.
+        """
+        if is_github_repo_url(repo):
+            return True
+        if not self.allow_local_repos or not isinstance(repo, str):
+            return False
+        if repo.startswith('file://'):
+            repo = urlparse(repo).path
+        return dir_exists(repo)
+
+    def cancel(self, job_id: str):
+        """
+        Cancels the shard of a job, even if it did not arrive yet.
+
+        Args:
+            job_id (str): The job.
+        """
+        self._cancel_event(job_id).set()
+
+    def _cancel_event(self, job_id: str) -> threading.Event:
+        with self._lock:
+            if job_id not in self._cancels:
+                self._cancels[job_id] = threading.Event()
+                if len(self._cancels) > MAX_CANCELLED_JOBS:
+                    self._cancels.popitem(last=False)
+            return self._cancels[job_id]
+
+
+def split_report(sarif_report: SarifReport, shard_count: int) -> List[Dict]:
+    """
+    Splits the locations of a report by file into balanced shards.
+
+    The files are assigned to the shard with the fewest locations so far, the files with the
+    most locations first. Every location becomes a result of its own, with its rule id, and
+    the content hashes of the files of a shard are kept.
+
+    Args:
+        sarif_report (SarifReport): The Snyk Code report to split.
+        shard_count (int): The maximum number of shards.
+
+    Returns:
+        List[Dict]: The shards as SARIF JSON, without empty shards.
+    """
+    locations_by_file: Dict[str, List[ReportLocation]] = {}
+    for location in sarif_report.iter_locations():
+        locations_by_file.setdefault(location.artifact_location_uri, []).append(location)
+
+    shard_files: List[List[str]] = [[] for _ in range(shard_count)]
+    shard_sizes = [0] * shard_count
+    for uri, locations in sorted(locations_by_file.items(), key=lambda file: -len(file[1])):
+        shard = shard_sizes.index(min(shard_sizes))
+        shard_files[shard].append(uri)
+        shard_sizes[shard] += len(locations)
+
+    artifact_hashes = sarif_report.artifact_hashes
+    shards = []
+    for uris in shard_files:
+        if not uris:
+            continue
+        results = []
+        for uri in uris:
+            for location in locations_by_file[uri]:
+                result = {"locations": [{"physicalLocation": {"artifactLocation": {"uri": uri},
+                                                              "region": location.region.data}}]}
+                if location.rule_id is not None:
+                    result["ruleId"] = location.rule_id
+                results.append(result)
+        artifacts = [{"location": {"uri": uri}, "hashes": artifact_hashes[uri]}
+                     for uri in uris if uri in artifact_hashes]
+        shards.append({"runs": [{"results": results, "artifacts": artifacts}]})
+
+    return shards
+
+
+def validate_sharded(repo: str, commit_hash: str, report: ReportInput, worker_urls: Sequence[str],
+                     timeout: Optional[float] = None) -> ValidationResult:
+    """
+    Checks whether a Snyk Code report matches a repository and commit hash, on several worker nodes.
+
+    The report is split into one shard per worker (see `split_report`), and every worker clones
+    the repository and validates its shard. As soon as a shard does not match, the other workers
+    are told to cancel the job. A worker that cannot be reached makes the report not match, as
+    its shard was not verified. Reports that can never match (see `check_report_structure`) are
+    not sent to the workers.
+
+    Args:
+        repo (str): A GitHub repository URL, or a repository path every worker can reach.
+        commit_hash (str): The commit hash.
+        report (ReportInput): The report as a JSON or snapshot path, JSON bytes, parsed JSON or report object.
+        worker_urls (Sequence[str]): The base URLs of the workers, see `ShardWorker`.
+        timeout (float, optional): The seconds to wait for a worker's verdict.
+
+    Returns:
+        ValidationResult: The merged verdict, with the first failing location and, for every phase,
+            the longest time a worker spent in it. Code reports are not sent back by workers.
+    """
+    started_at = time.perf_counter()
+    sarif_report = read_report(report)
+    try:
+        # Reports that can never match are not sent to the workers
+        check_report_structure(sarif_report)
+        shards = split_report(sarif_report, len(worker_urls))
+    except InvalidReportException as e:
+        failing_location = ReportLocation(None, e.code_file_path, e.code_region)
+        return ValidationResult(False, error=e, failing_location=failing_location,
+                                timings={'precheck': time.perf_counter() - started_at})
+    finally:
+        if isinstance(sarif_report, SnapshotReport) and sarif_report is not report:
+            sarif_report.close()
+    split_seconds = time.perf_counter() - started_at
+
+    job_id = uuid.uuid4().hex
+    verdicts: List[Dict] = []
+    failure: Optional[Dict] = None
+
+    with ThreadPoolExecutor(max_workers=max(len(shards), 1)) as executor:
+        futures = {executor.submit(_post, f'{worker_url}/validate',
+                                   {'job_id': job_id, 'repo': repo, 'commit_hash': commit_hash, 'report': shard},
+                                   timeout): worker_url
+                   for worker_url, shard in zip(worker_urls, shards)}
+        for future in as_completed(futures):
+            try:
+                verdict = future.result()
+            except (OSError, ValueError) as e:
+                verdict = {'matches': False, 'error': f"Worker {futures[future]} failed: {e}",
+                           'error_type': ShardException.__name__, 'failing_location': None, 'timings': {}}
+            verdicts.append(verdict)
+
+            if not verdict['matches'] and failure is None:
+                failure = verdict
+                _cancel_job(worker_urls, job_id, timeout)
+
+    timings: Dict[str, float] = {'split': split_seconds}
+    for verdict in verdicts:
+        for phase, seconds in verdict.get('timings', {}).items():
+            timings[phase] = max(timings.get(phase, 0.0), seconds)
+    timings['total'] = time.perf_counter() - started_at
+
+    if failure is None:
+        return ValidationResult(True, timings=timings)
+
+    failing_location = None
+    if failure.get('failing_location') is not None:
+        region = failure['failing_location']['region']
+        failing_location = ReportLocation(None, failure['failing_location']['uri'],
+                                          CodeRegion(region) if region is not None else None)
+    return ValidationResult(False, error=ShardException(failure['error'], failure.get('error_type')),
+                            failing_location=failing_location, timings=timings)
+
+
+def _cancel_job(worker_urls: Sequence[str], job_id: str, timeout: Optional[float]):
+    for worker_url in worker_urls:
+        try:
+            _post(f'{worker_url}/cancel', {'job_id': job_id}, timeout)
+        except (OSError, ValueError):
+            # The worker is gone, so it is not validating the job anymore
+            pass
+
+
+def _post(url: str, body: Dict, timeout: Optional[float]) -> Dict:
+    request = urllib.request.Request(url, data=json.dumps(body).encode('utf-8'), method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return loads_json(response.read())
+
+
+def _handler_class(worker: ShardWorker):
+    class ShardRequestHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            try:
+                request = loads_json(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                if self.path == '/validate':
+                    response = worker.validate(request)
+                elif self.path == '/cancel':
+                    worker.cancel(request['job_id'])
+                    response = {}
+                else:
+                    self.send_error(404)
+                    return
+            except (ValueError, KeyError, TypeError) as e:
+                self.send_error(400, str(e))
+                return
+
+            body = json.dumps(response).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Requests are not logged, as every job sends one per worker
+            pass
+
+    return ShardRequestHandler
@@ -0,0 +1,264 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from utils import dir_exists, is_github_repo_url, read_json_file
+from .api import ReportValidator, ValidationResult
+
+REPORT_EXTENSIONS = ('.json', '.sarif', '.snap')
+SIDECAR_SUFFIX = '.meta.json'
+RESULT_SUFFIX = '.result.json'
+# Scanners may write reports under these names and rename them once complete
+PARTIAL_SUFFIXES = ('.tmp', '.part')
+
+FILENAME_SEPARATOR = '__'
+GITHUB_URL = 'https://github.com'
+
+
+class SpoolException(Exception):
+    pass
+
+
+class SpoolWatcher:
+    def __init__(self, spool_dir: str, validator: Optional[ReportValidator] = None, max_workers: int = 4,
+                 allow_local_repos: bool = False):
+        """
+        Initializes a SpoolWatcher object.
+
+        The watcher validates the reports dropped into a spool directory on a bounded pool of threads
+        and writes every verdict next to its report, see `result_path`. A report with a verdict is
+        never validated again, so the watcher can be restarted at any time.
+
+        The repository and commit of a report are read from its sidecar, see `read_job`.
+
+        Args:
+            spool_dir (str): The directory to watch.
+            validator (ReportValidator, optional): The validator shared by the workers.
+            max_workers (int): The maximum number of reports validated at a time.
+            allow_local_repos (bool): Whether sidecars may name local repository paths instead of GitHub URLs.
+        """
+        self.spool_dir = spool_dir
+        self.validator = validator or ReportValidator()
+        self.allow_local_repos = allow_local_repos
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='spool')
+        self._pending: Dict[str, Future] = {}
+        self._sizes: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def scan(self) -> List[str]:
+        """
+        Lists the reports ready to be validated: without a verdict yet, not being validated, and whose
+        size and modification time did not change since the previous scan, as they may still be written.
+
+        Returns:
+            List[str]: The report paths, the oldest first.
+        """
+        sizes: Dict[str, Tuple[int, int]] = {}
+        ready: List[Tuple[int, str]] = []
+
+        with os.scandir(self.spool_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not is_report_file(entry.name):
+                    continue
+                if os.path.exists(result_path(entry.path)):
+                    continue
+
+                stat = entry.stat()
+                sizes[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                with self._lock:
+                    pending = entry.path in self._pending
+                if not pending and self._sizes.get(entry.path) == sizes[entry.path]:
+                    ready.append((stat.st_mtime_ns, entry.path))
+
+        self._sizes = sizes
+        return [report_path for _, report_path in sorted(ready)]
+
+    def poll(self) -> int:
+        """
+        Schedules the validation of every report ready.
+
+        Returns:
+            int: The number of reports scheduled.
+        """
+        report_paths = self.scan()
+        with self._lock:
+            for report_path in report_paths:
+                future = self._executor.submit(self.handle, report_path)
+                self._pending[report_path] = future
+                future.add_done_callback(lambda _, path=report_path: self._done(path))
+        return len(report_paths)
+
+    def run(self, stop: Optional[threading.Event] = None, poll_interval: float = 0.1):
+        """
+        Watches the spool directory until stopped.
+
+        Args:
+            stop (threading.Event, optional): Stops the watcher once set. The watcher runs forever if None.
+            poll_interval (float): The seconds between two scans. A report is validated after two scans
+                find it unchanged, so the delay from drop to validation is at most twice this interval.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.poll()
+            stop.wait(poll_interval)
+
+    def drain(self, poll_interval: float = 0.1):
+        """
+        Validates every report already in the spool directory, and returns once they have a verdict.
+
+        Args:
+            poll_interval (float): The seconds between two scans.
+        """
+        while True:
+            self.poll()
+            with self._lock:
+                pending = list(self._pending.values())
+            for future in pending:
+                future.result()
+            if not pending:
+                if not self._sizes:
+                    return
+                # Reports seen for the first time are ready at the next scan
+                time.sleep(poll_interval)
+
+    def handle(self, report_path: str) -> ValidationResult:
+        """
+        Validates a report and writes its verdict next to it.
+
+        Args:
+            report_path (str): The path to the report.
+
+        Returns:
+            ValidationResult: The verdict.
+        """
+        repo, commit_hash = None, None
+        try:
+            repo, commit_hash = read_job(report_path, self.allow_local_repos)
+            result = self.validator.validate(repo, commit_hash, report_path)
+        except Exception as e:
+            # Reports that cannot be validated get a verdict as well, so they are not retried forever
+            result = ValidationResult(False, error=e)
+
+        write_result(report_path, repo, commit_hash, result)
+        return result
+
+    def close(self, wait: bool = True):
+        """
+        Stops the workers.
+
+        Args:
+            wait (bool): Whether to wait for the running validations to write their verdict.
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _done(self, report_path: str):
+        with self._lock:
+            self._pending.pop(report_path, None)
+
+
+def is_report_file(file_name: str) -> bool:
+    """
+    Checks whether a file of the spool directory is a report to validate.
+
+    Args:
+        file_name (str): The file name.
+
+    Returns:
+        bool: True unless the file is hidden, partially written, a sidecar, a verdict or of another type.
+    """
+    if file_name.startswith('.') or file_name.endswith(PARTIAL_SUFFIXES):
+        return False
+    if file_name.endswith((SIDECAR_SUFFIX, RESULT_SUFFIX)):
+        return False
+    return file_name.endswith(REPORT_EXTENSIONS)
+
+
+def sidecar_path(report_path: str) -> str:
+    """
+    Gets the path of the sidecar of a report, e.g. `scan-42.json.meta.json` for `scan-42.json`.
+
+    Args:
+        report_path (str): The path to the report.
+
+    Returns:
+        str: The path to the sidecar, named after the whole report name so `scan-42.json` and
+            `scan-42.sarif` have their own.
+    """
+    return report_path + SIDECAR_SUFFIX
+
+
+def result_path(report_path: str) -> str:
+    """
+    Gets the path of the verdict of a report, e.g. `scan-42.json.result.json` for `scan-42.json`.
+
+    Args:
+        report_path (str): The path to the report.
+
+    Returns:
+        str: The path to the verdict, named after the whole report name so `scan-42.json` and
+            `scan-42.sarif` have their own.
+    """
+    return report_path + RESULT_SUFFIX
+
+
+def read_job(report_path: str, allow_local_repos: bool = False) -> Tuple[str, str]:
+    """
+    Reads the repository and commit a report must be validated against.
+
+    They are read from the sidecar of the report, a JSON file with `repo_url` and `commit_hash`
+    written before the report, or else from a report named `<owner>__<repo>__<commit_hash>.json`.
+
+    Args:
+        report_path (str): The path to the report.
+        allow_local_repos (bool): Whether the sidecar may name a local repository path.
+
+    Returns:
+        Tuple[str, str]: The repository (GitHub URL, or local path if allowed) and commit hash.
+
+    Raises:
+        SpoolException: If neither the sidecar nor the file name give the repository and commit, or
+            if the repository is not a GitHub repository, see `is_github_repo_url`.
+    """
+    sidecar = sidecar_path(report_path)
+    if os.path.isfile(sidecar):
+        metadata = read_json_file(sidecar)
+        repo_url, commit_hash = metadata.get('repo_url'), metadata.get('commit_hash')
+        if not isinstance(repo_url, str) or not isinstance(commit_hash, str) or not repo_url or not commit_hash:
+            raise SpoolException(f"The sidecar '{sidecar}' must have a 'repo_url' and a 'commit_hash'.")
+        if not is_github_repo_url(repo_url) and not (allow_local_repos and dir_exists(repo_url)):
+            raise SpoolException(f"The repository '{repo_url}' of the sidecar '{sidecar}' is not valid.")
+        return repo_url, commit_hash
+
+    name = os.path.splitext(os.path.basename(report_path))[0]
+    owner, _, rest = name.partition(FILENAME_SEPARATOR)
+    repo, _, commit_hash = rest.rpartition(FILENAME_SEPARATOR)
+    if not owner or not repo or not commit_hash:
+        raise SpoolException(f"No sidecar for '{report_path}', and its name is not "
+                             f"'<owner>{FILENAME_SEPARATOR}<repo>{FILENAME_SEPARATOR}<commit_hash>'.")
+    repo_url = f'{GITHUB_URL}/{owner}/{repo}'
+    if not is_github_repo_url(repo_url):
+        raise SpoolException(f"The repository '{repo_url}' of '{report_path}' is not valid.")
+    return repo_url, commit_hash
+
+
+def write_result(report_path: str, repo: Optional[str], commit_hash: Optional[str], result: ValidationResult):
+    """
+    Writes the verdict of a report next to it, atomically so a verdict is never read half written.
+
+    Args:
+        report_path (str): The path to the report.
+        repo (str, optional): The repository the report was validated against.
+        commit_hash (str, optional): The commit the report was validated against.
+        result (ValidationResult): The verdict.
+    """
+    verdict = {'repo_url': repo, 'commit_hash': commit_hash}
+    verdict.update(result.to_dict())
+
+    path = result_path(report_path)
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as result_file:
+        json.dump(verdict, result_file, indent=2)
+    os.replace(temporary_path, path)
@@ -0,0 +1,61 @@
+import argparse
+
+from argparse import Namespace
+
+from repository import ProjectCache
+from validator import ReportValidator, SpoolWatcher
+from utils import dir_exists, set_json_backend, JSON_BACKENDS
+
+
+def parse_arguments() -> Namespace:
+    """
+    Parse command-line arguments.
+
+    Returns:
+        Namespace: An object containing the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Validate the Snyk Code reports dropped into a spool directory.")
+    parser.add_argument("spool_dir", type=str, help="Directory where the reports are dropped")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of reports validated at a time")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="Seconds between two scans of the directory")
+    parser.add_argument("--once", action='store_true',
+                        help="Validate the reports already in the directory, then exit")
+    parser.add_argument("--auto-reference", action='store_true', required=False,
+                        help="Share Git objects with an already cloned fork of the same project")
+    parser.add_argument("--cache-budget", type=int, required=False, default=None,
+                        help="Disk budget in bytes for the projects folder, least recently used projects are removed")
+    parser.add_argument("--allow-local-repos", action='store_true', required=False,
+                        help="Accept local repository paths in sidecars, not only GitHub URLs")
+    parser.add_argument("--json-backend", type=str, required=False, default=None, choices=JSON_BACKENDS,
+                        help="JSON decoder for the reports, the fastest one installed by default")
+
+    return parser.parse_args()
+
+
+def main():
+    """
+    Watches a spool directory and writes the verdict of every report dropped into it next to the report.
+
+    Raises:
+        Exception: If the spool directory does not exist.
+    """
+    args = parse_arguments()
+    if not dir_exists(args.spool_dir):
+        raise Exception(f"The provided spool directory: '{args.spool_dir}' does not exist.")
+    set_json_backend(args.json_backend)
+
+    validator = ReportValidator(ProjectCache(max_bytes=args.cache_budget), auto_reference=args.auto_reference)
+    watcher = SpoolWatcher(args.spool_dir, validator, args.concurrency, args.allow_local_repos)
+    try:
+        if args.once:
+            watcher.drain(args.poll_interval)
+        else:
+            watcher.run(poll_interval=args.poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()
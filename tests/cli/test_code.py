@@ -7,6 +7,7 @@ from cli import (
     read_code_snippet,
     read_single_line_code_snippet,
     read_multiple_line_code_snippet,
+    verify_file_regions,
     starts_with_space,
     InvalidLineException,
     InvalidContentException,
@@ -56,6 +57,28 @@ class TestCliCode(unittest.TestCase):
         with self.assertRaises(InvalidContentException):
             process_source_code(self.project_dir, sarif_report)
 
+    def test_process_source_code_with_workers(self):
+        with open(self.code_file_path, 'r') as json_file:
+            sarif_report = SarifReport(json.load(json_file))
+
+        code_reports = process_source_code(self.project_dir, sarif_report, workers=2)
+
+        # Files verified on a process pool give the same reports, in the same order
+        sequential_reports = process_source_code(self.project_dir, sarif_report)
+        self.assertEqual([code_report.to_string() for code_report in code_reports],
+                         [code_report.to_string() for code_report in sequential_reports])
+
+    def test_process_source_code_with_workers_invalid_content(self):
+        with open('tests/fixtures/snyk_report_invalid_content_in_location.json', 'r') as json_file:
+            sarif_report = SarifReport(json.load(json_file))
+
+        with self.assertRaises(InvalidContentException) as context:
+            process_source_code(self.project_dir, sarif_report, workers=2)
+
+        # The failing location is kept when raised in a worker process
+        self.assertIsNotNone(context.exception.code_file_path)
+        self.assertIsNotNone(context.exception.code_region)
+
     @patch('cli.code.read_multiple_line_code_snippet')
     @patch('cli.code.read_single_line_code_snippet')
     def test_read_code_snippet_single_line(self, mock_single_lines, mock_multiple_lines):
@@ -148,6 +171,51 @@ class TestCliCode(unittest.TestCase):
         with self.assertRaises(InvalidLineException):
             read_multiple_line_code_snippet(file_path, code_region)
 
+    def test_verify_file_regions(self):
+        file_path = 'tests/fixtures/project/src/com/ibm/security/appscan/altoromutual/listener/StartupListener.java'
+        regions = [
+            CodeRegion({'startLine': 15, 'endLine': 15, 'startColumn': 13, 'endColumn': 47}),
+            CodeRegion({'startLine': 13, 'endLine': 15, 'startColumn': 17, 'endColumn': 74}),
+            CodeRegion({'startLine': 13, 'endLine': 13, 'startColumn': 17, 'endColumn': 35}),
+        ]
+
+        code_reports = dict(verify_file_regions(file_path, list(enumerate(regions))))
+
+        # Overlapping regions read in a single pass match the regions read one by one
+        self.assertEqual(len(code_reports), len(regions))
+        for index, region in enumerate(regions):
+            self.assertEqual(code_reports[index].line_content,
+                             read_code_snippet(file_path, region).line_content)
+
+    def test_verify_file_regions_throw_invalid_number_of_lines_exception(self):
+        file_path = 'tests/fixtures/project/src/com/ibm/security/appscan/altoromutual/listener/StartupListener.java'
+        regions = [
+            CodeRegion({'startLine': 13, 'endLine': 13, 'startColumn': 17, 'endColumn': 35}),
+            CodeRegion({'startLine': 13, 'endLine': 1000, 'startColumn': 17, 'endColumn': 35}),
+        ]
+
+        with self.assertRaises(InvalidLineException) as context:
+            verify_file_regions(file_path, list(enumerate(regions)))
+
+        self.assertIn("line end: 1000", str(context.exception))
+
+    def test_verify_file_regions_collect_errors(self):
+        file_path = 'tests/fixtures/project/src/com/ibm/security/appscan/altoromutual/listener/StartupListener.java'
+        regions = [
+            CodeRegion({'startLine': 13, 'endLine': 1000, 'startColumn': 17, 'endColumn': 35}),
+            CodeRegion({'startLine': 13, 'endLine': 13, 'startColumn': 17, 'endColumn': 35}),
+            CodeRegion({'startLine': 13, 'endLine': 13, 'startColumn': 1, 'endColumn': 2}),
+        ]
+        errors = []
+
+        code_reports = verify_file_regions(file_path, list(enumerate(regions)), errors)
+
+        # Every region is checked, and the mismatches are collected instead of raised
+        self.assertEqual([index for index, _ in code_reports], [1])
+        self.assertEqual([index for index, _ in sorted(errors, key=lambda error: error[0])], [0, 2])
+        self.assertIsInstance(dict(errors)[0], InvalidLineException)
+        self.assertIsInstance(dict(errors)[2], InvalidContentException)
+
     def test_starts_with_space_true(self):
         self.assertTrue(starts_with_space(' starts with space'))
 
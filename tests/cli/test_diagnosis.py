@@ -0,0 +1,105 @@
+import json
+import unittest
+from report import SarifReport
+from cli import diagnose_source_code, InvalidContentException
+
+
+def sarif_report_with_locations(locations):
+    results = [{
+        "ruleId": rule_id,
+        "locations": [{"physicalLocation": {"artifactLocation": {"uri": uri}, "region": region}}],
+    } for rule_id, uri, region in locations]
+    return SarifReport({"runs": [{"results": results}]})
+
+
+class TestCliDiagnosis(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = 'tests/fixtures/project'
+
+    def test_diagnose_matching_report(self):
+        with open('tests/fixtures/snyk_report.json', 'r') as json_file:
+            sarif_report = SarifReport(json.load(json_file))
+
+        summary = diagnose_source_code(self.project_dir, sarif_report)
+
+        # Locations repeated across results and code flows are checked once
+        self.assertTrue(summary.matches)
+        self.assertEqual(summary.stats.total, 3)
+        self.assertEqual(summary.match_ratio, 1.0)
+
+    def test_diagnose_mismatching_report(self):
+        with open('tests/fixtures/snyk_report_invalid_content_in_location.json', 'r') as json_file:
+            sarif_report = SarifReport(json.load(json_file))
+
+        summary = diagnose_source_code(self.project_dir, sarif_report)
+
+        self.assertFalse(summary.matches)
+        self.assertEqual(summary.match_ratio, 0.75)
+        self.assertEqual(len(summary.mismatches), 1)
+        self.assertIsInstance(summary.mismatches[0].error, InvalidContentException)
+        uri = 'src/com/ibm/security/appscan/altoromutual/servlet/LoginServletInvalidLine.java'
+        self.assertEqual(summary.by_file[uri].mismatched, 1)
+        self.assertEqual(summary.by_rule['java/WebCookieMissesCallToSetHttpOnly'].mismatched, 1)
+        self.assertEqual(summary.by_rule['java/WebCookieMissesCallToSetHttpOnly'].total, 2)
+        self.assertIn("Matched 3/4 locations (75.0%)", summary.to_string())
+
+    def collect_every_mismatch_report(self):
+        uri = 'src/com/ibm/security/appscan/altoromutual/listener/StartupListener.java'
+        return uri, sarif_report_with_locations([
+            ("rule/A", uri, {"startLine": 13, "endLine": 13, "startColumn": 17, "endColumn": 35}),
+            ("rule/A", uri, {"startLine": 1000, "endLine": 1000, "startColumn": 1, "endColumn": 2}),
+            ("rule/B", uri, {"startLine": 13, "endLine": 13, "startColumn": 1, "endColumn": 2}),
+            ("rule/B", "src/Missing.java", {"startLine": 1, "endLine": 1, "startColumn": 1, "endColumn": 2}),
+        ])
+
+    def test_diagnose_collects_every_mismatch(self):
+        uri, sarif_report = self.collect_every_mismatch_report()
+
+        summary = diagnose_source_code(self.project_dir, sarif_report)
+
+        # Checking goes on after the first mismatch, and missing files count as mismatches
+        self.assertEqual(summary.stats.total, 4)
+        self.assertEqual(summary.stats.mismatched, 3)
+        self.assertEqual(summary.by_file[uri].mismatched, 2)
+        self.assertEqual(summary.by_file["src/Missing.java"].mismatched, 1)
+        self.assertEqual(summary.by_rule["rule/A"].match_ratio, 0.5)
+        self.assertEqual(summary.by_rule["rule/B"].mismatched, 2)
+
+    def test_diagnose_with_workers(self):
+        uri, sarif_report = self.collect_every_mismatch_report()
+        # Another file, so the files are verified on the pool
+        login_servlet = 'src/com/ibm/security/appscan/altoromutual/servlet/LoginServletInvalidLine.java'
+        sarif_report.data['runs'][0]['results'].append({"ruleId": "rule/A", "locations": [{"physicalLocation": {
+            "artifactLocation": {"uri": login_servlet},
+            "region": {"startLine": 1, "endLine": 1, "startColumn": 1, "endColumn": 2}}}]})
+
+        sequential = diagnose_source_code(self.project_dir, sarif_report)
+        pooled = diagnose_source_code(self.project_dir, sarif_report, workers=2)
+
+        # The pool finds the same mismatches, in the same order
+        self.assertEqual(pooled.stats.mismatched, sequential.stats.mismatched)
+        self.assertEqual([(mismatch.location.artifact_location_uri, type(mismatch.error))
+                          for mismatch in pooled.mismatches],
+                         [(mismatch.location.artifact_location_uri, type(mismatch.error))
+                          for mismatch in sequential.mismatches])
+
+    def test_diagnose_hash_mismatch(self):
+        uri = 'src/com/ibm/security/appscan/altoromutual/listener/StartupListener.java'
+        sarif_report = sarif_report_with_locations([
+            ("rule/A", uri, {"startLine": 13, "endLine": 13, "startColumn": 17, "endColumn": 35}),
+        ])
+        sarif_report.data['runs'][0]['artifacts'] = [{'location': {'uri': uri}, 'hashes': {'sha-256': 'abc'}}]
+
+        summary = diagnose_source_code(self.project_dir, sarif_report)
+
+        # The locations of a file whose hash does not match mismatch, even when their region matches
+        self.assertFalse(summary.matches)
+        self.assertEqual(summary.stats.mismatched, 1)
+        self.assertIsInstance(summary.mismatches[0].error, InvalidContentException)
+        self.assertIn("Matched 0/1 locations (0.0%)", summary.to_string())
+        self.assertIn(f"Hash mismatch: {uri} expected abc", summary.to_string())
+
+
+if __name__ == '__main__':
+    unittest.main()
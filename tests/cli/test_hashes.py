@@ -0,0 +1,63 @@
+import copy
+import hashlib
+import json
+import unittest
+from report import SarifReport
+from cli import process_source_code, InvalidContentException
+from cli.hashes import compute_artifact_hashes, _blob_digests
+
+LOGIN_SERVLET = 'src/com/ibm/security/appscan/altoromutual/servlet/LoginServlet.java'
+ADMIN_LOGIN_SERVLET = 'src/com/ibm/security/appscan/altoromutual/servlet/AdminLoginServlet.java'
+
+
+class TestCliHashes(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = 'tests/fixtures/project'
+        with open('tests/fixtures/snyk_report.json', 'r') as json_file:
+            self.report_data = json.load(json_file)
+        with open(f'{self.project_dir}/{LOGIN_SERVLET}', 'rb') as code_file:
+            self.login_servlet_sha256 = hashlib.sha256(code_file.read()).hexdigest()
+
+    def report_with_artifacts(self, artifacts):
+        report_data = copy.deepcopy(self.report_data)
+        report_data['runs'][0]['artifacts'] = artifacts
+        return SarifReport(report_data)
+
+    def test_compute_artifact_hashes(self):
+        artifact_hashes = {LOGIN_SERVLET: {'md5': 'abc', 'SHA-256': 'ABC'}, ADMIN_LOGIN_SERVLET: {'crc': '1'}}
+
+        digests = compute_artifact_hashes(self.project_dir, artifact_hashes, [LOGIN_SERVLET, ADMIN_LOGIN_SERVLET])
+
+        # The preferred algorithm is used, and files without a supported hash are skipped
+        self.assertEqual(digests, {LOGIN_SERVLET: ('abc', self.login_servlet_sha256)})
+
+    def test_compute_artifact_hashes_reuses_blob_digests(self):
+        _blob_digests[('blob-id', 'sha256')] = 'cached'
+
+        digests = compute_artifact_hashes(self.project_dir, {LOGIN_SERVLET: {'sha-256': 'abc'}}, [LOGIN_SERVLET],
+                                          {LOGIN_SERVLET: 'blob-id'})
+
+        self.assertEqual(digests, {LOGIN_SERVLET: ('abc', 'cached')})
+        _blob_digests.clear()
+
+    def test_process_source_code_with_matching_hash(self):
+        sarif_report = self.report_with_artifacts([
+            {'location': {'uri': LOGIN_SERVLET}, 'hashes': {'sha-256': self.login_servlet_sha256}}
+        ])
+
+        code_reports = process_source_code(self.project_dir, sarif_report)
+
+        # Only the regions of the file without a hash are read
+        self.assertEqual([code_report.line_content for code_report in code_reports],
+                         ['password.equals(', 'password = request.getParameter("password");', 'password.equals('])
+
+    def test_process_source_code_with_mismatching_hash(self):
+        sarif_report = self.report_with_artifacts([
+            {'location': {'uri': LOGIN_SERVLET}, 'hashes': {'sha-256': '0' * 64}}
+        ])
+
+        with self.assertRaises(InvalidContentException) as context:
+            process_source_code(self.project_dir, sarif_report)
+
+        self.assertIn("Invalid file hash", str(context.exception))
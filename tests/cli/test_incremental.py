@@ -0,0 +1,82 @@
+import copy
+import json
+import unittest
+from report import SarifReport, CodeRegion, ReportLocation
+from cli import process_source_code_incremental
+from cli.incremental import is_carried_over, map_to_base_line, location_key
+
+LOGIN_SERVLET = 'src/com/ibm/security/appscan/altoromutual/servlet/LoginServlet.java'
+ADMIN_LOGIN_SERVLET = 'src/com/ibm/security/appscan/altoromutual/servlet/AdminLoginServlet.java'
+
+
+class TestCliIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = 'tests/fixtures/project'
+        with open('tests/fixtures/snyk_report.json', 'r') as json_file:
+            self.report_data = json.load(json_file)
+        self.sarif_report = SarifReport(self.report_data)
+
+    def test_process_source_code_incremental_without_changes(self):
+        code_reports = process_source_code_incremental(self.project_dir, self.sarif_report, self.sarif_report, {})
+
+        # Every location is carried over from the baseline
+        self.assertEqual(code_reports, [])
+
+    def test_process_source_code_incremental_with_changed_lines(self):
+        changed_line_ranges = {ADMIN_LOGIN_SERVLET: [(45, 1, 45, 1)]}
+
+        code_reports = process_source_code_incremental(self.project_dir, self.sarif_report, self.sarif_report,
+                                                       changed_line_ranges)
+
+        self.assertEqual([code_report.code_region.start_line for code_report in code_reports], [45, 45])
+        self.assertEqual(code_reports[0].line_content, 'password.equals(')
+
+    def test_process_source_code_incremental_with_shifted_lines(self):
+        # The baseline report was created before two lines were inserted at the top of LoginServlet
+        baseline_data = copy.deepcopy(self.report_data)
+        result = baseline_data['runs'][0]['results'][0]
+        regions = [location['physicalLocation']['region'] for location in result['locations']] + \
+                  [location['location']['physicalLocation']['region']
+                   for location in result['codeFlows'][0]['threadFlows'][0]['locations']]
+        for region in regions:
+            region['startLine'] = 92
+            region['endLine'] = 92
+        baseline_report = SarifReport(baseline_data)
+
+        code_reports = process_source_code_incremental(self.project_dir, self.sarif_report, baseline_report,
+                                                       {LOGIN_SERVLET: [(1, 0, 2, 2)]})
+        self.assertEqual(code_reports, [])
+
+        # Without the shift, line 94 was never validated in the baseline
+        code_reports = process_source_code_incremental(self.project_dir, self.sarif_report, baseline_report, {})
+        self.assertEqual(len(code_reports), 2)
+        self.assertEqual(code_reports[0].code_file_path, f'{self.project_dir}/{LOGIN_SERVLET}')
+
+    def test_is_carried_over_with_new_file(self):
+        location = ReportLocation(None, LOGIN_SERVLET, CodeRegion(
+            {'startLine': 94, 'endLine': 94, 'startColumn': 36, 'endColumn': 64}))
+        baseline_keys = {location_key(location.artifact_location_uri, location.region)}
+
+        self.assertTrue(is_carried_over(location, baseline_keys, {}))
+        self.assertFalse(is_carried_over(location, baseline_keys, {LOGIN_SERVLET: None}))
+
+    def test_is_carried_over_with_deletion_inside_region(self):
+        location = ReportLocation(None, LOGIN_SERVLET, CodeRegion(
+            {'startLine': 10, 'endLine': 12, 'startColumn': 1, 'endColumn': 5}))
+        baseline_keys = {(LOGIN_SERVLET, 10, 14, 1, 5)}
+
+        self.assertFalse(is_carried_over(location, baseline_keys, {LOGIN_SERVLET: [(12, 2, 11, 0)]}))
+
+    def test_is_carried_over_with_incomplete_region(self):
+        location = ReportLocation(None, LOGIN_SERVLET, CodeRegion({'startLine': 10}))
+
+        self.assertFalse(is_carried_over(location, set(), {}))
+
+    def test_map_to_base_line(self):
+        # Two lines inserted after line 4 and three lines deleted after line 20
+        hunks = [(4, 0, 5, 2), (19, 3, 20, 0)]
+
+        self.assertEqual(map_to_base_line(3, hunks), 3)
+        self.assertEqual(map_to_base_line(10, hunks), 8)
+        self.assertEqual(map_to_base_line(21, hunks), 22)
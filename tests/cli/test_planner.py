@@ -0,0 +1,41 @@
+import unittest
+from report import CodeRegion
+from cli.planner import plan_file_order
+
+LOGIN_SERVLET = 'src/com/ibm/security/appscan/altoromutual/servlet/LoginServlet.java'
+ADMIN_LOGIN_SERVLET = 'src/com/ibm/security/appscan/altoromutual/servlet/AdminLoginServlet.java'
+STARTUP_LISTENER = 'src/com/ibm/security/appscan/altoromutual/listener/StartupListener.java'
+MISSING_FILE = 'src/com/ibm/security/appscan/altoromutual/Missing.java'
+
+
+class TestCliPlanner(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = 'tests/fixtures/project'
+
+    @staticmethod
+    def regions(end_line):
+        return [(0, CodeRegion({'startLine': 1, 'endLine': end_line, 'startColumn': 1, 'endColumn': 1}))]
+
+    def test_plan_file_order(self):
+        regions_by_file = {
+            STARTUP_LISTENER: self.regions(10),
+            LOGIN_SERVLET: self.regions(10),
+            ADMIN_LOGIN_SERVLET: self.regions(1_000_000),
+            MISSING_FILE: self.regions(10),
+        }
+
+        file_order = plan_file_order(self.project_dir, regions_by_file, [LOGIN_SERVLET])
+
+        # Missing files first, then impossible end lines, then recently changed files
+        self.assertEqual(file_order, [MISSING_FILE, ADMIN_LOGIN_SERVLET, LOGIN_SERVLET, STARTUP_LISTENER])
+
+    def test_plan_file_order_regions_closer_to_the_end_first(self):
+        regions_by_file = {
+            LOGIN_SERVLET: self.regions(10),
+            STARTUP_LISTENER: self.regions(20),
+        }
+
+        file_order = plan_file_order(self.project_dir, regions_by_file)
+
+        self.assertEqual(file_order, [STARTUP_LISTENER, LOGIN_SERVLET])
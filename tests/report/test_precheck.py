@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import unittest
+from report import SarifReport, SnapshotReport, InvalidReportException, check_report_structure, \
+    compile_snapshot, is_relative_uri
+
+
+def single_location_report(uri, region):
+    return SarifReport({"runs": [{"results": [{"locations": [{"physicalLocation": {
+        "artifactLocation": {"uri": uri}, "region": region}}]}]}]})
+
+
+class TestPrecheck(unittest.TestCase):
+
+    def setUp(self):
+        with open('tests/fixtures/snyk_report.json', 'r') as json_file:
+            self.sarif_report = SarifReport(json.load(json_file))
+        temp_file = tempfile.NamedTemporaryFile(suffix='.snapshot', delete=False)
+        temp_file.close()
+        self.snapshot_path = temp_file.name
+
+    def tearDown(self):
+        os.remove(self.snapshot_path)
+
+    def assert_invalid(self, report, message):
+        with self.assertRaises(InvalidReportException) as context:
+            check_report_structure(report)
+        self.assertIn(message, str(context.exception))
+        return context.exception
+
+    def test_valid_report(self):
+        check_report_structure(self.sarif_report)
+
+        compile_snapshot(self.sarif_report, self.snapshot_path)
+        snapshot_report = SnapshotReport(self.snapshot_path)
+        check_report_structure(snapshot_report)
+        snapshot_report.close()
+
+    def test_invalid_regions(self):
+        region = {"startLine": 3, "endLine": 4, "startColumn": 1, "endColumn": 10}
+
+        self.assert_invalid(single_location_report("src/Main.java", dict(region, startLine=5)), "lines 5 to 4")
+        self.assert_invalid(single_location_report("src/Main.java", dict(region, startLine=0)), "lines 0 to 4")
+        self.assert_invalid(single_location_report("src/Main.java", dict(region, startColumn=0)), "column 0")
+        self.assert_invalid(single_location_report("src/Main.java", dict(region, endLine="4")), "'endLine'")
+        self.assert_invalid(single_location_report("src/Main.java", dict(region, endColumn=True)), "'endColumn'")
+        error = self.assert_invalid(single_location_report("src/Main.java", {"startLine": 3}), "'endLine'")
+        self.assertEqual(error.code_file_path, "src/Main.java")
+        self.assertEqual(error.code_region.data, {"startLine": 3})
+
+    def test_missing_sarif_structure(self):
+        region = {"startLine": 3, "endLine": 4, "startColumn": 1, "endColumn": 10}
+
+        error = self.assert_invalid(SarifReport({"runs": [{"results": [{"locations": [{"physicalLocation": {
+            "artifactLocation": {"uri": "src/Main.java"}}}]}]}]}), "has no 'region'")
+        self.assertEqual(error.code_file_path, "src/Main.java")
+        self.assert_invalid(SarifReport({"runs": [{"results": [{"locations": [{"physicalLocation": {
+            "region": region}}]}]}]}), "no artifact location 'uri'")
+        self.assert_invalid(SarifReport({"runs": [{"results": [{"locations": [{}]}]}]}),
+                            "no artifact location 'uri'")
+        self.assert_invalid(SarifReport({"runs": [{"results": [{"codeFlows": [{"threadFlows": [{"locations": [
+            {"location": {"physicalLocation": {"artifactLocation": {"uri": "src/Main.java"}}}}]}]}]}]}]}),
+            "has no 'region'")
+        self.assert_invalid(SarifReport({"runs": [{}]}), "no list of 'results'")
+        self.assert_invalid(SarifReport({"runs": [{"results": ["result"]}]}), "is not a JSON object")
+        self.assert_invalid(SarifReport([]), "is not a JSON object")
+
+    def test_invalid_snapshot_regions(self):
+        compile_snapshot(single_location_report("src/Main.java", {"startLine": 3, "endLine": 2}), self.snapshot_path)
+        snapshot_report = SnapshotReport(self.snapshot_path)
+
+        self.assert_invalid(snapshot_report, "'startColumn'")
+        snapshot_report.close()
+
+    def test_uri_outside_of_repository(self):
+        region = {"startLine": 3, "endLine": 4, "startColumn": 1, "endColumn": 10}
+
+        self.assert_invalid(single_location_report("../secrets.txt", region), "outside of the repository")
+
+        compile_snapshot(single_location_report("/etc/passwd", region), self.snapshot_path)
+        snapshot_report = SnapshotReport(self.snapshot_path)
+        self.assert_invalid(snapshot_report, "outside of the repository")
+        snapshot_report.close()
+
+    def test_is_relative_uri(self):
+        self.assertTrue(is_relative_uri("src/Main.java"))
+        self.assertTrue(is_relative_uri("src/../Main.java"))
+        self.assertFalse(is_relative_uri(""))
+        self.assertFalse(is_relative_uri("src/../../Main.java"))
+        self.assertFalse(is_relative_uri("..\\Main.java"))
+        self.assertFalse(is_relative_uri("/src/Main.java"))
+        self.assertFalse(is_relative_uri("C:\\src\\Main.java"))
+        self.assertFalse(is_relative_uri("file:///src/Main.java"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+from report import SarifReport, SnapshotReport, compile_snapshot, is_snapshot, load_report
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        with open('tests/fixtures/snyk_report.json', 'r') as json_file:
+            self.sarif_report = SarifReport(json.load(json_file))
+        temp_file = tempfile.NamedTemporaryFile(suffix='.snapshot', delete=False)
+        temp_file.close()
+        self.snapshot_path = temp_file.name
+
+    def tearDown(self):
+        os.remove(self.snapshot_path)
+
+    @staticmethod
+    def to_tuples(report):
+        return [(location.rule_id, location.artifact_location_uri, location.region.data)
+                for location in report.iter_locations()]
+
+    def test_compile_and_load_snapshot(self):
+        compile_snapshot(self.sarif_report, self.snapshot_path)
+
+        snapshot_report = SnapshotReport(self.snapshot_path)
+
+        # The snapshot yields the same locations, in the same order, as the JSON report
+        self.assertEqual(self.to_tuples(snapshot_report), self.to_tuples(self.sarif_report))
+        # Repeated locations are stored once
+        self.assertEqual(len(snapshot_report._locations), 3 * 5)
+        snapshot_report.close()
+
+    def test_compile_snapshot_with_artifact_hashes(self):
+        report_data = json.loads(json.dumps(self.sarif_report.data))
+        report_data['runs'][0]['artifacts'] = [{'location': {'uri': 'src/Main.java'}, 'hashes': {'sha-256': 'abc'}}]
+        sarif_report = SarifReport(report_data)
+
+        compile_snapshot(sarif_report, self.snapshot_path)
+        snapshot_report = SnapshotReport(self.snapshot_path)
+
+        self.assertEqual(snapshot_report.artifact_hashes, {'src/Main.java': {'sha-256': 'abc'}})
+        snapshot_report.close()
+
+    def test_compile_snapshot_with_missing_region_values(self):
+        sarif_report = SarifReport({"runs": [{"results": [{"locations": [{"physicalLocation": {
+            "artifactLocation": {"uri": "src/Main.java"}, "region": {"startLine": 3}}}]}]}]})
+
+        compile_snapshot(sarif_report, self.snapshot_path)
+        snapshot_report = SnapshotReport(self.snapshot_path)
+
+        self.assertEqual(self.to_tuples(snapshot_report), [(None, "src/Main.java", {"startLine": 3})])
+        snapshot_report.close()
+
+    def test_compile_snapshot_with_invalid_region_value(self):
+        sarif_report = SarifReport({"runs": [{"results": [{"locations": [{"physicalLocation": {
+            "artifactLocation": {"uri": "src/Main.java"}, "region": {"startLine": "3"}}}]}]}]})
+
+        with self.assertRaises(ValueError):
+            compile_snapshot(sarif_report, self.snapshot_path)
+
+    def test_load_report(self):
+        compile_snapshot(self.sarif_report, self.snapshot_path)
+
+        self.assertTrue(is_snapshot(self.snapshot_path))
+        self.assertFalse(is_snapshot('tests/fixtures/snyk_report.json'))
+        self.assertIsInstance(load_report('tests/fixtures/snyk_report.json'), SarifReport)
+        snapshot_report = load_report(self.snapshot_path)
+        self.assertIsInstance(snapshot_report, SnapshotReport)
+        snapshot_report.close()
+
+    def test_load_invalid_snapshot(self):
+        with open(self.snapshot_path, 'wb') as snapshot_file:
+            snapshot_file.write(b'not a snapshot' * 4)
+
+        with self.assertRaises(ValueError):
+            SnapshotReport(self.snapshot_path)
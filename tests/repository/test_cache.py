@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from repository import ProjectCache, RepoNotValidException
+
+
+class TestProjectCache(unittest.TestCase):
+
+    def setUp(self):
+        self.projects_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.projects_dir)
+
+    def create_project(self, name, size, last_used):
+        project_dir = os.path.join(self.projects_dir, name)
+        os.makedirs(os.path.join(project_dir, '.git'))
+        with open(os.path.join(project_dir, 'file.txt'), 'w') as file:
+            file.write('x' * size)
+        os.utime(project_dir, (last_used, last_used))
+        return project_dir
+
+    def test_use_without_budget(self):
+        cache = ProjectCache(self.projects_dir)
+
+        with cache.use("https://github.com/example/repo") as project_dir:
+            self.assertEqual(project_dir, os.path.join(self.projects_dir, "example/repo"))
+
+        # No bookkeeping is done without a budget
+        self.assertFalse(os.path.exists(cache.index_path))
+
+    def test_use_records_size_and_last_use(self):
+        cache = ProjectCache(self.projects_dir, max_bytes=1000)
+
+        with cache.use("https://github.com/example/repo") as project_dir:
+            os.makedirs(os.path.join(project_dir, '.git'))
+            with open(os.path.join(project_dir, 'file.txt'), 'w') as file:
+                file.write('x' * 100)
+
+        with open(cache.index_path, 'r') as index_file:
+            entries = json.load(index_file)
+
+        self.assertEqual(entries[project_dir]['size'], 100)
+        self.assertIn('last_used', entries[project_dir])
+
+    def test_use_rejects_paths_outside_of_projects_dir(self):
+        cache = ProjectCache(os.path.join(self.projects_dir, 'projects'), max_bytes=1)
+
+        for repo_url in ("https://github.com/a/../..", "https://github.com/a/..", "https://github.com/",
+                         "https://github.com/a//b"):
+            with self.assertRaises(RepoNotValidException):
+                with cache.use(repo_url):
+                    pass
+
+    def test_evict_skips_paths_outside_of_projects_dir(self):
+        cache = ProjectCache(os.path.join(self.projects_dir, 'projects'), max_bytes=1)
+        outside = self.create_project("outside", 100, 1000)
+        os.makedirs(cache.projects_dir)
+        with open(cache.index_path, 'w') as index_file:
+            json.dump({os.path.join(cache.projects_dir, 'a', '..', '..', 'outside'): {'size': 100, 'last_used': 0},
+                       cache.projects_dir + '/..': {'size': 100, 'last_used': 0}}, index_file)
+
+        self.assertEqual(cache.evict(), [])
+        self.assertTrue(os.path.exists(outside))
+
+    def test_evict_skips_held_projects(self):
+        reference = self.create_project("upstream/repo", 100, 1000)
+        cache = ProjectCache(self.projects_dir, max_bytes=1)
+
+        # A reference repository is not evicted while a fork is cloned from it
+        with cache.hold(reference) as held_dir:
+            self.assertEqual(held_dir, reference)
+            self.assertEqual(cache.evict(), [])
+        self.assertEqual(cache.evict(), [reference])
+
+        with cache.hold(reference) as held_dir:
+            self.assertIsNone(held_dir)
+
+    def test_evict_least_recently_used(self):
+        oldest = self.create_project("example/oldest", 100, 1000)
+        older = self.create_project("example/older", 100, 2000)
+        newest = self.create_project("example/newest", 100, 3000)
+        cache = ProjectCache(self.projects_dir, max_bytes=150)
+
+        evicted = cache.evict()
+
+        self.assertEqual(evicted, [oldest, older])
+        self.assertFalse(os.path.exists(oldest))
+        self.assertFalse(os.path.exists(older))
+        self.assertTrue(os.path.exists(newest))
+
+    def test_evict_never_removes_projects_in_use(self):
+        cache = ProjectCache(self.projects_dir, max_bytes=0)
+        in_use = self.create_project("example/repo", 100, 1000)
+
+        with cache.use("https://github.com/example/repo"):
+            evicted = cache.evict()
+            self.assertEqual(evicted, [])
+            self.assertTrue(os.path.exists(in_use))
+
+        # Once released, the project is evicted to stay under the budget
+        self.assertFalse(os.path.exists(in_use))
+
+    def test_evict_keeps_reference_repositories(self):
+        upstream = self.create_project("upstream/repo", 100, 1000)
+        fork = self.create_project("fork/repo", 100, 2000)
+        os.makedirs(os.path.join(fork, '.git', 'objects', 'info'))
+        with open(os.path.join(fork, '.git', 'objects', 'info', 'alternates'), 'w') as alternates:
+            alternates.write(os.path.abspath(os.path.join(upstream, '.git', 'objects')) + '\n')
+        cache = ProjectCache(self.projects_dir, max_bytes=150)
+
+        evicted = cache.evict()
+
+        self.assertEqual(evicted, [fork])
+        self.assertTrue(os.path.exists(upstream))
@@ -2,12 +2,20 @@ import os
 import shutil
 import unittest
 from unittest.mock import Mock, patch, call
+import git
 from git.exc import GitCommandError, InvalidGitRepositoryError
 from repository import (
     CommitNotValidException,
+    DiffParseException,
     RepoNotValidException,
     clone_github_repository,
-    checkout_to_commit
+    checkout_to_commit,
+    find_reference_repository,
+    fetch_commit,
+    get_blob_ids,
+    get_changed_line_ranges,
+    get_recently_changed_files,
+    parse_unified_diff,
 )
 
 
@@ -31,6 +39,15 @@ class TestGitFunctions(unittest.TestCase):
 
         mock_repo.assert_has_calls(expected_calls)
 
+    @patch('repository.git.Repo')
+    def test_clone_github_repository_with_reference(self, mock_repo):
+        reference_dir = "projects/upstream/repo"
+        expected_calls = [call.clone_from(self.repo_url, self.destination_dir, reference_if_able=reference_dir)]
+
+        clone_github_repository(self.repo_url, self.destination_dir, reference_dir)
+
+        mock_repo.assert_has_calls(expected_calls)
+
     @patch('repository.git.Repo.clone_from')
     def test_clone_github_repository_existing_directory(self, mock_clone_from):
         clone_github_repository(self.repo_url, 'tests/repository')
@@ -52,6 +69,38 @@ class TestGitFunctions(unittest.TestCase):
         with self.assertRaises(RepoNotValidException):
             clone_github_repository("invalid_url", self.destination_dir)
 
+    @patch('repository.github.has_commit', return_value=False)
+    @patch('repository.github.git')
+    def test_fetch_commit_fails(self, mock_git, mock_has_commit):
+        mock_git.Repo().git.fetch.side_effect = GitCommandError("fetch", "error")
+
+        with self.assertRaises(CommitNotValidException):
+            fetch_commit(self.destination_dir, self.commit_hash)
+
+    @patch('repository.github.has_commit', return_value=True)
+    @patch('repository.github.git')
+    def test_fetch_commit_already_fetched(self, mock_git, mock_has_commit):
+        fetch_commit(self.destination_dir, self.commit_hash)
+
+        mock_git.Repo().git.fetch.assert_not_called()
+
+    def test_find_reference_repository(self):
+        projects_dir = os.path.join(self.destination_dir, "projects")
+        os.makedirs(os.path.join(projects_dir, "upstream", "repo", ".git"))
+        os.makedirs(os.path.join(projects_dir, "other", "different", ".git"))
+
+        reference_dir = find_reference_repository(os.path.join(projects_dir, "fork", "repo"))
+
+        self.assertEqual(reference_dir, os.path.join(projects_dir, "upstream", "repo"))
+
+    def test_find_reference_repository_without_siblings(self):
+        projects_dir = os.path.join(self.destination_dir, "projects")
+        os.makedirs(os.path.join(projects_dir, "fork", "repo", ".git"))
+
+        reference_dir = find_reference_repository(os.path.join(projects_dir, "fork", "repo"))
+
+        self.assertIsNone(reference_dir)
+
     @patch('repository.github.git')
     def test_checkout_to_commit(self, mock_git):
         expected_calls = [call.Repo(), call.Repo(self.destination_dir), call.Repo().git.checkout(self.commit_hash)]
@@ -68,3 +117,137 @@ class TestGitFunctions(unittest.TestCase):
 
         with self.assertRaises(CommitNotValidException):
             checkout_to_commit(self.destination_dir, "invalid_commit_hash")
+
+    @patch('repository.github.git')
+    def test_get_recently_changed_files(self, mock_git):
+        mock_git.Repo().git.return_value.log.return_value = "src/B.java\nsrc/A.java\n\nsrc/C.java\nsrc/B.java"
+
+        recent_files = get_recently_changed_files(self.destination_dir, self.commit_hash)
+
+        # Files are unique and the most recently changed come first
+        self.assertEqual(recent_files, ["src/B.java", "src/A.java", "src/C.java"])
+
+    @patch('repository.github.git')
+    def test_get_recently_changed_files_invalid_commit(self, mock_git):
+        mock_git.Repo().git.return_value.log.side_effect = GitCommandError("log", "error")
+
+        with self.assertRaises(CommitNotValidException):
+            get_recently_changed_files(self.destination_dir, "invalid_commit_hash")
+
+    @patch('repository.github.git')
+    def test_get_blob_ids(self, mock_git):
+        mock_git.Repo().git.return_value.ls_tree.return_value = \
+            "100644 blob 1111111111111111111111111111111111111111\tsrc/My File.java\0" \
+            "160000 commit 2222222222222222222222222222222222222222\tsubmodule\0"
+
+        blob_ids = get_blob_ids(self.destination_dir, self.commit_hash, ["src/My File.java", "submodule"])
+
+        self.assertEqual(blob_ids, {"src/My File.java": "1111111111111111111111111111111111111111"})
+
+    @patch('repository.github.git')
+    def test_get_changed_line_ranges_invalid_commit(self, mock_git):
+        mock_git.Repo().git.return_value.diff.side_effect = GitCommandError("diff", "error")
+
+        with self.assertRaises(CommitNotValidException):
+            get_changed_line_ranges(self.destination_dir, "invalid_commit_hash", self.commit_hash)
+
+    def test_parse_unified_diff(self):
+        diff = "diff --git a/src/Changed.java b/src/Changed.java\n" \
+               "index 1111111..2222222 100644\n" \
+               "--- a/src/Changed.java\n" \
+               "+++ b/src/Changed.java\n" \
+               "@@ -4,0 +5,2 @@ class Changed {\n" \
+               "+    int a;\n" \
+               "+    int b;\n" \
+               "@@ -20 +22 @@ class Changed {\n" \
+               "--- /dev/null\n" \
+               "+    int c;\n" \
+               "diff --git a/src/Added.java b/src/Added.java\n" \
+               "new file mode 100644\n" \
+               "--- /dev/null\n" \
+               "+++ b/src/Added.java\n" \
+               "@@ -0,0 +1 @@\n" \
+               "+class Added {}\n" \
+               "diff --git a/image.png b/image.png\n" \
+               "Binary files a/image.png and b/image.png differ\n"
+
+        changed_line_ranges = parse_unified_diff(diff)
+
+        self.assertEqual(changed_line_ranges, {
+            'src/Changed.java': [(4, 0, 5, 2), (20, 1, 22, 1)],
+            'src/Added.java': None,
+            'image.png': None,
+        })
+
+    def test_parse_unified_diff_quoted_paths(self):
+        diff = 'diff --git a/src/First.java b/src/First.java\n' \
+               '--- a/src/First.java\n' \
+               '+++ b/src/First.java\n' \
+               '@@ -1 +1 @@\n' \
+               'diff --git "a/src/Qu\\"oted\\\\Tab\\t\\303\\251.java" "b/src/Qu\\"oted\\\\Tab\\t\\303\\251.java"\n' \
+               '--- "a/src/Qu\\"oted\\\\Tab\\t\\303\\251.java"\n' \
+               '+++ "b/src/Qu\\"oted\\\\Tab\\t\\303\\251.java"\n' \
+               '@@ -3,2 +3 @@\n'
+
+        changed_line_ranges = parse_unified_diff(diff)
+
+        # The hunks of the quoted file are not credited to the first file
+        self.assertEqual(changed_line_ranges, {
+            'src/First.java': [(1, 1, 1, 1)],
+            'src/Qu"oted\\Tab\t\u00e9.java': [(3, 2, 3, 1)],
+        })
+
+    def test_parse_unified_diff_unreadable_header(self):
+        diff = 'diff --git a/src/First.java b/src/First.java\n' \
+               '@@ -1 +1 @@\n' \
+               'diff --git src/Second.java src/Second.java\n' \
+               '@@ -7 +7 @@\n'
+
+        # A file that cannot be read is never left out of the changed files
+        with self.assertRaises(DiffParseException):
+            parse_unified_diff(diff)
+
+    def test_parse_unified_diff_unreadable_hunk_header(self):
+        diff = 'diff --git a/src/First.java b/src/First.java\n' \
+               '@@ nonsense @@\n'
+
+        with self.assertRaises(DiffParseException):
+            parse_unified_diff(diff)
+
+    def test_get_changed_line_ranges_quoted_path(self):
+        repo = git.Repo.init(self.destination_dir)
+        actor = git.Actor("Test", "test@example.com")
+        path = os.path.join(self.destination_dir, 'Qu"oted.java')
+        with open(path, 'w') as file:
+            file.write('a\nb\n')
+        repo.git.add(A=True)
+        base_commit = repo.index.commit("Base", author=actor, committer=actor).hexsha
+        with open(path, 'w') as file:
+            file.write('a\nc\n')
+        repo.git.add(A=True)
+        commit = repo.index.commit("Change", author=actor, committer=actor).hexsha
+        repo.close()
+
+        changed_line_ranges = get_changed_line_ranges(self.destination_dir, base_commit, commit)
+
+        self.assertEqual(changed_line_ranges, {'Qu"oted.java': [(2, 1, 2, 1)]})
+
+    def test_get_changed_line_ranges_without_prefixes(self):
+        repo = git.Repo.init(self.destination_dir)
+        actor = git.Actor("Test", "test@example.com")
+        path = os.path.join(self.destination_dir, 'Changed.java')
+        with open(path, 'w') as file:
+            file.write('a\nb\n')
+        repo.git.add(A=True)
+        base_commit = repo.index.commit("Base", author=actor, committer=actor).hexsha
+        with open(path, 'w') as file:
+            file.write('a\nc\n')
+        repo.git.add(A=True)
+        commit = repo.index.commit("Change", author=actor, committer=actor).hexsha
+        with repo.config_writer() as config:
+            config.set_value('diff', 'noprefix', 'true')
+        repo.close()
+
+        changed_line_ranges = get_changed_line_ranges(self.destination_dir, base_commit, commit)
+
+        self.assertEqual(changed_line_ranges, {'Changed.java': [(2, 1, 2, 1)]})
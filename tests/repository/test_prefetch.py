@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import git
+from repository import (
+    PrefetchJob,
+    PrefetchScheduler,
+    ProjectCache,
+    clone_github_repository,
+    has_commit,
+)
+
+
+class TestPrefetchScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.project_cache = ProjectCache(os.path.join(self.temp_dir, 'projects'))
+        self.scheduler = PrefetchScheduler(self.project_cache, max_workers=2)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+        shutil.rmtree(self.temp_dir)
+
+    def create_remote(self, name, number_of_commits=1):
+        # A local bare repository stands in for GitHub
+        work_dir = os.path.join(self.temp_dir, 'work', name)
+        repo = git.Repo.init(work_dir)
+        actor = git.Actor("Test", "test@example.com")
+        commit_hashes = []
+        for number in range(number_of_commits):
+            with open(os.path.join(work_dir, 'file.txt'), 'w') as file:
+                file.write(f'{number}\n')
+            repo.index.add(['file.txt'])
+            commit_hashes.append(repo.index.commit(f"Commit {number}", author=actor, committer=actor).hexsha)
+        remote_dir = os.path.join(self.temp_dir, 'remotes', name + '.git')
+        git.Repo.clone_from(work_dir, remote_dir, bare=True).close()
+        return remote_dir, commit_hashes, repo
+
+    def test_run_prefetches_every_job(self):
+        first_url, first_commits, _ = self.create_remote('owner/first', 2)
+        second_url, second_commits, _ = self.create_remote('owner/second')
+        jobs = [PrefetchJob(first_url, first_commits[0]), PrefetchJob(second_url, second_commits[0]),
+                PrefetchJob(first_url, first_commits[1])]
+
+        results = self.scheduler.run(jobs, lambda job: has_commit(self.scheduler.project_dir(job), job.commit_hash))
+
+        # Every job runs once its repository and commit are there
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(warm for _, warm in results))
+
+    def test_run_warm_jobs_first(self):
+        cold_url, cold_commits, _ = self.create_remote('owner/cold')
+        warm_url, warm_commits, _ = self.create_remote('owner/warm')
+        clone_github_repository(warm_url, self.project_cache.project_dir(warm_url))
+        jobs = [PrefetchJob(cold_url, cold_commits[0], 'cold'), PrefetchJob(warm_url, warm_commits[0], 'warm')]
+        warm_job_ran = threading.Event()
+
+        def slow_clone(*args):
+            # The cold repository is only cloned after the warm job ran
+            warm_job_ran.wait(timeout=10)
+            clone_github_repository(*args)
+
+        def handler(job):
+            warm_job_ran.set()
+            return job.payload
+
+        with patch('repository.prefetch.clone_github_repository', side_effect=slow_clone):
+            results = self.scheduler.run(jobs, handler)
+
+        self.assertEqual([result for _, result in results], ['warm', 'cold'])
+
+    def test_submit_fetches_new_commits(self):
+        url, commits, work_repo = self.create_remote('owner/repo')
+        project_dir = self.project_cache.project_dir(url)
+        clone_github_repository(url, project_dir)
+        actor = git.Actor("Test", "test@example.com")
+        new_commit = work_repo.index.commit("New commit", author=actor, committer=actor).hexsha
+        work_repo.git.push(url, 'HEAD:refs/heads/new')
+        job = PrefetchJob(url, new_commit)
+
+        self.assertFalse(has_commit(project_dir, new_commit))
+        self.scheduler.submit([job])
+        self.assertIs(self.scheduler.next_job([job]), job)
+
+        self.assertTrue(has_commit(project_dir, new_commit))
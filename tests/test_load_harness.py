@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from load_harness import (
+    create_stand_in_repository,
+    git_url_rewrite_env,
+    plan_jobs,
+    run_load,
+    percentile,
+)
+
+
+class TestLoadHarness(unittest.TestCase):
+
+    def test_percentile(self):
+        values = [float(value) for value in range(1, 101)]
+
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 95), 95.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile([3.0], 99), 3.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_plan_jobs(self):
+        commits = {'https://github.com/load-test/project-0': ('match0', 'mismatch0'),
+                   'https://github.com/load-test/project-1': ('match1', 'mismatch1')}
+
+        jobs = plan_jobs(commits, 'report.json', 9, 1 / 3)
+
+        # Every third job is a mismatch, and the jobs alternate between repositories
+        self.assertEqual([job.expected for job in jobs], [True, True, False] * 3)
+        self.assertEqual([job.commit_hash for job in jobs[:3]], ['match0', 'match1', 'mismatch0'])
+
+    def test_run_load(self):
+        with tempfile.TemporaryDirectory() as work_root:
+            repo_url = 'https://github.com/load-test/project-0'
+            bare_dir = os.path.join(work_root, 'project-0.git')
+            commits = {repo_url: create_stand_in_repository('tests/fixtures/project', bare_dir)}
+            jobs = plan_jobs(commits, os.path.abspath('tests/fixtures/snyk_report.json'), 4, 0.5)
+
+            summary = run_load(jobs, 2, os.path.join(work_root, 'slots'), git_url_rewrite_env({repo_url: bare_dir}))
+
+        # Reports are validated against the stand-in repository through main.py
+        self.assertEqual(summary['jobs'], 4)
+        self.assertEqual(summary['unexpected_verdicts'], 0)
+        self.assertLessEqual(summary['p50'], summary['p99'])
+        self.assertGreater(summary['throughput'], 0)
+        self.assertGreater(summary['peak_rss_mib'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -39,14 +39,16 @@ class TestParseArguments(unittest.TestCase):
 class TestValidateArguments(unittest.TestCase):
     def test_valid_arguments(self):
         # Create a mock 'args' object with valid arguments
-        args = Mock(report_path='tests/fixtures/snyk_report.json', repo_url='https://github.com/example/repo')
+        args = Mock(report_path='tests/fixtures/snyk_report.json', repo_url='https://github.com/example/repo',
+                    baseline_commit=None, baseline_report=None, shards=None)
 
         # The function should not raise any exceptions with valid arguments
         validate_arguments(args)
 
     def test_invalid_report_path(self):
         # Create a mock 'args' object with an invalid report path
-        args = Mock(report_path='non_existent_report.json', repo_url='https://github.com/example/repo')
+        args = Mock(report_path='non_existent_report.json', repo_url='https://github.com/example/repo',
+                    baseline_commit=None, baseline_report=None, shards=None)
 
         # The function should raise an Exception for an invalid report path
         with self.assertRaises(Exception) as context:
@@ -56,10 +58,42 @@ class TestValidateArguments(unittest.TestCase):
 
     def test_invalid_repo_url(self):
         # Create a mock 'args' object with an invalid repo URL
-        args = Mock(report_path='tests/fixtures/snyk_report.json', repo_url='http://example.com/repo')
+        args = Mock(report_path='tests/fixtures/snyk_report.json', repo_url='http://example.com/repo',
+                    baseline_commit=None, baseline_report=None, shards=None)
 
         # The function should raise an Exception for an invalid repo URL
         with self.assertRaises(Exception) as context:
             validate_arguments(args)
 
         self.assertIn("is not valid", str(context.exception))
+
+    def test_baseline_commit_without_baseline_report(self):
+        args = Mock(report_path='tests/fixtures/snyk_report.json', repo_url='https://github.com/example/repo',
+                    baseline_commit='commit123', baseline_report=None, shards=None)
+
+        # The function should raise an Exception if only one of the baseline arguments is given
+        with self.assertRaises(Exception) as context:
+            validate_arguments(args)
+
+        self.assertIn("must be provided", str(context.exception))
+
+    def test_invalid_baseline_report_path(self):
+        args = Mock(report_path='tests/fixtures/snyk_report.json', repo_url='https://github.com/example/repo',
+                    baseline_commit='commit123', baseline_report='non_existent_report.json', shards=None)
+
+        # The function should raise an Exception for an invalid baseline report path
+        with self.assertRaises(Exception) as context:
+            validate_arguments(args)
+
+        self.assertIn("does not exist", str(context.exception))
+
+    def test_shards_with_baseline(self):
+        args = Mock(report_path='tests/fixtures/snyk_report.json', repo_url='https://github.com/example/repo',
+                    baseline_commit='commit123', baseline_report='tests/fixtures/snyk_report.json',
+                    shards=['http://127.0.0.1:8765'])
+
+        # Shards are validated from scratch, without a baseline
+        with self.assertRaises(Exception) as context:
+            validate_arguments(args)
+
+        self.assertIn("Shards can't be combined", str(context.exception))
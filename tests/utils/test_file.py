@@ -1,11 +1,15 @@
 import os
+import hashlib
 import unittest
 import json
 from utils import (
     read_lines_from_file,
+    hash_file,
     get_code_path,
     read_json_file,
     get_project_dir,
+    is_github_repo_url,
+    get_dir_size,
     dir_exists,
     file_exists,
 )
@@ -27,6 +31,18 @@ class TestFileFunctions(unittest.TestCase):
         # Clean up temporary utils
         os.remove(temp_file_path)
 
+    def test_hash_file(self):
+        temp_file_path = "temp_file.txt"
+        with open(temp_file_path, 'wb') as file:
+            file.write(b"Line 1\nLine 2")
+
+        digest = hash_file(temp_file_path, "sha256")
+
+        # Check if the digest matches the content of the file
+        self.assertEqual(digest, hashlib.sha256(b"Line 1\nLine 2").hexdigest())
+
+        os.remove(temp_file_path)
+
     def test_get_code_path(self):
         project_dir = "/path/to/project"
         code_location = "src/main/java/utils.java"
@@ -59,6 +75,36 @@ class TestFileFunctions(unittest.TestCase):
         # Check if the project directory is correctly formed
         self.assertEqual(project_dir, "projects/example/repo")
 
+    def test_get_project_dir_with_projects_dir(self):
+        repo_url = "https://github.com/example/repo"
+
+        project_dir = get_project_dir(repo_url, "/tmp/projects")
+
+        self.assertEqual(project_dir, "/tmp/projects/example/repo")
+
+    def test_get_project_dir_outside_of_projects_dir(self):
+        for repo_url in ("https://github.com/a/../..", "https://github.com/a/.",
+                         "https://github.com/a//b", "https://github.com/a/b\\.."):
+            with self.assertRaises(ValueError):
+                get_project_dir(repo_url)
+
+    def test_is_github_repo_url(self):
+        self.assertTrue(is_github_repo_url("https://github.com/example/repo"))
+        self.assertTrue(is_github_repo_url("https://github.com/example/repo/"))
+        self.assertFalse(is_github_repo_url("https://github.com/example/.."))
+        self.assertFalse(is_github_repo_url("https://github.com/example/repo/tree"))
+        self.assertFalse(is_github_repo_url("https://github.com.example.com/example/repo"))
+        self.assertFalse(is_github_repo_url("/tmp/example/repo"))
+
+    def test_get_dir_size(self):
+        size = get_dir_size("tests/fixtures/project")
+
+        # Check if the size of every file was added
+        expected_size = sum(os.path.getsize(os.path.join(root, name))
+                            for root, _, files in os.walk("tests/fixtures/project") for name in files)
+        self.assertEqual(size, expected_size)
+        self.assertGreater(size, 0)
+
     def test_dir_exists(self):
         existing_directory = "tests/fixtures"
 
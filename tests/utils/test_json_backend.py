@@ -0,0 +1,69 @@
+import json
+import unittest
+from utils import (
+    read_json_file,
+    get_json_backend,
+    set_json_backend,
+    loads_json,
+    JsonBackendException,
+    JSON_BACKENDS,
+)
+
+
+def installed_backends():
+    backends = []
+    for name in JSON_BACKENDS:
+        try:
+            get_json_backend(name)
+        except JsonBackendException:
+            continue
+        backends.append(name)
+    return backends
+
+
+class TestJsonBackend(unittest.TestCase):
+
+    def tearDown(self):
+        set_json_backend(None)
+
+    def test_read_json_file_parity(self):
+        with open('report.json', 'r', encoding='utf-8') as json_file:
+            expected = json.load(json_file)
+
+        # Every installed backend decodes the report like the standard library
+        for name in installed_backends():
+            with self.subTest(backend=name):
+                set_json_backend(name)
+                self.assertEqual(get_json_backend().name, name)
+                self.assertEqual(read_json_file('report.json'), expected)
+
+    def test_loads_json_parity_on_inputs_fast_backends_reject(self):
+        documents = [b'\xef\xbb\xbf{"a": 1}', b'{"a": NaN}']
+
+        for name in installed_backends():
+            set_json_backend(name)
+            for document in documents:
+                with self.subTest(backend=name, document=document):
+                    self.assertEqual(repr(loads_json(document)), repr(json.loads(document)))
+
+    def test_loads_json_invalid_document(self):
+        for name in installed_backends():
+            with self.subTest(backend=name):
+                set_json_backend(name)
+                with self.assertRaises(json.JSONDecodeError):
+                    loads_json(b'{"a": ')
+
+    def test_default_backend_is_the_fastest_installed(self):
+        set_json_backend(None)
+
+        self.assertEqual(get_json_backend().name, installed_backends()[0])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(JsonBackendException) as context:
+            set_json_backend('yaml')
+
+        self.assertIn("Unknown JSON backend", str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
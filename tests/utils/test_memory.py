@@ -0,0 +1,59 @@
+import tracemalloc
+import unittest
+from utils import MemoryProfiler
+
+
+class TestMemoryProfiler(unittest.TestCase):
+
+    def test_phase(self):
+        profiler = MemoryProfiler(top_sites=3)
+        retained = []
+
+        with profiler.phase('allocate'):
+            temporary = [bytearray(1024) for _ in range(1024)]
+            retained.append(bytearray(512 * 1024))
+            del temporary
+        profiler.stop()
+
+        phase = profiler.phases['allocate']
+        # The temporary megabyte counts in the peak but not in the retained memory
+        self.assertGreaterEqual(phase.peak, 1024 * 1024)
+        self.assertGreaterEqual(phase.retained, 512 * 1024)
+        self.assertLess(phase.retained, 1024 * 1024)
+        self.assertLessEqual(len(phase.top_sites), 3)
+        self.assertIn('test_memory.py', phase.top_sites[0][0])
+        self.assertIn('allocate: peak', profiler.to_string())
+
+    def test_stop_only_when_started(self):
+        tracemalloc.start()
+        profiler = MemoryProfiler()
+        with profiler.phase('load'):
+            pass
+        profiler.stop()
+
+        # Tracing started by someone else is left running
+        self.assertTrue(tracemalloc.is_tracing())
+        tracemalloc.stop()
+
+        with profiler.phase('load'):
+            pass
+        profiler.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_overlapping_profilers(self):
+        first = MemoryProfiler()
+        second = MemoryProfiler()
+        with first.phase('load'):
+            with second.phase('load'):
+                first.stop()
+                # The second profiler still traces its phase
+                self.assertTrue(tracemalloc.is_tracing())
+        second.stop()
+
+        self.assertIn('load', first.phases)
+        self.assertIn('load', second.phases)
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from utils.shared_cache import SharedFileCache
+
+
+def read_shared_line(cache, commit_hash, file_path, line_number):
+    shared_file = cache.acquire(commit_hash, file_path)
+    try:
+        return shared_file.name, shared_file.get_line(line_number)
+    finally:
+        shared_file.close()
+
+
+class TestSharedFileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'code.java')
+        with open(self.file_path, 'wb') as file:
+            file.write(b"Line 1\r\nLine 2\rLine 3\nLine 4")
+        self.cache = SharedFileCache(namespace=f'srcmtest{os.getpid()}',
+                                     lock_path=os.path.join(self.temp_dir.name, 'shared.lock'))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_line(self):
+        shared_file = self.cache.acquire('commit123', self.file_path)
+
+        # Line breaks are normalized like files opened in text mode
+        self.assertEqual(shared_file.line_count, 4)
+        self.assertEqual(shared_file.get_line(0), "Line 1\n")
+        self.assertEqual(shared_file.get_line(1), "Line 2\n")
+        self.assertEqual(shared_file.get_line(-1), "Line 4")
+        with self.assertRaises(IndexError):
+            shared_file.get_line(4)
+
+        shared_file.close()
+        self.assertTrue(self.cache.release(shared_file.name))
+
+    def test_acquire_release(self):
+        first = self.cache.acquire('commit123', self.file_path)
+        second = self.cache.acquire('commit123', self.file_path)
+        other_commit = self.cache.acquire('commit456', self.file_path)
+
+        # The same file at the same commit shares one segment
+        self.assertEqual(first.name, second.name)
+        self.assertNotEqual(first.name, other_commit.name)
+        self.assertEqual(self.cache.references(first.name), 2)
+
+        for shared_file in (first, second, other_commit):
+            shared_file.close()
+
+        self.assertFalse(self.cache.release(first.name))
+        self.assertTrue(self.cache.release(first.name))
+        self.assertTrue(self.cache.release(other_commit.name))
+        self.assertEqual(self.cache.references(first.name), 0)
+        self.assertFalse(self.cache.release(first.name))
+
+    def test_acquire_rewritten_file(self):
+        leaked = self.cache.acquire('commit123', self.file_path)
+        leaked.close()
+        with open(self.file_path, 'wb') as file:
+            file.write(b"Rewritten line 1\n")
+        os.utime(self.file_path, ns=(0, 0))
+
+        # The segment never released holds the previous content, and is not served
+        shared_file = self.cache.acquire('commit123', self.file_path)
+
+        self.assertNotEqual(shared_file.name, leaked.name)
+        self.assertEqual(shared_file.line_count, 1)
+        self.assertEqual(shared_file.get_line(0), "Rewritten line 1\n")
+        shared_file.close()
+        self.assertTrue(self.cache.release(shared_file.name))
+        self.assertTrue(self.cache.release(leaked.name))
+
+    def test_release_is_silent(self):
+        script = ("from utils.shared_cache import SharedFileCache\n"
+                  f"cache = SharedFileCache({self.cache.namespace!r}, {self.cache.lock_path!r})\n"
+                  f"shared_file = cache.acquire('commit123', {self.file_path!r})\n"
+                  "shared_file.close()\n"
+                  "assert cache.release(shared_file.name)\n")
+
+        process = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                                 env=dict(os.environ, PYTHONPATH='src'))
+
+        # The resource tracker does not complain about segments it no longer tracks
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertEqual(process.stderr, '')
+
+    def test_acquire_across_processes(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(read_shared_line, [self.cache] * 3, ['commit123'] * 3,
+                                        [self.file_path] * 3, [0, 2, 3]))
+
+        # Every process attached to the segment read once
+        names = {name for name, _ in results}
+        self.assertEqual(len(names), 1)
+        self.assertEqual([line for _, line in results], ["Line 1\n", "Line 3\n", "Line 4"])
+        name = names.pop()
+        self.assertEqual(self.cache.references(name), 3)
+        for _ in results:
+            self.cache.release(name)
+        self.assertEqual(self.cache.references(name), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import shutil
+import tempfile
+import unittest
+import git
+
+
+class FixtureRepositoryTestCase(unittest.TestCase):
+    """
+    Base class of the tests validating reports against `tests/fixtures/project`, committed into a
+    temporary Git repository at `repo_dir`.
+    """
+
+    def setUp(self):
+        self.repo_dir = tempfile.mkdtemp()
+        shutil.copytree('tests/fixtures/project', self.repo_dir, dirs_exist_ok=True)
+        self.repo = git.Repo.init(self.repo_dir)
+        self.repo.git.add(A=True)
+        actor = git.Actor("Test", "test@example.com")
+        self.commit_hash = self.repo.index.commit("Initial commit", author=actor, committer=actor).hexsha
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.repo_dir)
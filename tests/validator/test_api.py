@@ -0,0 +1,106 @@
+import json
+from unittest.mock import patch
+from report import SarifReport, InvalidReportException
+from cli import InvalidContentException
+from repository import CommitNotValidException, DiffParseException
+from validator import ReportValidator, validate_report, read_report
+from fixture_repository import FixtureRepositoryTestCase
+
+
+class TestValidatorApi(FixtureRepositoryTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.report_path = 'tests/fixtures/snyk_report.json'
+
+    def test_validate_matching_report(self):
+        result = validate_report(self.repo_dir, self.commit_hash, self.report_path)
+
+        self.assertTrue(result.matches)
+        self.assertIsNone(result.error)
+        self.assertEqual(len(result.code_reports), 5)
+        self.assertEqual(set(result.timings), {'load', 'precheck', 'checkout', 'verify', 'total'})
+
+    def test_validate_mismatching_report(self):
+        result = validate_report(self.repo, self.commit_hash,
+                                 'tests/fixtures/snyk_report_invalid_content_in_location.json')
+
+        self.assertFalse(result)
+        self.assertIsInstance(result.error, InvalidContentException)
+        self.assertEqual(result.failing_location.artifact_location_uri,
+                         'src/com/ibm/security/appscan/altoromutual/servlet/LoginServletInvalidLine.java')
+        self.assertEqual(result.failing_location.region.start_line, 94)
+
+    def test_validate_collect_all(self):
+        result = ReportValidator().validate(self.repo_dir, self.commit_hash,
+                                            'tests/fixtures/snyk_report_invalid_content_in_location.json',
+                                            collect_all=True)
+
+        self.assertFalse(result.matches)
+        self.assertIsInstance(result.error, InvalidContentException)
+        self.assertEqual(result.summary.match_ratio, 0.75)
+        self.assertEqual(result.failing_location.region.start_line, 94)
+
+    def test_validate_profile_memory(self):
+        result = ReportValidator(profile_memory=True).validate(self.repo_dir, self.commit_hash, self.report_path)
+
+        self.assertTrue(result.matches)
+        self.assertEqual(set(result.memory), {'load', 'precheck', 'checkout', 'verify'})
+        self.assertGreater(result.memory['load'].peak, 0)
+
+    def test_validate_broken_report_before_cloning(self):
+        report = {"runs": [{"results": [{"locations": [{"physicalLocation": {
+            "artifactLocation": {"uri": "src/Main.java"},
+            "region": {"startLine": 5, "endLine": 3, "startColumn": 1, "endColumn": 2}}}]}]}]}
+
+        with patch('validator.api.clone_github_repository') as mock_clone:
+            result = ReportValidator().validate('https://github.com/owner/repo', self.commit_hash, report)
+
+        mock_clone.assert_not_called()
+        self.assertFalse(result.matches)
+        self.assertIsInstance(result.error, InvalidReportException)
+        self.assertEqual(result.failing_location.artifact_location_uri, 'src/Main.java')
+        self.assertEqual(set(result.timings), {'load', 'precheck', 'total'})
+
+    def test_validate_location_without_region(self):
+        report = {"runs": [{"results": [{"locations": [{"physicalLocation": {
+            "artifactLocation": {"uri": "src/Main.java"}}}]}]}]}
+
+        result = ReportValidator().validate(self.repo_dir, self.commit_hash, report)
+
+        self.assertFalse(result.matches)
+        self.assertIsInstance(result.error, InvalidReportException)
+        self.assertEqual(result.to_dict()['failing_location'], {'uri': 'src/Main.java', 'region': None})
+
+    def test_validate_unreadable_diff_from_baseline(self):
+        with patch('validator.api.get_changed_line_ranges', side_effect=DiffParseException("diff")), \
+                patch('validator.api.process_source_code_incremental') as mock_incremental:
+            result = ReportValidator().validate(self.repo_dir, self.commit_hash, self.report_path,
+                                                baseline_commit=self.commit_hash, baseline_report=self.report_path)
+
+        # The whole report is validated instead
+        mock_incremental.assert_not_called()
+        self.assertTrue(result.matches)
+        self.assertEqual(len(result.code_reports), 5)
+
+    def test_validate_invalid_commit(self):
+        result = ReportValidator().validate(self.repo_dir, '0' * 40, self.report_path)
+
+        self.assertFalse(result.matches)
+        self.assertIsInstance(result.error, CommitNotValidException)
+
+    def test_validate_report_inputs(self):
+        with open(self.report_path, 'rb') as report_file:
+            report_bytes = report_file.read()
+        validator = ReportValidator()
+
+        # The same validator is reused across calls
+        for report in (report_bytes, json.loads(report_bytes), SarifReport(json.loads(report_bytes))):
+            self.assertTrue(validator.validate(self.repo_dir, self.commit_hash, report).matches)
+
+    def test_read_report(self):
+        sarif_report = SarifReport({"runs": []})
+
+        self.assertIs(read_report(sarif_report), sarif_report)
+        self.assertIsInstance(read_report(b'{"runs": []}'), SarifReport)
+        self.assertIsInstance(read_report(self.report_path), SarifReport)
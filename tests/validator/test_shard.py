@@ -0,0 +1,164 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+from report import SarifReport, InvalidReportException
+from cli import ValidationCancelledException
+from validator import ReportValidator, ShardWorker, ShardException, split_report, validate_sharded
+from fixture_repository import FixtureRepositoryTestCase
+
+
+def start_worker_process(projects_dir):
+    process = subprocess.Popen([sys.executable, 'src/shard_worker.py', '--port', '0', '--projects-dir', projects_dir,
+                                '--allow-local-repos'], stdout=subprocess.PIPE, text=True)
+    url = process.stdout.readline().split()[-1]
+    return process, url
+
+
+class TestShard(FixtureRepositoryTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.repo_url = f'file://{self.repo_dir}'
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        super().tearDown()
+        shutil.rmtree(self.work_dir)
+
+    def test_split_report(self):
+        with open('tests/fixtures/snyk_report_invalid_content_in_location.json', 'r') as json_file:
+            sarif_report = SarifReport(json.load(json_file))
+
+        shards = split_report(sarif_report, 2)
+
+        # Every location ends up in exactly one shard, and a file is never split
+        locations = [(location.rule_id, location.artifact_location_uri, location.region.data)
+                     for location in sarif_report.iter_locations()]
+        shard_locations = [(location.rule_id, location.artifact_location_uri, location.region.data)
+                           for shard in shards for location in SarifReport(shard).iter_locations()]
+        self.assertEqual(sorted(map(repr, shard_locations)), sorted(map(repr, locations)))
+        shard_files = [{location.artifact_location_uri for location in SarifReport(shard).iter_locations()}
+                       for shard in shards]
+        self.assertEqual(sum(map(len, shard_files)), len(set.union(*shard_files)))
+        self.assertEqual(len(shards), 2)
+        # Shards without files are left out
+        self.assertEqual(len(split_report(sarif_report, 10)), len(set.union(*shard_files)))
+
+    def test_validate_sharded_with_worker_processes(self):
+        workers = [start_worker_process(os.path.join(self.work_dir, f'worker-{i}')) for i in range(2)]
+        try:
+            worker_urls = [url for _, url in workers]
+            matching = validate_sharded(self.repo_url, self.commit_hash, 'tests/fixtures/snyk_report.json',
+                                        worker_urls, timeout=60)
+            mismatching = validate_sharded(self.repo_url, self.commit_hash,
+                                           'tests/fixtures/snyk_report_invalid_content_in_location.json',
+                                           worker_urls, timeout=60)
+        finally:
+            for process, _ in workers:
+                process.terminate()
+                process.wait()
+                process.stdout.close()
+
+        self.assertTrue(matching.matches)
+        self.assertIn('verify', matching.timings)
+        self.assertFalse(mismatching.matches)
+        self.assertEqual(mismatching.error.error_type, 'InvalidContentException')
+        self.assertEqual(mismatching.failing_location.artifact_location_uri,
+                         'src/com/ibm/security/appscan/altoromutual/servlet/LoginServletInvalidLine.java')
+        self.assertEqual(mismatching.failing_location.region.start_line, 94)
+
+    def test_unreachable_worker(self):
+        worker = ShardWorker(ReportValidator())
+        url = worker.url
+        worker.shutdown()
+
+        result = validate_sharded(self.repo_dir, self.commit_hash, 'tests/fixtures/snyk_report.json', [url], timeout=5)
+
+        # A shard that could not be verified does not match
+        self.assertFalse(result.matches)
+        self.assertIsInstance(result.error, ShardException)
+
+    def test_broken_report_is_not_sent(self):
+        report = {"runs": [{"results": [{"locations": [{"physicalLocation": {
+            "artifactLocation": {"uri": "../Main.java"},
+            "region": {"startLine": 3, "endLine": 4, "startColumn": 1, "endColumn": 2}}}]}]}]}
+
+        # No worker listens on the URL, so it would fail if the report was sent
+        result = validate_sharded(self.repo_dir, self.commit_hash, report, ['http://127.0.0.1:9'], timeout=5)
+
+        self.assertFalse(result.matches)
+        self.assertIsInstance(result.error, InvalidReportException)
+        self.assertEqual(result.failing_location.artifact_location_uri, '../Main.java')
+
+    def test_worker_rejects_repositories_not_allowed(self):
+        worker = ShardWorker(ReportValidator())
+        try:
+            with patch.object(worker.validator, 'validate') as mock_validate:
+                verdicts = [worker.validate({'job_id': 'job123', 'repo': repo, 'commit_hash': self.commit_hash,
+                                             'report': {'runs': []}})
+                            for repo in (self.repo_dir, self.repo_url, 'https://github.com/owner/../..',
+                                         'https://example.com/owner/repo')]
+        finally:
+            worker.shutdown()
+
+        # Nothing is cloned or checked out for a repository that is not allowed
+        mock_validate.assert_not_called()
+        for verdict in verdicts:
+            self.assertFalse(verdict['matches'])
+            self.assertEqual(verdict['error_type'], ShardException.__name__)
+
+        local_worker = ShardWorker(allow_local_repos=True)
+        self.assertTrue(local_worker.is_allowed_repo(self.repo_url))
+        self.assertTrue(local_worker.is_allowed_repo(self.repo_dir))
+        self.assertFalse(local_worker.is_allowed_repo(self.work_dir + '/missing'))
+        local_worker.shutdown()
+
+    def test_worker_rejects_reports_not_json_objects(self):
+        worker = ShardWorker(ReportValidator(), allow_local_repos=True)
+        thread = threading.Thread(target=worker.serve_forever)
+        thread.start()
+        try:
+            with patch.object(worker.validator, 'validate') as mock_validate:
+                statuses = []
+                for report in ('/etc/hostname', 'tests/fixtures/snyk_report.json', ['runs']):
+                    body = json.dumps({'job_id': 'job123', 'repo': self.repo_dir, 'commit_hash': self.commit_hash,
+                                       'report': report}).encode('utf-8')
+                    with self.assertRaises(urllib.error.HTTPError) as context:
+                        urllib.request.urlopen(urllib.request.Request(f'{worker.url}/validate', data=body))
+                    statuses.append(context.exception.code)
+                    context.exception.close()
+        finally:
+            worker.shutdown()
+            thread.join()
+
+        # A report path would be read from the worker's disk
+        mock_validate.assert_not_called()
+        self.assertEqual(statuses, [400, 400, 400])
+
+    def test_cancel_before_shard_arrives(self):
+        worker = ShardWorker(ReportValidator(), allow_local_repos=True)
+        thread = threading.Thread(target=worker.serve_forever)
+        thread.start()
+        try:
+            worker.cancel('job123')
+            with open('tests/fixtures/snyk_report.json', 'r') as json_file:
+                verdict = worker.validate({'job_id': 'job123', 'repo': self.repo_dir,
+                                           'commit_hash': self.commit_hash, 'report': json.load(json_file)})
+        finally:
+            worker.shutdown()
+            thread.join()
+
+        self.assertFalse(verdict['matches'])
+        self.assertEqual(verdict['error_type'], ValidationCancelledException.__name__)
+
+
+if __name__ == '__main__':
+    unittest.main()
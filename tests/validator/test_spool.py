@@ -0,0 +1,148 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from validator import ReportValidator, SpoolWatcher, SpoolException, read_job, result_path, sidecar_path
+from fixture_repository import FixtureRepositoryTestCase
+
+
+class TestSpoolWatcher(FixtureRepositoryTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.spool_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        super().tearDown()
+        shutil.rmtree(self.spool_dir)
+
+    def drop_report(self, name, fixture_path, extension='.json'):
+        report_path = os.path.join(self.spool_dir, f'{name}{extension}')
+        with open(sidecar_path(report_path), 'w') as sidecar:
+            json.dump({'repo_url': self.repo_dir, 'commit_hash': self.commit_hash}, sidecar)
+        shutil.copy(fixture_path, report_path)
+        return report_path
+
+    def read_verdict(self, report_path):
+        with open(result_path(report_path)) as result_file:
+            return json.load(result_file)
+
+    def test_drain(self):
+        matching = self.drop_report('scan-1', 'tests/fixtures/snyk_report.json')
+        mismatching = self.drop_report('scan-2', 'tests/fixtures/snyk_report_invalid_content_in_location.json')
+        unknown = os.path.join(self.spool_dir, 'scan-3.json')
+        shutil.copy('tests/fixtures/snyk_report.json', unknown)
+
+        watcher = SpoolWatcher(self.spool_dir, ReportValidator(), max_workers=2, allow_local_repos=True)
+        watcher.drain(poll_interval=0.01)
+        watcher.close()
+
+        # Verdicts are written next to the reports
+        self.assertTrue(self.read_verdict(matching)['matches'])
+        self.assertEqual(self.read_verdict(matching)['commit_hash'], self.commit_hash)
+        mismatch = self.read_verdict(mismatching)
+        self.assertFalse(mismatch['matches'])
+        self.assertEqual(mismatch['failing_location']['region']['startLine'], 94)
+        self.assertIn("No sidecar", self.read_verdict(unknown)['error'])
+
+    def test_local_repos_need_opt_in(self):
+        report_path = self.drop_report('scan-1', 'tests/fixtures/snyk_report.json')
+        watcher = SpoolWatcher(self.spool_dir, ReportValidator())
+
+        result = watcher.handle(report_path)
+        watcher.close()
+
+        self.assertFalse(result.matches)
+        self.assertIsInstance(result.error, SpoolException)
+
+    def test_reports_with_the_same_stem(self):
+        json_report = self.drop_report('scan-1', 'tests/fixtures/snyk_report.json')
+        sarif_report = self.drop_report('scan-1', 'tests/fixtures/snyk_report_invalid_content_in_location.json',
+                                        '.sarif')
+
+        watcher = SpoolWatcher(self.spool_dir, ReportValidator(), allow_local_repos=True)
+        watcher.drain(poll_interval=0.01)
+        watcher.close()
+
+        # Every report has its own verdict
+        self.assertTrue(self.read_verdict(json_report)['matches'])
+        self.assertFalse(self.read_verdict(sarif_report)['matches'])
+
+    def test_restart_skips_reports_with_a_verdict(self):
+        self.drop_report('scan-1', 'tests/fixtures/snyk_report.json')
+        watcher = SpoolWatcher(self.spool_dir, ReportValidator(), allow_local_repos=True)
+        watcher.drain(poll_interval=0.01)
+        watcher.close()
+
+        restarted = SpoolWatcher(self.spool_dir, ReportValidator(), allow_local_repos=True)
+        with patch.object(restarted, 'handle') as mock_handle:
+            restarted.drain(poll_interval=0.01)
+        restarted.close()
+
+        mock_handle.assert_not_called()
+
+    def test_scan_waits_for_reports_being_written(self):
+        report_path = self.drop_report('scan-1', 'tests/fixtures/snyk_report.json')
+        partial_path = os.path.join(self.spool_dir, 'scan-2.json.part')
+        shutil.copy('tests/fixtures/snyk_report.json', partial_path)
+        watcher = SpoolWatcher(self.spool_dir, ReportValidator(), allow_local_repos=True)
+
+        # A report is ready once two scans find it unchanged
+        self.assertEqual(watcher.scan(), [])
+        self.assertEqual(watcher.scan(), [report_path])
+
+        with open(report_path, 'a') as report_file:
+            report_file.write(' ')
+        self.assertEqual(watcher.scan(), [])
+        watcher.close()
+
+    def test_run(self):
+        watcher = SpoolWatcher(self.spool_dir, ReportValidator(), allow_local_repos=True)
+        stop = threading.Event()
+        thread = threading.Thread(target=watcher.run, args=(stop, 0.01))
+        thread.start()
+
+        report_path = self.drop_report('scan-1', 'tests/fixtures/snyk_report.json')
+        for _ in range(500):
+            if os.path.exists(result_path(report_path)):
+                break
+            stop.wait(0.01)
+
+        stop.set()
+        thread.join()
+        watcher.close()
+        self.assertTrue(self.read_verdict(report_path)['matches'])
+
+    def test_read_job_from_file_name(self):
+        repo_url, commit_hash = read_job('/spool/in28minutes__spring-boot__examples__62fd5519.json')
+
+        self.assertEqual(repo_url, 'https://github.com/in28minutes/spring-boot__examples')
+        self.assertEqual(commit_hash, '62fd5519')
+
+        with self.assertRaises(SpoolException):
+            read_job('/spool/report.json')
+        with self.assertRaises(SpoolException):
+            read_job('/spool/owner__..__62fd5519.json')
+
+    def test_read_job_from_sidecar(self):
+        report_path = os.path.join(self.spool_dir, 'scan-1.json')
+
+        for repo_url in ('https://github.com/owner/../..', '/etc', 'https://example.com/owner/repo'):
+            with open(sidecar_path(report_path), 'w') as sidecar:
+                json.dump({'repo_url': repo_url, 'commit_hash': self.commit_hash}, sidecar)
+            with self.assertRaises(SpoolException):
+                read_job(report_path)
+
+        # Local repositories are only accepted on demand
+        with open(sidecar_path(report_path), 'w') as sidecar:
+            json.dump({'repo_url': self.repo_dir, 'commit_hash': self.commit_hash}, sidecar)
+        with self.assertRaises(SpoolException):
+            read_job(report_path)
+        self.assertEqual(read_job(report_path, allow_local_repos=True), (self.repo_dir, self.commit_hash))
+
+
+if __name__ == '__main__':
+    unittest.main()